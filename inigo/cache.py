@@ -0,0 +1,293 @@
+# inigo.cache
+# Persistent cache of file signatures keyed on stat data
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sat Oct 17 13:40:05 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: cache.py [] benjamin@bengfort.com $
+
+"""
+Persistent cache of file signatures keyed on stat data.
+
+The cache is stored in a SQLite database on the local machine (it is host
+specific since it keys on the device and inode of the file) and maps the
+path of a file along with its stat data to the signature computed for it
+(and the fast checksum computed from the same read of the file, if any).
+If any of the device, inode, size or modification time of the file change,
+then the cached signature is considered stale and is ignored.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import sqlite3
+
+from inigo.config import settings
+from inigo.utils import chunked
+from inigo.hashing import DEFAULT_ALGORITHM, DEFAULT_CHECKSUM
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Maximum number of host parameters in a single SQLite statement
+MAX_VARIABLES = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    path        TEXT PRIMARY KEY,
+    device      INTEGER NOT NULL,
+    inode       INTEGER NOT NULL,
+    size        INTEGER NOT NULL,
+    mtime       INTEGER NOT NULL,
+    algorithm   TEXT NOT NULL,
+    signature   TEXT NOT NULL,
+    chkalg      TEXT,
+    checksum    TEXT
+)
+"""
+
+# Columns added to the signatures table after it was first created
+UPGRADES = (
+    ("chkalg", "ALTER TABLE signatures ADD COLUMN chkalg TEXT"),
+    ("checksum", "ALTER TABLE signatures ADD COLUMN checksum TEXT"),
+)
+
+INSERT = (
+    "INSERT OR REPLACE INTO signatures (path, device, inode, size, mtime, "
+    "algorithm, signature, chkalg, checksum) VALUES (?,?,?,?,?,?,?,?,?)"
+)
+
+##########################################################################
+## Helper Methods
+##########################################################################
+
+def stat_key(st):
+    """
+    Returns the (st_dev, st_ino, size, mtime_ns) tuple for a stat result.
+    Python 2 does not expose st_mtime_ns so it is derived from st_mtime.
+    """
+    mtime = getattr(st, 'st_mtime_ns', None)
+    if mtime is None:
+        mtime = int(st.st_mtime * 1000000000)
+    return (st.st_dev, st.st_ino, st.st_size, mtime)
+
+def get_signature_cache():
+    """
+    Returns the signature cache specified by the settings, or None if the
+    signature cache has been disabled in the configuration.
+    """
+    if not settings.hashing.cache:
+        return None
+    return SignatureCache(
+        settings.hashing.cache, settings.hashing.algorithm, settings.hashing.checksum
+    )
+
+##########################################################################
+## Signature Cache
+##########################################################################
+
+class SignatureCache(object):
+    """
+    Wraps a SQLite database that stores signatures by path and stat key,
+    along with the checksum of the file if it was computed with them. Note
+    that SQLite connections may only be used by the thread that created
+    them, so the cache should be consulted from the main thread.
+    """
+
+    def __init__(self, path=":memory:", algorithm=DEFAULT_ALGORITHM,
+                 checksum=DEFAULT_CHECKSUM):
+        if path != ":memory:":
+            path = os.path.abspath(os.path.expanduser(path))
+            directory = os.path.dirname(path)
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+
+        self.path = path
+        self.algorithm = algorithm
+        self.checksum = checksum
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA case_sensitive_like = ON")
+        self.conn.execute(SCHEMA)
+
+        # Caches created before checksums were stored lack their columns
+        columns = set(row[1] for row in self.conn.execute("PRAGMA table_info(signatures)"))
+        for column, upgrade in UPGRADES:
+            if column not in columns:
+                self.conn.execute(upgrade)
+
+        self.conn.commit()
+
+    def get(self, path, st=None):
+        """
+        Returns the cached signature for the path or None if the path is not
+        in the cache or if the file has changed since it was cached.
+        """
+        try:
+            st = st or os.stat(path)
+        except OSError:
+            return None
+
+        row = self.conn.execute(
+            "SELECT device, inode, size, mtime, signature FROM signatures "
+            "WHERE path=? AND algorithm=?", (path, self.algorithm)
+        ).fetchone()
+
+        if row is not None and tuple(row[:4]) == stat_key(st):
+            return row[4]
+        return None
+
+    def stat_many(self, paths):
+        """
+        Returns a dictionary of path to stat key for every path that can be
+        stat'd. Take the stats before hashing the files and pass them to
+        set_many, so a file that changes while it is hashed isn't cached.
+        """
+        stats = {}
+        for path in paths:
+            try:
+                stats[path] = stat_key(os.stat(path))
+            except OSError:
+                continue
+        return stats
+
+    def get_many(self, paths, stats=None):
+        """
+        Bulk lookup of signatures for many paths, returning a dictionary of
+        path to signature for every path that has a fresh cache entry.
+        """
+        return {
+            path: digests[self.algorithm]
+            for path, digests in self.get_digests(paths, stats).iteritems()
+        }
+
+    def get_digests(self, paths, stats=None):
+        """
+        Bulk lookup of the digests of many paths, returning a dictionary of
+        path to a dict of the digest of each algorithm (as computed by
+        compute_digests) for every path that has a fresh cache entry. The
+        checksum is left out of the digests if it wasn't cached. The stat
+        keys of the paths are taken unless they are passed in.
+        """
+        if stats is None:
+            stats = self.stat_many(paths)
+
+        found = {}
+        for chunk in chunked([path for path in paths if path in stats], MAX_VARIABLES):
+            query = (
+                "SELECT path, device, inode, size, mtime, signature, chkalg, checksum "
+                "FROM signatures WHERE algorithm=? AND path IN ({})"
+            ).format(",".join("?" * len(chunk)))
+
+            for row in self.conn.execute(query, [self.algorithm] + chunk):
+                if tuple(row[1:5]) == stats[row[0]]:
+                    found[row[0]] = digests = {self.algorithm: row[5]}
+                    if row[7] is not None and row[6] == self.checksum:
+                        digests[self.checksum] = row[7]
+
+        return found
+
+    def set(self, path, signature, st=None, commit=True, chkdigest=None):
+        """
+        Stores the signature (and checksum if given) for the path along with
+        its current stat data.
+        """
+        st = st or os.stat(path)
+        self.conn.execute(INSERT, self.row(path, stat_key(st), signature, chkdigest))
+
+        if commit:
+            self.conn.commit()
+
+    def set_many(self, pairs, stats=None):
+        """
+        Stores many (path, signature) pairs in a single transaction, where
+        the signature may also be a dict of the digest of each algorithm in
+        order to store the checksum as well. If the stat keys taken before
+        the files were hashed are passed in (see stat_many) they are stored
+        rather than the current stat data. Pairs whose signature is None or
+        whose path has no stat key or cannot be stat'd are skipped.
+        """
+        rows = []
+        for path, signature in pairs:
+            if signature is None:
+                continue
+
+            chkdigest = None
+            if isinstance(signature, dict):
+                chkdigest = signature.get(self.checksum)
+                signature = signature[self.algorithm]
+
+            if stats is not None:
+                key = stats.get(path)
+                if key is None:
+                    continue
+            else:
+                try:
+                    key = stat_key(os.stat(path))
+                except OSError:
+                    continue
+
+            rows.append(self.row(path, key, signature, chkdigest))
+
+        self.conn.executemany(INSERT, rows)
+        self.conn.commit()
+
+    def row(self, path, key, signature, chkdigest=None):
+        """
+        Returns the row of the signatures table for the path and stat key.
+        """
+        chkalg = self.checksum if chkdigest is not None else None
+        return (path,) + key + (self.algorithm, signature, chkalg, chkdigest)
+
+    def evict(self):
+        """
+        Removes the entries for paths that no longer exist on disk and
+        returns the number of entries that were evicted.
+        """
+        missing = [
+            (path,) for (path,) in self.conn.execute("SELECT path FROM signatures")
+            if not os.path.exists(path)
+        ]
+
+        self.conn.executemany("DELETE FROM signatures WHERE path=?", missing)
+        self.conn.commit()
+        return len(missing)
+
+    def invalidate(self, path=None):
+        """
+        Removes the entry for the path, or every entry beneath it if the
+        path is a directory. If no path is given, the cache is cleared.
+        Returns the number of entries that were removed.
+        """
+        if path is None:
+            cursor = self.conn.execute("DELETE FROM signatures")
+        else:
+            path = path.rstrip(os.sep)
+            prefix = path.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            cursor = self.conn.execute(
+                "DELETE FROM signatures WHERE path=? OR path LIKE ? ESCAPE '\\'",
+                (path, prefix + os.sep + "%")
+            )
+
+        self.conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        """
+        Closes the connection to the cache database.
+        """
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def __contains__(self, path):
+        return self.get(path) is not None
+
+    def __repr__(self):
+        return "<{}: {}>".format(self.__class__.__name__, self.path)
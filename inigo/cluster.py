@@ -0,0 +1,111 @@
+# inigo.cluster
+# Spatio-temporal clustering of pictures into events.
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 17:24:13 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: cluster.py [] benjamin@bengfort.com $
+
+"""
+Spatio-temporal clustering of pictures into events.
+
+Pictures taken on a single outing share nearly the same coordinates and
+timestamps, so they only need to be geocoded once. Events are found by grid
+bucketing with NumPy: pictures are split into sessions wherever more than
+the gap passes between consecutive pictures, and each session is bucketed
+into square cells of a grid the size of the distance. An event is then the
+pictures of a session in the same cell, so no event is wider than the cell
+and a picture is never more than a diagonal of the cell from another one.
+Pictures without a date are bucketed by location alone.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import numpy as np
+
+from inigo.geohash import KM_PER_DEGREE
+from inigo.utils.timez import epochftime
+
+##########################################################################
+## Clustering
+##########################################################################
+
+def to_timestamps(dates):
+    """
+    Returns an array of the epoch seconds of datetimes, NaN where None.
+    """
+    return np.array([
+        np.nan if date is None else float(epochftime(date)) for date in dates
+    ], dtype=np.float64)
+
+
+def cluster_events(latitude, longitude, timestamps=None, distance=0.5, gap=3600):
+    """
+    Returns an array of the event of every picture, given arrays of their
+    coordinates and epoch timestamps (NaN if unknown), where the pictures
+    in an event were taken in the same grid cell of distance kilometers
+    with no more than gap seconds between consecutive pictures. Events are
+    numbered from 0 in the order of their first picture.
+    """
+    latitude  = np.asarray(latitude, dtype=np.float64).ravel()
+    longitude = np.asarray(longitude, dtype=np.float64).ravel()
+    if len(latitude) == 0:
+        return np.array([], dtype=np.intp)
+
+    if distance <= 0:
+        raise ValueError("The distance of events must be greater than zero")
+
+    # Split the pictures into sessions by the gaps between their timestamps
+    session = np.full(len(latitude), -1, dtype=np.int64)
+    if timestamps is not None:
+        timestamps = np.asarray(timestamps, dtype=np.float64).ravel()
+        dated = np.flatnonzero(~np.isnan(timestamps))
+        order = dated[np.argsort(timestamps[dated], kind='mergesort')]
+        if len(order):
+            breaks = np.diff(timestamps[order]) > gap
+            session[order] = np.concatenate(([0], np.cumsum(breaks)))
+
+    # Rows of the grid are evenly spaced in latitude, the columns of each
+    # row are as wide as the distance along the middle of the row
+    step = distance / KM_PER_DEGREE
+    row  = np.floor((latitude + 90.0) / step)
+    middle = np.clip((row + 0.5) * step - 90.0, -90.0, 90.0)
+    width  = step / np.maximum(np.cos(np.radians(middle)), 1e-12)
+    col  = np.floor((longitude + 180.0) / width)
+
+    keys = np.rec.fromarrays([session, row.astype(np.int64), col.astype(np.int64)])
+    _, first, labels = np.unique(keys, return_index=True, return_inverse=True)
+
+    # Renumber the events in the order of their first picture
+    rank = np.empty(len(first), dtype=np.intp)
+    rank[np.argsort(first, kind='mergesort')] = np.arange(len(first))
+    return rank[labels]
+
+
+def representatives(latitude, longitude, labels):
+    """
+    Returns an array of the index of one picture per event, the one nearest
+    to the centroid of the event, ordered by the event labels.
+    """
+    latitude  = np.asarray(latitude, dtype=np.float64).ravel()
+    longitude = np.asarray(longitude, dtype=np.float64).ravel()
+    labels    = np.asarray(labels, dtype=np.intp).ravel()
+    if len(labels) == 0:
+        return np.array([], dtype=np.intp)
+
+    sizes = np.bincount(labels).astype(np.float64)
+    lat = np.bincount(labels, weights=latitude) / sizes
+    lon = np.bincount(labels, weights=longitude) / sizes
+
+    # Events are small enough for distances in the plane to be accurate
+    scale = np.cos(np.radians(lat[labels]))
+    error = (latitude - lat[labels]) ** 2 + ((longitude - lon[labels]) * scale) ** 2
+
+    order = np.lexsort((error, labels))
+    _, first = np.unique(labels[order], return_index=True)
+    return order[first]
@@ -58,6 +58,68 @@ class GeocodingConfiguration(Configuration):
     apikey = environ_setting("GOOGLE_CLIENT_KEY", "")
     call_limit = 2500
     call_rate  = 5
+    backend    = "google" # Reverse geocoder, "google" or "local" (offline)
+    gazetteer  = "~/.inigo/cities1000.txt" # GeoNames dump or CSV of places
+    max_distance = 50.0   # Kilometers to the nearest place in the gazetteer
+    cache      = "~/.inigo/geocodes.db" # Set to None to disable the cache
+    cache_precision = 7   # Geohash length of cached cells (7 is about 150m)
+    workers    = 4        # Number of remote requests kept in flight
+    retries    = 3        # Retries of requests over the quota or timed out
+    backoff    = 1.0      # Seconds before the first retry, doubling each time
+    batch      = 100      # Number of records geocoded between database commits
+    cluster_distance = 0.25 # Kilometers across events geocoded once, 0 to disable
+    cluster_gap = 3600    # Seconds between pictures taken in the same event
+
+
+class HashingConfiguration(Configuration):
+
+    algorithm  = "sha256"
+    checksum   = "xxh64" # Fast digest computed alongside the signature
+    workers    = None  # Defaults to the number of CPUs
+    processes  = False # Use a process pool instead of threads
+    batch      = 1000  # Number of files hashed before a database commit
+    cache      = "~/.inigo/signatures.db" # Set to None to disable the cache
+    drop_cache = False # Evict hashed files from the page cache (copies re-read them)
+
+
+class MetadataConfiguration(Configuration):
+
+    workers   = None # Processes extracting image meta data, defaults to CPUs
+    chunksize = 32   # Number of images sent to each process at a time
+
+
+class TransferConfiguration(Configuration):
+
+    strategies  = ["reflink", "copy_file_range", "sendfile", "buffered"]
+    chunksize   = 8388608 # Number of bytes copied per system call (8 MiB)
+    fsync       = False   # Flush copied files to disk
+    batch_fsync = True    # Defer the flushes and perform them per directory
+    single_pass = False   # Hash possible duplicates serially as they're saved
+    verify      = False   # Read back copies from disk to check their signature
+    schedule    = None    # Read files in physical order by "extent" or "inode"
+    schedule_batch = 1000 # Number of files sorted into physical order at a time
+
+
+class WalkConfiguration(Configuration):
+
+    snapshot    = "~/.inigo/snapshot.db" # Set to None to disable snapshots
+    incremental = False # Only list directories that changed since the last walk
+    workers     = 1     # Number of threads listing directories concurrently
+
+
+class WatchConfiguration(Configuration):
+
+    delay     = 2.0 # Seconds a file must be quiet before it is backed up
+    interval  = 300 # Seconds between incremental scans without inotify
+
+
+class ThumbnailConfiguration(Configuration):
+
+    cache     = "~/.inigo/thumbnails" # Directory of the thumbnail cache
+    sizes     = [512, 256, 128]       # Longest side of each thumbnail in pixels
+    quality   = 85                    # JPEG quality of the thumbnails
+    max_bytes = 1073741824            # Evict thumbnails beyond this size (1 GiB)
+    workers   = None                  # Defaults to the number of CPUs
 
 
 class DroboConfiguration(Configuration):
@@ -94,6 +156,12 @@ class InigoConfiguration(Configuration):
     testing   = True
     drobo     = DroboConfiguration()
     geocode   = GeocodingConfiguration()
+    hashing   = HashingConfiguration()
+    metadata  = MetadataConfiguration()
+    transfer  = TransferConfiguration()
+    walk      = WalkConfiguration()
+    watch     = WatchConfiguration()
+    thumbnails = ThumbnailConfiguration()
     database  = PostgreSQLConfiguration()
 
 
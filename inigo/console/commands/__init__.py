@@ -21,4 +21,11 @@ A module containing all the Inigo commands
 from .debug import DebugCommand
 from .discover import IdentifyTypesCommand
 from .backup import BackupCommand
+from .watch import WatchCommand
 from .geocode import GeocodeCommand
+from .cache import CacheCommand
+from .benchmark import BenchmarkCommand
+from .thumbnails import ThumbnailsCommand
+from .duplicates import DuplicatesCommand
+from .coordinates import CoordinatesCommand
+from .near import NearCommand
@@ -19,18 +19,32 @@ Runs the evaluation backup to a set of files to Drobo and save meta to db.
 
 import os
 import colorama
+import tempfile
 
-from inigo.image import ImageMeta
+from inigo.image import ImageMeta, extract_metadata, extraction_pool
 from inigo.fs import Node, Directory
 from inigo.models import create_session
 from inigo.models import Picture, STYPE
 from inigo.models import BackupTask
 
 from inigo.config import settings
+from inigo.utils import chunked
+from inigo.hashing import HashingEngine
+from inigo.schedule import PhysicalScheduler, METHODS
+from inigo.cache import get_signature_cache
+from inigo.exceptions import VerificationError
+from inigo.transfer import get_copy_engine, verify_file
 from inigo.utils.decorators import Timer
-from inigo.console.utils import color_format
+from inigo.console.utils import color_format, get_walk_snapshot
 from inigo.console.commands.base import Command
 
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Directory in the backup location where new images are copied as they're hashed
+STAGING_DIR = ".staging"
+
 ##########################################################################
 ## Command
 ##########################################################################
@@ -52,6 +66,58 @@ class BackupCommand(Command):
             'default': None,
             'help': 'Maximum depth of recursion'
         },
+        '--incremental': {
+            'action': 'store_true',
+            'default': settings.walk.incremental,
+            'help': 'Only list directories that changed since the last run'
+        },
+        '--rescan': {
+            'action': 'store_true',
+            'help': 'Discard the directory snapshot and rebuild it with a full scan'
+        },
+        '--walkers': {
+            'type': int,
+            'default': settings.walk.workers,
+            'help': 'Number of threads listing directories concurrently'
+        },
+        ## Manipulate the signature hashing pool
+        ('-w', '--workers'): {
+            'type': int,
+            'default': settings.hashing.workers,
+            'help': 'Number of workers used to hash images'
+        },
+        '--processes': {
+            'action': 'store_true',
+            'default': settings.hashing.processes,
+            'help': 'Hash images in a process pool rather than threads'
+        },
+        ## Manipulate the image meta data extraction pool
+        '--extractors': {
+            'type': int,
+            'default': settings.metadata.workers,
+            'help': 'Number of processes used to extract image meta data'
+        },
+        ## Manipulate the copy to the backup location
+        '--single-pass': {
+            'action': 'store_true',
+            'default': settings.transfer.single_pass,
+            'help': 'Hash possible duplicates as they are saved rather than in parallel'
+        },
+        '--verify': {
+            'action': 'store_true',
+            'default': settings.transfer.verify,
+            'help': 'Read back copied images from disk to verify their signature'
+        },
+        '--schedule': {
+            'choices': METHODS,
+            'default': settings.transfer.schedule,
+            'help': 'Read images one at a time in physical order by first extent or inode'
+        },
+        '--schedule-batch': {
+            'type': int,
+            'default': settings.transfer.schedule_batch,
+            'help': 'Number of images sorted into physical order at a time'
+        },
         'path': {
             'nargs': 1,
             'type': str,
@@ -59,9 +125,16 @@ class BackupCommand(Command):
         }
     }
 
-    def backup(self, path, recursive, depth):
+    single_pass = False
+    verify      = False
+    walkers     = 1
+    scheduler   = None
+    pool        = None
+
+    def backup(self, path, recursive, depth, snapshot=None):
         """
         Walks a directory or handles a single file, storing images in a db.
+        If a directory snapshot is given, only changed directories are walked.
         """
         session = create_session()
         node    = Node(path)
@@ -75,36 +148,161 @@ class BackupCommand(Command):
         count  = 0
         errors = 0
         duplicates = 0
-        folder = Directory(path, recursive, depth)
-        for idx, item in enumerate(folder.list()):
-            if item.isimage():
-                count += 1
-                try:
-                    result = self.backup_image(item, session)
-                    if not result:
-                        duplicates += 1
-                except Exception as e:
-                    print color_format(
-                        "Exception at {}: {}",
-                        colorama.Style.BRIGHT + colorama.Fore.RED,
-                        item.path, e
-                    )
-                    errors += 1
-
-            if idx % 1000 == 0:
-                session.commit()
+        folder = Directory(path, recursive, depth, snapshot=snapshot, workers=self.walkers)
+        images = (item for item in folder.scan() if item.isimage())
+
+        # Sort the images by their location on disk to reduce seeking
+        if self.scheduler is not None:
+            images = self.scheduler(images)
+
+        images = (item.path for item in images)
+
+        # Prepare each batch of images in parallel then back them up serially
+        for batch in chunked(images, settings.hashing.batch):
+            seen, duped, failed = self.backup_batch(batch, session)
+            count += seen
+            duplicates += duped
+            errors += failed
+            session.commit()
 
         session.commit()
         return count, duplicates, errors
 
-    def backup_image(self, fm, session=None):
+    def backup_batch(self, paths, session):
+        """
+        Backs up the batch of image paths serially, returning the count,
+        duplicates, and errors of the batch. Images are first prefiltered by
+        their size and sample: those that can't be duplicates are hashed
+        while they're copied, so they're only read once, while the possible
+        duplicates are hashed in parallel (or as they're saved in single
+        pass mode) and have their meta data extracted in parallel. The
+        session is not committed so that the caller controls the commits.
+        """
+        count  = 0
+        errors = 0
+        duplicates = 0
+
+        images = []
+        for imgpath, digests in self.cached(paths):
+            count += 1
+            digests = digests or {}
+            try:
+                imgsrc = ImageMeta(
+                    imgpath, settings.hashing.algorithm,
+                    digest=digests.get(settings.hashing.algorithm),
+                    cache=self.engine.cache, checksum=settings.hashing.checksum,
+                    chkdigest=digests.get(settings.hashing.checksum),
+                )
+
+                # New images that aren't cached are hashed during the copy
+                new = not imgsrc.has_signature() and not imgsrc.has_candidates(session)
+                images.append((imgsrc, new))
+            except Exception as e:
+                self.report(imgpath, e)
+                errors += 1
+
+        if not self.single_pass:
+            self.prepare_batch([imgsrc for imgsrc, new in images if not new], session)
+
+        for imgsrc, new in images:
+            try:
+                staged = self.stage_image(imgsrc) if new else None
+                result = self.backup_image(imgsrc, session, staged)
+                if not result:
+                    duplicates += 1
+            except Exception as e:
+                self.report(imgsrc.path, e)
+                errors += 1
+
+        return count, duplicates, errors
+
+    def cached(self, paths):
+        """
+        Returns (path, digests) pairs of the signature and checksum of the
+        batch of paths found in the signature cache, where the digests are
+        None for any image that isn't cached.
+        """
+        found = self.engine.cache.get_digests(paths) if self.engine.cache else {}
+        return [(path, found.get(path)) for path in paths]
+
+    def prepare_batch(self, images, session):
+        """
+        Hashes the images whose signature isn't known in parallel with the
+        hashing engine, computing both digests from a single read, then
+        extracts the meta data of the images that aren't duplicates of a
+        saved picture in the extraction pool. Images without a digest or
+        record are read again when saved so that errors are reported.
+        """
+        lookup = {imgsrc.path: imgsrc for imgsrc in images}
+        unknown = [imgsrc.path for imgsrc in images if not imgsrc.has_signature()]
+        for path, digests in self.engine.digests(unknown):
+            if digests is not None:
+                lookup[path].load_digests(digests)
+
+        # Duplicates only add a storage so their meta data isn't needed
+        paths = [
+            imgsrc.path for imgsrc in images
+            if imgsrc.has_signature() and imgsrc.find_duplicate(session) is None
+        ]
+
+        records = extract_metadata(
+            paths, 1, settings.metadata.chunksize, pool=self.pool
+        )
+        for path, record in records:
+            if record is not None:
+                lookup[path].load_record(record)
+
+    def report(self, path, error):
+        """
+        Prints the error that occurred while backing up the image.
+        """
+        print color_format(
+            "Exception at {}: {}",
+            colorama.Style.BRIGHT + colorama.Fore.RED,
+            path, error
+        )
+
+    def stage_image(self, imgsrc):
+        """
+        Copies the image into the staging directory of the backup location,
+        ingesting its digests, sample, mimetype and headers from the same
+        buffers that are written, so that the source only has to be opened
+        and read once. Only images that have no possible duplicates in the
+        database should be staged, otherwise the copy might be wasted.
+        Returns the staged path.
+        """
+        staging = os.path.join(self.backupto, STAGING_DIR)
+        if not os.path.exists(staging):
+            os.makedirs(staging)
+
+        fd, staged = tempfile.mkstemp(dir=staging)
+        os.close(fd)
+
+        try:
+            imgsrc.ingest(staged, self.copier)
+        except:
+            os.remove(staged)
+            raise
+
+        return staged
+
+    def backup_image(self, fm, session=None, staged=None):
         """
         Handles an individual image backup.
         Returns new meta if it moved the file to the backup location, None if
         duplicatated or has already backed up the file. No matter what,
-        database records should be maintained and updated.
+        database records should be maintained and updated. If the image has
+        already been copied to the staging directory, it is moved from there
+        into the backup location (or removed if the image is a duplicate).
         """
-        imgsrc  = ImageMeta(fm.path)
+        try:
+            return self._backup_image(fm, session, staged)
+        finally:
+            if staged is not None and os.path.exists(staged):
+                os.remove(staged)
+
+    def _backup_image(self, fm, session=None, staged=None):
+        imgsrc  = fm if isinstance(fm, ImageMeta) else ImageMeta(fm.path)
 
         # Save the image metadata to the database
         session = imgsrc.save(session)
@@ -114,7 +312,19 @@ class BackupCommand(Command):
         # Figure out backup path on disk
         dstpath = os.path.join(self.backupto, picture.get_relative_backup_path())
         if not os.path.exists(dstpath):
-            imgdst = imgsrc.copy(dstpath)
+            if staged is not None:
+                imgdst = ImageMeta(staged).move(dstpath, self.copier)
+            else:
+                imgdst = imgsrc.copy(dstpath, self.copier)
+
+            # Verify the bytes on disk with the fast checksum of the source,
+            # removing the copy if it's corrupt
+            if self.verify:
+                try:
+                    verify_file(dstpath, imgsrc.checksum, imgsrc.chkname)
+                except VerificationError:
+                    imgdst.remove()
+                    raise
 
             # Save the storages metadata to disk
             # NOTE: This methodology defaults to Drobo - need to fix.
@@ -126,12 +336,71 @@ class BackupCommand(Command):
 
         return None
 
-    def handle(self, args):
+    def prepare(self, args):
+        """
+        Sets up the extraction pool, backup location, hashing engine, and
+        copy engine. The pool is forked first so that the workers don't
+        inherit any database connections, and is reused for every batch.
+        """
+        if not args.single_pass:
+            self.pool = extraction_pool(args.extractors)
+
+        # Files are hashed by a single reader in their physical order
+        workers = 1 if args.schedule else args.workers
+
         self.backupto = settings.drobo.get_drobo_path()
+        self.engine   = HashingEngine(
+            workers, args.processes, settings.hashing.algorithm,
+            cache=get_signature_cache(), drop_cache=settings.hashing.drop_cache,
+            checksum=settings.hashing.checksum
+        )
+        self.copier   = get_copy_engine()
+        self.single_pass = args.single_pass
+        self.verify      = args.verify
+        self.walkers     = args.walkers
+
+        if args.schedule:
+            self.scheduler = PhysicalScheduler(args.schedule, args.schedule_batch)
+
+    def close_pool(self, terminate=False):
+        """
+        Closes the extraction pool once the command is done with it, or
+        terminates it if the command was aborted.
+        """
+        if self.pool is None:
+            return
+
+        if terminate:
+            self.pool.terminate()
+        else:
+            self.pool.close()
+
+        self.pool.join()
+        self.pool = None
+
+    def handle(self, args):
+        self.prepare(args)
+
+        try:
+            snapshot = get_walk_snapshot(self.name, args.incremental, args.rescan)
+
+            with Timer() as timer:
+                count, duplicates, errors = self.backup(args.path[0], args.recursive, args.depth, snapshot)
+                backups = count - errors - duplicates
+                self.copier.flush()
+        except:
+            self.close_pool(terminate=True)
+            raise
+
+        self.close_pool()
 
-        with Timer() as timer:
-            count, duplicates, errors = self.backup(args.path[0], args.recursive, args.depth)
-            backups = count - errors - duplicates
+        # Only skip these directories next time if every image was backed up
+        if snapshot is not None:
+            if errors:
+                snapshot.rollback()
+            else:
+                snapshot.commit()
+            snapshot.close()
 
         # Save log of geocoding
         log = BackupTask(backups=backups, duplicates=duplicates, errors=errors, elapsed=timer.interval)
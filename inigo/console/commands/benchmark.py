@@ -0,0 +1,236 @@
+# inigo.console.commands.benchmark
+# Benchmarks the file system operations used during a backup.
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sun Oct 18 10:02:37 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: benchmark.py [] benjamin@bengfort.com $
+
+"""
+Benchmarks the file system operations used during a backup.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import random
+import shutil
+import tempfile
+import colorama
+
+from inigo.fs import Directory
+from inigo.config import settings
+from inigo.hashing import compute_signature
+from inigo.utils.decorators import Timer
+from inigo.utils.posix import fadvise, POSIX_FADV_DONTNEED
+from inigo.transfer import CopyEngine, STRATEGIES
+from inigo.schedule import PhysicalScheduler, METHODS
+from inigo.console.utils import color_format
+from inigo.console.commands.base import Command
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+MEGABYTE = 1024 * 1024
+
+# Files are written in interleaved chunks of this size to fragment them
+FRAGMENT_SIZE = 64 * 1024
+
+##########################################################################
+## Helper Functions
+##########################################################################
+
+def drop_cache(path):
+    """
+    Evicts the file from the page cache so that benchmarks read from disk.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        fadvise(fd, 0, 0, POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def write_random(path, size):
+    """
+    Writes size bytes of random data to the path a megabyte at a time.
+    """
+    with open(path, 'wb') as f:
+        while size > 0:
+            chunk = min(size, MEGABYTE)
+            f.write(os.urandom(chunk))
+            size -= chunk
+
+
+def write_fragmented(paths, size):
+    """
+    Writes size bytes of random data to each of the paths, appending a
+    fragment to each file in turn so that their extents are interleaved.
+    The paths are created in a random order so that their names do not
+    reflect the order in which they were allocated on disk.
+    """
+    paths = list(paths)
+    random.shuffle(paths)
+
+    handles = [open(path, 'wb') for path in paths]
+    try:
+        while size > 0:
+            chunk = min(size, FRAGMENT_SIZE)
+            for f in handles:
+                f.write(os.urandom(chunk))
+                f.flush()
+            size -= chunk
+    finally:
+        for f in handles:
+            f.close()
+
+##########################################################################
+## Command
+##########################################################################
+
+class BenchmarkCommand(Command):
+
+    name = "benchmark"
+    help = "measures the throughput of file system operations"
+
+    args = {
+        'target': {
+            'choices': ('copy', 'schedule'),
+            'help': 'the operation to benchmark'
+        },
+        ('-s', '--size'): {
+            'type': int,
+            'default': 256,
+            'help': 'size of the benchmark file in MB'
+        },
+        ('-r', '--runs'): {
+            'type': int,
+            'default': 3,
+            'help': 'number of times to run each benchmark'
+        },
+        ('-d', '--dir'): {
+            'type': str,
+            'default': None,
+            'help': 'directory on the volume to benchmark (default tmp)'
+        },
+        ('-n', '--files'): {
+            'type': int,
+            'default': 64,
+            'help': 'number of files the size is split across (schedule)'
+        },
+        '--source': {
+            'type': str,
+            'default': None,
+            'help': 'read the existing files in this directory (schedule)'
+        },
+        ('-c', '--chunksize'): {
+            'type': int,
+            'default': settings.transfer.chunksize,
+            'help': 'number of bytes copied per system call'
+        },
+    }
+
+    def handle(self, args):
+        self.workdir = tempfile.mkdtemp(prefix="inigo-bench-", dir=args.dir)
+
+        try:
+            output = getattr(self, "benchmark_" + args.target)(args)
+        finally:
+            shutil.rmtree(self.workdir)
+
+        return "\n".join(output)
+
+    def report(self, name, nbytes, intervals):
+        """
+        Formats a line reporting the mean throughput of the runs in MB/s.
+        """
+        mean = sum(intervals) / len(intervals)
+        rate = (float(nbytes) / MEGABYTE) / mean if mean else float('inf')
+        return "  {} {}".format(
+            color_format("{: <16}", colorama.Fore.WHITE, name),
+            color_format("{: >10.1f} MB/s", colorama.Fore.CYAN, rate),
+        )
+
+    def benchmark_copy(self, args):
+        """
+        Copies a file of random data with each copy strategy in isolation.
+        """
+        nbytes = args.size * MEGABYTE
+        src = os.path.join(self.workdir, "source.dat")
+        dst = os.path.join(self.workdir, "target.dat")
+        write_random(src, nbytes)
+
+        output = [color_format(
+            "Copy throughput of a {} MB file over {} runs", colorama.Fore.MAGENTA,
+            args.size, args.runs
+        )]
+
+        for strategy in STRATEGIES:
+            engine = CopyEngine([strategy], args.chunksize)
+            intervals = []
+
+            try:
+                for _ in xrange(args.runs):
+                    drop_cache(src)
+                    with Timer() as timer:
+                        engine.copy(src, dst)
+                    intervals.append(timer.interval)
+                    os.remove(dst)
+            except (IOError, OSError) as e:
+                output.append("  {} {}".format(
+                    color_format("{: <16}", colorama.Fore.WHITE, strategy),
+                    color_format("unsupported ({})", colorama.Fore.RED, e),
+                ))
+                continue
+
+            output.append(self.report(strategy, nbytes, intervals))
+
+        return output
+
+    def benchmark_schedule(self, args):
+        """
+        Hashes a set of files in name order and then in each physical order.
+        """
+        if args.source:
+            folder = Directory(args.source, recursive=True)
+            paths  = [item.path for item in folder.scan() if item.isfile()]
+        else:
+            size  = (args.size * MEGABYTE) // args.files
+            paths = [
+                os.path.join(self.workdir, "file{:05d}.dat".format(idx))
+                for idx in xrange(args.files)
+            ]
+            write_fragmented(paths, size)
+
+        nbytes = sum(os.path.getsize(path) for path in paths)
+        output = [color_format(
+            "Hashing throughput of {} files ({:0.1f} MB) over {} runs",
+            colorama.Fore.MAGENTA, len(paths), float(nbytes) / MEGABYTE, args.runs
+        )]
+
+        orders = [("naive", sorted)]
+        for method in METHODS:
+            scheduler = PhysicalScheduler(method, settings.transfer.schedule_batch)
+            orders.append((method, scheduler.schedule))
+
+        for name, order in orders:
+            intervals = []
+            for _ in xrange(args.runs):
+                for path in paths:
+                    drop_cache(path)
+
+                # The time to sort the files is included in the benchmark
+                with Timer() as timer:
+                    for path in order(paths):
+                        compute_signature(path)
+                intervals.append(timer.interval)
+
+            output.append(self.report(name, nbytes, intervals))
+
+        return output
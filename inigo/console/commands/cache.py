@@ -0,0 +1,85 @@
+# inigo.console.commands.cache
+# Inspects and maintains the local signature cache.
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sat Oct 17 14:22:51 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: cache.py [] benjamin@bengfort.com $
+
+"""
+Inspects and maintains the local signature cache.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import colorama
+
+from inigo.fs import normalize_path
+from inigo.cache import get_signature_cache
+from inigo.exceptions import ConsoleError
+from inigo.console.utils import color_format
+from inigo.console.commands.base import Command
+
+##########################################################################
+## Command
+##########################################################################
+
+class CacheCommand(Command):
+
+    name = "cache"
+    help = "inspect, evict, or invalidate the local signature cache"
+
+    args = {
+        ('-e', '--evict'): {
+            'default': False,
+            'action': 'store_true',
+            'help': 'remove entries for files that no longer exist'
+        },
+        ('-i', '--invalidate'): {
+            'default': False,
+            'action': 'store_true',
+            'help': 'remove entries for the paths (or all entries if no paths)'
+        },
+        'paths': {
+            'nargs': '*',
+            'metavar': 'PATH',
+            'type': str,
+            'help': 'files or directories to invalidate'
+        }
+    }
+
+    def handle(self, args):
+        cache = get_signature_cache()
+        if cache is None:
+            raise ConsoleError("The signature cache is disabled in the configuration")
+
+        output = []
+
+        if args.evict:
+            output.append(color_format(
+                "Evicted {} entries for missing files", colorama.Fore.CYAN,
+                cache.evict()
+            ))
+
+        if args.invalidate:
+            if args.paths:
+                removed = sum(cache.invalidate(normalize_path(path)) for path in args.paths)
+            else:
+                removed = cache.invalidate()
+
+            output.append(color_format(
+                "Invalidated {} entries", colorama.Fore.CYAN, removed
+            ))
+
+        output.append(color_format(
+            "{} signatures in cache at {}", colorama.Fore.MAGENTA,
+            len(cache), cache.path
+        ))
+
+        cache.close()
+        return "\n".join(output)
@@ -0,0 +1,156 @@
+# inigo.console.commands.coordinates
+# Backfills and cleans the GPS coordinates of pictures in the database.
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 09:58:21 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: coordinates.py [] benjamin@bengfort.com $
+
+"""
+Backfills and cleans the GPS coordinates of pictures in the database.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import colorama
+import numpy as np
+
+from confire import ImproperlyConfigured
+
+from inigo.config import settings
+from inigo.utils import chunked
+from inigo.models import Picture, create_session
+from inigo.gps import read_gps_batch, decode_gps, describe_flags
+from inigo.gps import validate_coordinates, update_coordinates, GPS_VALID
+from inigo.console.utils import color_format, locate_picture
+from inigo.console.commands.base import Command
+from inigo.utils.decorators import Timer
+from inigo.utils.timez import humanizedelta
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Number of pictures decoded between database commits during a backfill
+BACKFILL_BATCH = 1000
+
+##########################################################################
+## Command
+##########################################################################
+
+class CoordinatesCommand(Command):
+
+    name = "coordinates"
+    help = "backfill the GPS coordinates of pictures in the database"
+
+    args = {
+        '--all': {
+            'default': False,
+            'action': 'store_true',
+            'help': 'decode the coordinates of pictures that already have them'
+        },
+        '--clean': {
+            'default': False,
+            'action': 'store_true',
+            'help': 'only clear invalid coordinates stored in the database'
+        },
+        ('-w', '--workers'): {
+            'type': int,
+            'default': settings.metadata.workers,
+            'help': 'number of processes used to read GPS tags'
+        },
+    }
+
+    def handle(self, args):
+        self.session = create_session()
+
+        with Timer() as timer:
+            if args.clean:
+                flags = self.clean()
+            else:
+                flags = self.backfill(args.workers, args.all)
+
+        counts = describe_flags(flags)
+        output = [
+            color_format(
+                "{}: {}", colorama.Fore.CYAN, name, counts[name]
+            ) for name in sorted(counts) if counts[name]
+        ]
+
+        output.append(color_format(
+            "{} the coordinates of {} pictures in {}", colorama.Fore.MAGENTA,
+            "Validated" if args.clean else "Decoded", len(flags),
+            humanizedelta(seconds=timer.interval)
+        ))
+
+        return "\n".join(output)
+
+    def backfill(self, workers, everything=False):
+        """
+        Reads the GPS tags of every picture without coordinates (or every
+        picture) that can be found on this host, decoding and writing the
+        coordinates a batch of pictures at a time. The coordinates of
+        pictures whose tags are missing or unreadable are left alone.
+        Returns the flags.
+        """
+        try:
+            backupto = settings.drobo.get_drobo_path()
+        except ImproperlyConfigured:
+            backupto = None
+
+        query = self.session.query(Picture.id)
+        if not everything:
+            query = query.filter(Picture.latitude.is_(None))
+
+        ids   = [picture_id for picture_id, in query]
+        flags = []
+
+        for batch in chunked(ids, BACKFILL_BATCH):
+            jobs = []
+            for picture in self.session.query(Picture).filter(Picture.id.in_(batch)):
+                path = locate_picture(picture, backupto)
+                if path is not None:
+                    jobs.append((picture.id, path))
+
+            found = dict(read_gps_batch(jobs, workers))
+            if not found:
+                continue
+
+            keys = list(found)
+            coordinates = decode_gps([found[key] for key in keys])
+            update_coordinates(self.session, keys, coordinates)
+            self.session.commit()
+
+            flags.append(coordinates.flags)
+
+        return np.concatenate(flags) if flags else np.array([], dtype=np.int64)
+
+    def clean(self):
+        """
+        Validates the coordinates stored in the database and clears the
+        ones that are out of range or exactly (0, 0). Returns the flags.
+        """
+        query = self.session.query(Picture.id, Picture.latitude, Picture.longitude)
+        query = query.filter(Picture.latitude.isnot(None))
+        query = query.filter(Picture.longitude.isnot(None))
+
+        rows  = query.all()
+        if not rows:
+            return np.array([], dtype=np.int64)
+
+        ids, latitude, longitude = zip(*rows)
+        flags = validate_coordinates(latitude, longitude)
+
+        invalid = np.flatnonzero(flags != GPS_VALID).tolist()
+        self.session.bulk_update_mappings(Picture, [
+            {'id': ids[idx], 'latitude': None, 'longitude': None, 'geohash': None}
+            for idx in invalid
+        ])
+        self.session.commit()
+
+        return flags
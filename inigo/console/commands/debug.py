@@ -17,8 +17,12 @@ A debug command for debugging on the commandline
 ## Imports
 ##########################################################################
 
+import os
+
 from inigo.config import settings
-from inigo.fs import Node
+from inigo.fs import Node, FileMeta, normalize_path
+from inigo.hashing import hash_files
+from inigo.cache import get_signature_cache
 from inigo.image import ImageMeta
 from inigo.console.commands.base import Command
 
@@ -50,6 +54,13 @@ class DebugCommand(Command):
         if args.settings:
             print settings
 
+        # Hash all of the files up front so that they're computed in parallel
+        files = [normalize_path(path) for path in args.paths]
+        files = [path for path in files if os.path.isfile(path) and not Node(path).isimage()]
+        self.signatures = dict(hash_files(
+            files, settings.hashing.workers, cache=get_signature_cache()
+        ))
+
         output = []
         for path in args.paths:
             output.append(self.handle_path(path))
@@ -63,7 +74,9 @@ class DebugCommand(Command):
             return self.handle_image(ImageMeta(path))
 
         if node.isfile():
-            return self.handle_file(node.convert())
+            return self.handle_file(
+                FileMeta(node.path, digest=self.signatures.get(node.path))
+            )
 
         if node.isdir():
             return self.handle_directory(node.convert())
@@ -19,10 +19,11 @@ Commands for discovery and interpretation of the file system
 
 import colorama
 
-from inigo.fs import Directory
+from inigo.config import settings
+from inigo.fs import Directory, guess_mimetype
 from inigo.utils.stats import FreqDist
 from inigo.utils.decorators import Timer
-from inigo.console.utils import color_format
+from inigo.console.utils import color_format, get_walk_snapshot
 from inigo.console.commands.base import Command
 
 ##########################################################################
@@ -46,6 +47,20 @@ class IdentifyTypesCommand(Command):
             'default': None,
             'help': 'Maximum depth of recursion'
         },
+        '--incremental': {
+            'action': 'store_true',
+            'default': settings.walk.incremental,
+            'help': 'Only list directories that changed since the last run'
+        },
+        '--rescan': {
+            'action': 'store_true',
+            'help': 'Discard the directory snapshot and rebuild it with a full scan'
+        },
+        '--walkers': {
+            'type': int,
+            'default': settings.walk.workers,
+            'help': 'Number of threads listing directories concurrently'
+        },
         'path': {
             'nargs': 1,
             'type': str,
@@ -53,18 +68,18 @@ class IdentifyTypesCommand(Command):
         }
     }
 
-    def walk_directory(self, path, recursive, depth):
+    def walk_directory(self, path, recursive, depth, snapshot=None, workers=1):
         """
         Returns a frequency distribution of mimetypes in a directory.
         Handler in a method for timing and to allow multiple paths walked.
         """
-        dir  = Directory(path, recursive, depth)
+        dir  = Directory(path, recursive, depth, snapshot=snapshot, workers=workers)
 
         mimetypes = FreqDist()
-        for item in dir.list():
+        for item in dir.scan():
             if item.isfile():
                 try:
-                    mimetypes[item.mimetype] += 1
+                    mimetypes[guess_mimetype(item.path, item.key)] += 1
                 except Exception as e:
                     print color_format(
                         "Exception at {}: {}",
@@ -76,10 +91,20 @@ class IdentifyTypesCommand(Command):
 
     def handle(self, args):
 
+        snapshot = get_walk_snapshot(self.name, args.incremental, args.rescan)
+
         with Timer() as timer:
-            mimetypes = self.walk_directory(args.path[0], args.recursive, args.depth)
+            mimetypes = self.walk_directory(
+                args.path[0], args.recursive, args.depth, snapshot, args.walkers
+            )
+
+            if snapshot is not None:
+                snapshot.commit()
+                snapshot.close()
 
             output = [color_format("Mimetypes discovered in {}", colorama.Fore.WHITE, args.path[0])]
+            if args.incremental and not args.rescan:
+                output[0] += color_format(" (changed directories only)", colorama.Fore.WHITE)
             for key, val in mimetypes.most_common():
                 frequency = color_format("{: >6}", colorama.Fore.CYAN, val)
                 mimetype  = color_format("{}", colorama.Fore.WHITE, key)
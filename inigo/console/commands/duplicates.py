@@ -0,0 +1,194 @@
+# inigo.console.commands.duplicates
+# Reports duplicate and near duplicate pictures in the database.
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 03:15:06 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: duplicates.py [] benjamin@bengfort.com $
+
+"""
+Reports duplicate and near duplicate pictures in the database.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import colorama
+
+from itertools import groupby
+from operator import attrgetter
+from confire import ImproperlyConfigured
+
+from inigo.config import settings
+from inigo.utils import chunked
+from inigo.models import Picture, Storage, STYPE, create_session
+from inigo.phash import MultiIndexHash, DEFAULT_DISTANCE, hash_images
+from inigo.console.utils import color_format, locate_picture
+from inigo.console.commands.base import Command
+from inigo.utils.decorators import Timer
+from inigo.utils.timez import humanizedelta
+
+from sqlalchemy import func
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Number of pictures hashed between database commits during a backfill
+BACKFILL_BATCH = 1000
+
+##########################################################################
+## Command
+##########################################################################
+
+class DuplicatesCommand(Command):
+
+    name = "duplicates"
+    help = "report duplicate or near duplicate pictures in the database"
+
+    args = {
+        '--near': {
+            'default': False,
+            'action': 'store_true',
+            'help': 'report visually similar pictures by their perceptual hash'
+        },
+        ('-k', '--distance'): {
+            'type': int,
+            'default': DEFAULT_DISTANCE,
+            'help': 'maximum number of bits that differ between near duplicates'
+        },
+        '--backfill': {
+            'default': False,
+            'action': 'store_true',
+            'help': 'compute perceptual hashes of pictures saved without one'
+        },
+        ('-w', '--workers'): {
+            'type': int,
+            'default': settings.metadata.workers,
+            'help': 'number of processes used to backfill perceptual hashes'
+        },
+        ('-n', '--limit'): {
+            'type': int,
+            'default': 20,
+            'help': 'maximum number of clusters to print (all if 0)'
+        },
+    }
+
+    def handle(self, args):
+        self.session = create_session()
+        output = []
+
+        if args.backfill:
+            output.append(self.backfill(args.workers))
+
+        with Timer() as timer:
+            if args.near:
+                clusters = self.near_duplicates(args.distance)
+            else:
+                clusters = self.exact_duplicates()
+
+        for cluster in clusters[:args.limit or None]:
+            print self.describe(cluster)
+
+        output.append(color_format(
+            "Found {} clusters of {} {}duplicate pictures in {}",
+            colorama.Fore.MAGENTA, len(clusters), sum(len(c) for c in clusters),
+            "near " if args.near else "", humanizedelta(seconds=timer.interval)
+        ))
+
+        return "\n".join(output)
+
+    def exact_duplicates(self):
+        """
+        Returns lists of the original storages of pictures that are stored
+        in more than one place, since signatures are unique per picture.
+        """
+        originals = self.session.query(Storage).filter(Storage.stype == STYPE.ORIGINAL)
+
+        stored = originals.with_entities(Storage.picture_id)
+        stored = stored.group_by(Storage.picture_id)
+        stored = stored.having(func.count(Storage.id) > 1)
+
+        query  = originals.filter(Storage.picture_id.in_(stored.subquery()))
+        query  = query.order_by(Storage.picture_id)
+
+        clusters = [
+            [u"{}{}".format(storage.hostname, storage.filepath) for storage in storages]
+            for _, storages in groupby(query, attrgetter('picture_id'))
+        ]
+
+        return sorted(clusters, key=len, reverse=True)
+
+    def near_duplicates(self, distance):
+        """
+        Returns lists of the ids of pictures whose perceptual hashes are
+        within the distance of each other, largest clusters first.
+        """
+        index = MultiIndexHash(distance)
+        query = self.session.query(Picture.id, Picture.phash)
+        query = query.filter(Picture.phash.isnot(None))
+
+        for picture_id, phash in query.yield_per(10000):
+            index.add(picture_id, phash)
+
+        return index.clusters()
+
+    def describe(self, cluster):
+        """
+        Returns a printable description of the cluster of duplicates.
+        """
+        if not isinstance(cluster[0], (int, long)):
+            return color_format("\n  ".join(cluster), colorama.Fore.CYAN)
+
+        pictures = self.session.query(Picture).filter(Picture.id.in_(cluster))
+        return color_format("\n  ".join(
+            u"{} {}x{} {}".format(
+                picture.id, picture.width, picture.height,
+                picture.get_relative_backup_path()
+            ) for picture in pictures.order_by(Picture.id)
+        ), colorama.Fore.CYAN)
+
+    def backfill(self, workers):
+        """
+        Computes the perceptual hash of every picture without one that can
+        be found on this host, committing a batch of pictures at a time.
+        """
+        try:
+            backupto = settings.drobo.get_drobo_path()
+        except ImproperlyConfigured:
+            backupto = None
+
+        query = self.session.query(Picture.id).filter(Picture.phash.is_(None))
+        ids   = [picture_id for picture_id, in query]
+        count = missing = 0
+
+        with Timer() as timer:
+            for batch in chunked(ids, BACKFILL_BATCH):
+                jobs = []
+                for picture in self.session.query(Picture).filter(Picture.id.in_(batch)):
+                    path = locate_picture(picture, backupto)
+                    if path is None:
+                        missing += 1
+                    else:
+                        jobs.append((picture.id, path))
+
+                for picture_id, phash in hash_images(jobs, workers):
+                    if phash is None:
+                        missing += 1
+                        continue
+
+                    self.session.query(Picture).filter(Picture.id == picture_id).update(
+                        {Picture.phash: unicode(phash)}, synchronize_session=False
+                    )
+                    count += 1
+
+                self.session.commit()
+
+        return color_format(
+            "Computed {} perceptual hashes ({} pictures not found or unreadable) in {}",
+            colorama.Fore.CYAN, count, missing, humanizedelta(seconds=timer.interval)
+        )
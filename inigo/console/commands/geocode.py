@@ -17,18 +17,20 @@ Incremental geocoding of the database from the command line.
 ## Imports
 ##########################################################################
 
-import time
 import colorama
 
 from inigo.config import settings
+from inigo.utils import chunked
 from inigo.models import Picture, create_session
 from inigo.models import GeocodeTask
+from inigo.geocode import BACKENDS, GeocodeCache, GeocodeRunner
+from inigo.geocode import get_geocoder, get_geocode_cache
+from inigo.cluster import cluster_events, representatives, to_timestamps
 from inigo.console.commands.base import Command
 from inigo.console.utils import color_format
 from inigo.utils.timez import humanizedelta, today, tzaware_now
 from inigo.utils.decorators import Timer
 
-from geopy.geocoders import GoogleV3
 from dateutil.tz import tzstr
 
 from sqlalchemy import desc
@@ -44,6 +46,12 @@ MAXIMUM_CALL_LIMIT = 2500
 # PST Timezone for Google Rate limit
 PST = tzstr('PST8PDT')
 
+# Number of pictures geocoded between database commits by local backends
+LOCAL_BATCH = 10000
+
+# Number of failed lookups after which geocoding is aborted
+MAXIMUM_ERRORS = 10
+
 ##########################################################################
 ## Command
 ##########################################################################
@@ -69,25 +77,52 @@ class GeocodeCommand(Command):
             'default': False,
             'action': 'store_true',
             'help': 'show database information and exit'
-        }
+        },
+        ('-b', '--backend'): {
+            'default': settings.geocode.backend,
+            'choices': sorted(BACKENDS),
+            'help': 'reverse geocoder, local uses the offline gazetteer'
+        },
+        ('-w', '--workers'): {
+            'default': settings.geocode.workers,
+            'type': int,
+            'help': 'number of remote geocode requests kept in flight'
+        },
+        ('-d', '--distance'): {
+            'default': settings.geocode.cluster_distance,
+            'type': float,
+            'help': 'kilometers across events geocoded once (0 to disable)'
+        },
     }
 
     def handle(self, args):
-        self.session = create_session()
-        self.rate    = args.call_rate
-        self.limit   = self.real_limit(args.call_limit)
-
-        if self.rate > MAXIMUM_CALL_RATE:
-            raise ValueError(
-                "Call rate exceeds maximum call rate of {} requests per second"
-                .format(MAXIMUM_CALL_RATE)
-            )
+        self.session  = create_session()
+        self.geocoder = get_geocoder(args.backend, cached=False)
 
-        if self.limit > MAXIMUM_CALL_LIMIT:
-            raise ValueError(
-                "Call limit exeeds maximum limit of {} daily requests"
-                .format(MAXIMUM_CALL_LIMIT)
-            )
+        # Without a persistent cache, still share lookups of the same cell
+        self.cache    = get_geocode_cache() or GeocodeCache()
+
+        # Local geocoders have neither a rate limit nor a daily quota
+        self.rate     = args.call_rate
+        self.limit    = None
+
+        if self.geocoder.remote:
+            self.limit = self.real_limit(args.call_limit)
+
+            if self.rate > MAXIMUM_CALL_RATE:
+                raise ValueError(
+                    "Call rate exceeds maximum call rate of {} requests per second"
+                    .format(MAXIMUM_CALL_RATE)
+                )
+
+            if self.limit > MAXIMUM_CALL_LIMIT:
+                raise ValueError(
+                    "Call limit exeeds maximum limit of {} daily requests"
+                    .format(MAXIMUM_CALL_LIMIT)
+                )
+
+        # Pictures taken together are geocoded once as an event
+        self.events = self.get_events(args.distance)
 
         # Show database information
         self.show_info()
@@ -95,41 +130,146 @@ class GeocodeCommand(Command):
             # Exit if the info command is there
             return color_format("-- no geocoding executed --", colorama.Fore.MAGENTA)
 
+        if self.geocoder.remote:
+            self.runner = GeocodeRunner(self.geocoder, self.rate, workers=args.workers)
+            batch = settings.geocode.batch
+        else:
+            self.runner = None
+            batch = LOCAL_BATCH
+
+        # Set up action variables
+        self.errors = self.requests = 0
+        count = unknown = 0
+        log = None
+
         # Execute the geocoding
-        with Timer() as timer:
-            # Set up action variables
-            count = errors = 0
-            self.geocoder  = GoogleV3(api_key=settings.geocode.apikey)
-
-            for idx, record in enumerate(self.get_queryset()):
-                # Usage Limit Handling
-                current = idx + 1
-                if current > self.limit:
-                    break
-
-                # Rate Liimit Handling
-                if current % self.rate == 0:
-                    time.sleep(1)
-
-                try:
-                    self.handle_record(record)
-                    count += 1
-                except Exception as e:
-                    errors += 1
-                    print color_format(
-                        "Could not geocode ({}, {}): {}", colorama.Fore.RED,
-                        record.latitude, record.longitude, e
-                    )
-
-                    if args.traceback or errors > 10:
-                        raise
-
-        # Save log of geocoding
-        log = GeocodeTask(requests=count+errors, errors=errors, elapsed=timer.interval)
-        self.session.add(log)
+        try:
+            with Timer() as timer:
+                for events in chunked(self.events, batch):
+                    # Usage Limit Handling
+                    if self.limit is not None and self.requests >= self.limit:
+                        break
+
+                    geocoded = self.geocode_batch(events, args.traceback)
+                    count   += geocoded
+                    unknown += sum(len(members) for members, _, _ in events) - geocoded
+        finally:
+            # Save log of geocoding, even if it was aborted, so that the
+            # requests are counted against the limit of the next run
+            if self.geocoder.remote:
+                log = GeocodeTask(
+                    requests=self.requests, errors=self.errors, elapsed=timer.interval
+                )
+                session = create_session()
+                session.add(log)
+                session.commit()
+
+        output = [color_format(
+            "Geocoded {} records with the {} geocoder ({} not geocoded) in {}",
+            colorama.Fore.MAGENTA, count, self.geocoder.name, unknown,
+            humanizedelta(seconds=timer.interval)
+        )]
+
+        if log is not None:
+            output.append(color_format(str(log), colorama.Fore.MAGENTA))
+
+        return "\n".join(output)
+
+    def geocode_batch(self, events, traceback=False):
+        """
+        Geocodes a batch of (ids, latitude, longitude) events by the
+        coordinates of their representative picture, looking up each cell
+        that isn't in the geocode cache only once, then writes the location
+        of each event to all of its pictures in a single bulk update. Remote
+        lookups that find no address give an empty location, while pictures
+        that aren't near any place of a local geocoder are left for a remote
+        one. Returns the number of pictures whose location was written.
+
+        If too many lookups fail the error is raised, but only after the
+        addresses that were found have been cached and written, since the
+        remote lookups that were made have already been paid for.
+        """
+        members, latitude, longitude = zip(*events)
+        coordinates = zip(latitude, longitude)
+
+        cells  = self.cache.cells(coordinates)
+        cached = self.cache.get_cells(self.geocoder.name, cells)
+
+        # Look up the first coordinates of each cell that isn't cached
+        misses = {}
+        for coords, cell in zip(coordinates, cells):
+            if cell not in cached and cell not in misses:
+                misses[cell] = coords
+
+        jobs = misses.items()
+        if self.limit is not None:
+            jobs = jobs[:max(0, self.limit - self.requests)]
+
+        found   = {}
+        results = self.lookup(jobs)
+        try:
+            for cell, address, error in results:
+                if error is None:
+                    found[cell] = address
+                    continue
+
+                self.errors += 1
+                print color_format(
+                    "Could not geocode ({}, {}): {}", colorama.Fore.RED,
+                    misses[cell][0], misses[cell][1], error
+                )
+
+                if traceback or self.errors > MAXIMUM_ERRORS:
+                    raise error
+        finally:
+            # Stops any lookups in flight and counts the requests made
+            results.close()
+            written = self.save_batch(members, cells, cached, found)
+
+        return written
+
+    def save_batch(self, members, cells, cached, found):
+        """
+        Writes the addresses found for the cells to the geocode cache, then
+        writes the location of every event whose cell has an address to its
+        pictures in a single bulk update. Returns the number of pictures.
+        """
+        # Local misses depend on max_distance and are cheap to repeat
+        if not self.geocoder.remote:
+            found = {cell: address for cell, address in found.iteritems() if address}
+
+        self.cache.set_cells(self.geocoder.name, found)
+        cached.update(found)
+
+        now = tzaware_now()
+        mappings = [
+            {'id': pk, 'location': cached[cell] or u"", 'modified': now}
+            for ids, cell in zip(members, cells) if cell in cached for pk in ids
+        ]
+
+        self.session.bulk_update_mappings(Picture, mappings)
         self.session.commit()
+        return len(mappings)
 
-        return color_format(str(log), colorama.Fore.MAGENTA)
+    def lookup(self, jobs):
+        """
+        Yields (cell, address, error) triples for (cell, coordinates) jobs,
+        concurrently for remote geocoders and in one batch for local ones.
+        """
+        if self.runner is not None:
+            start = self.runner.requests
+            try:
+                for triple in self.runner.run(jobs):
+                    yield triple
+            finally:
+                self.requests += self.runner.requests - start
+            return
+
+        if jobs:
+            keys, coordinates = zip(*jobs)
+            self.requests += len(jobs)
+            for key, address in zip(keys, self.geocoder.reverse_many(coordinates)):
+                yield key, address, None
 
     def real_limit(self, limit):
         """
@@ -160,21 +300,68 @@ class GeocodeCommand(Command):
         # Compute number of pictures in database
         total   = self.session.query(Picture).count()
 
-        # Compute records requirements with database query
-        count   = self.get_queryset().count()
-        records = min(self.limit, count)
-        eta     = humanizedelta(seconds=float(records) / float(self.rate))
+        # Compute records requirements from the events to geocode
+        records = sum(len(members) for members, _, _ in self.events)
+        coordinates = [(latitude, longitude) for _, latitude, longitude in self.events]
+        cached, lookups = self.cache.coverage(self.geocoder.name, coordinates)
 
-        # Print information
         output = [
-            "{} of {} database records require geocoding".format(count, total),
-            "{} records can be geocoded in this run, taking approximately {}".format(
-                records, eta
+            "{} of {} database records require geocoding".format(records, total),
+            "{} events of pictures taken together are geocoded once each".format(
+                len(self.events)
             ),
+            "{} events can be satisfied by the geocode cache, the rest "
+            "require {} lookups".format(cached, lookups),
         ]
 
+        if not self.geocoder.remote:
+            output.append("all can be geocoded offline by the {} geocoder".format(
+                self.geocoder.name
+            ))
+        else:
+            records = min(self.limit, lookups)
+            eta     = humanizedelta(seconds=float(records) / float(self.rate))
+            output.append(
+                "{} lookups can be made in this run, taking approximately {}".format(
+                    records, eta
+                )
+            )
+
         print color_format("\n".join(output), colorama.Fore.CYAN)
 
+    def get_events(self, distance):
+        """
+        Clusters the pictures that require geocoding into events of pictures
+        taken together, returning a list of (ids, latitude, longitude) for
+        each event with the coordinates of its representative picture. With
+        no distance every picture is its own event.
+        """
+        query = self.get_queryset().with_entities(
+            Picture.id, Picture.latitude, Picture.longitude, Picture.date_taken
+        )
+
+        rows = query.all()
+        if not rows:
+            return []
+
+        ids, latitude, longitude, dates = zip(*rows)
+        if not distance:
+            return [((pk,), lat, lon) for pk, lat, lon in zip(ids, latitude, longitude)]
+
+        labels = cluster_events(
+            latitude, longitude, to_timestamps(dates),
+            distance, settings.geocode.cluster_gap,
+        )
+
+        members = [[] for _ in xrange(labels.max() + 1)]
+        for pk, label in zip(ids, labels.tolist()):
+            members[label].append(pk)
+
+        return [
+            (tuple(members[label]), latitude[idx], longitude[idx])
+            for label, idx in enumerate(representatives(latitude, longitude, labels).tolist())
+        ]
+
     def get_queryset(self):
         """
         Returns the records that require geocoding in the database.
@@ -185,11 +372,3 @@ class GeocodeCommand(Command):
         query   = query.filter(Picture.location.is_(None))
 
         return query
-
-    def handle_record(self, record):
-        query    = "{},{}".format(record.latitude, record.longitude)
-        result   = self.geocoder.reverse(query, exactly_one=True, sensor=False)
-
-        record.location = unicode(result.address) if result else u""
-        record.modified = tzaware_now()
-        self.session.add(record)
@@ -0,0 +1,90 @@
+# inigo.console.commands.near
+# Lists the pictures taken near a location.
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 15:41:09 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: near.py [] benjamin@bengfort.com $
+
+"""
+Lists the pictures taken near a location.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import colorama
+
+from inigo.spatial import near
+from inigo.exceptions import ConsoleError
+from inigo.models import Picture, create_session
+from inigo.console.utils import color_format
+from inigo.console.commands.base import Command
+from inigo.utils.decorators import Timer
+from inigo.utils.timez import humanizedelta
+
+##########################################################################
+## Command
+##########################################################################
+
+class NearCommand(Command):
+
+    name = "near"
+    help = "list the pictures taken near a latitude and longitude"
+
+    args = {
+        'coordinates': {
+            'nargs': 2,
+            'type': float,
+            'metavar': 'COORD',
+            'help': 'the latitude and longitude in decimal degrees'
+        },
+        ('-r', '--radius'): {
+            'type': float,
+            'default': 1.0,
+            'help': 'distance in kilometers around the location to search'
+        },
+        ('-n', '--limit'): {
+            'type': int,
+            'default': 20,
+            'help': 'maximum number of pictures to print (all if 0)'
+        },
+    }
+
+    def handle(self, args):
+        latitude, longitude = args.coordinates
+        if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            raise ConsoleError("{}, {} are not valid coordinates".format(latitude, longitude))
+
+        if args.radius <= 0:
+            raise ConsoleError("The radius must be greater than zero")
+
+        self.session = create_session()
+
+        with Timer() as timer:
+            found = near(self.session, latitude, longitude, args.radius)
+
+        shown    = found[:args.limit or None]
+        pictures = self.session.query(Picture).filter(
+            Picture.id.in_([picture_id for _, picture_id in shown])
+        ) if shown else []
+        pictures = {picture.id: picture for picture in pictures}
+
+        for distance, picture_id in shown:
+            picture = pictures[picture_id]
+            print color_format(
+                u"{:0.3f}km {} {}x{} {} {}", colorama.Fore.CYAN, distance,
+                picture.id, picture.width, picture.height,
+                picture.date_taken.strftime("%Y-%m-%d") if picture.date_taken else u"undated",
+                picture.get_relative_backup_path()
+            )
+
+        return color_format(
+            "Found {} pictures within {}km of {}, {} in {}", colorama.Fore.MAGENTA,
+            len(found), args.radius, latitude, longitude,
+            humanizedelta(seconds=timer.interval)
+        )
@@ -0,0 +1,144 @@
+# inigo.console.commands.thumbnails
+# Incrementally backfills the thumbnail cache from the database.
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 01:40:18 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: thumbnails.py [] benjamin@bengfort.com $
+
+"""
+Incrementally backfills the thumbnail cache from the database.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import colorama
+
+from itertools import islice
+from confire import ImproperlyConfigured
+
+from inigo.config import settings
+from inigo.models import Picture, create_session
+from inigo.thumbnails import ThumbnailCache, generate_thumbnails
+from inigo.console.utils import color_format, locate_picture
+from inigo.console.commands.base import Command
+from inigo.utils.decorators import Timer
+from inigo.utils.timez import humanizedelta
+
+from sqlalchemy import desc
+
+##########################################################################
+## Command
+##########################################################################
+
+class ThumbnailsCommand(Command):
+
+    name = "thumbnails"
+    help = "incrementally backfill the thumbnail cache from the database"
+
+    args = {
+        ('-s', '--sizes'): {
+            'type': int,
+            'nargs': '+',
+            'default': settings.thumbnails.sizes,
+            'help': 'longest side in pixels of each thumbnail size'
+        },
+        ('-w', '--workers'): {
+            'type': int,
+            'default': settings.thumbnails.workers,
+            'help': 'number of processes used to make thumbnails'
+        },
+        ('-n', '--limit'): {
+            'type': int,
+            'default': None,
+            'help': 'maximum number of pictures to make thumbnails of'
+        },
+        '--max-bytes': {
+            'type': int,
+            'default': settings.thumbnails.max_bytes,
+            'help': 'evict least recently used thumbnails beyond this size'
+        },
+        ('-e', '--evict'): {
+            'default': False,
+            'action': 'store_true',
+            'help': 'only evict thumbnails, do not make any new ones'
+        },
+    }
+
+    def handle(self, args):
+        self.session = create_session()
+        self.cache   = ThumbnailCache(max_bytes=args.max_bytes)
+        self.skipped = 0
+
+        try:
+            self.backupto = settings.drobo.get_drobo_path()
+        except ImproperlyConfigured:
+            self.backupto = None
+
+        output = []
+
+        if not args.evict:
+            with Timer() as timer:
+                count = errors = 0
+                jobs  = self.get_jobs(args.sizes)
+                if args.limit is not None:
+                    jobs = islice(jobs, args.limit)
+
+                for signature, error in generate_thumbnails(
+                        jobs, self.cache, args.sizes, args.workers,
+                        settings.thumbnails.quality):
+                    if error is None:
+                        count += 1
+                        continue
+
+                    errors += 1
+                    print color_format(
+                        "Could not make thumbnails of {}: {}", colorama.Fore.RED,
+                        signature, error
+                    )
+
+            output.append(color_format(
+                "Made thumbnails of {} pictures ({} errors, {} not found) in {}",
+                colorama.Fore.CYAN, count, errors, self.skipped,
+                humanizedelta(seconds=timer.interval)
+            ))
+
+            if self.cache.full():
+                output.append(color_format(
+                    "Stopped once the new thumbnails filled the {} byte cache",
+                    colorama.Fore.YELLOW, self.cache.max_bytes
+                ))
+
+        output.append(color_format(
+            "Evicted {} least recently used thumbnails", colorama.Fore.CYAN,
+            self.cache.evict()
+        ))
+
+        output.append(color_format(
+            "{} thumbnails ({} bytes) in cache at {}", colorama.Fore.MAGENTA,
+            len(self.cache), self.cache.size(), self.cache.root
+        ))
+
+        return "\n".join(output)
+
+    def get_jobs(self, sizes):
+        """
+        Yields (signature, path) jobs for the pictures, newest first, that
+        are missing thumbnails of any of the sizes in the cache.
+        """
+        query = self.session.query(Picture).order_by(desc(Picture.date_taken))
+        for picture in query.yield_per(1000):
+            if self.cache.has(picture.signature, sizes):
+                continue
+
+            path = locate_picture(picture, self.backupto)
+            if path is None:
+                self.skipped += 1
+                continue
+
+            yield picture.signature, path
@@ -0,0 +1,237 @@
+# inigo.console.commands.watch
+# Continuously backs up new images in a directory as they are added.
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sun Oct 18 21:14:52 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: watch.py [] benjamin@bengfort.com $
+
+"""
+Continuously backs up new images in a directory as they are added.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import time
+import errno
+import colorama
+
+from inigo.fs import Node, Directory
+from inigo.config import settings
+from inigo.utils import chunked
+from inigo.models import BackupTask, create_session
+from inigo.watch import TreeWatcher, Debouncer
+from inigo.snapshot import get_directory_snapshot
+from inigo.utils.decorators import Timer
+from inigo.console.utils import color_format
+from inigo.console.commands.backup import BackupCommand
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Errors that mean inotify can't be used to watch the tree
+WATCH_ERRORS = frozenset((errno.ENOSPC, errno.EMFILE, errno.ENOSYS))
+
+##########################################################################
+## Command
+##########################################################################
+
+class WatchCommand(BackupCommand):
+
+    name = "watch"
+    help = "continuously backs up new images in the given directory."
+
+    # Scans of the tree are always incremental in watch mode
+    args = {
+        key: val for key, val in BackupCommand.args.items()
+        if key != '--incremental'
+    }
+
+    args.update({
+        '--delay': {
+            'type': float,
+            'default': settings.watch.delay,
+            'help': 'Seconds a file must be quiet before it is backed up'
+        },
+        '--interval': {
+            'type': float,
+            'default': settings.watch.interval,
+            'help': 'Seconds between scans if the tree cannot be watched'
+        },
+    })
+
+    def handle(self, args):
+        self.prepare(args)
+        self.root      = Directory(args.path[0]).path
+        self.recursive = args.recursive
+        self.depth     = args.depth
+        self.totals    = [0, 0, 0]
+        self.snapshot  = get_directory_snapshot(self.name)
+
+        if self.snapshot is not None and args.rescan:
+            self.snapshot.clear()
+
+        watcher = None
+        try:
+            try:
+                # Watch before catching up on images added while not watching
+                watcher = TreeWatcher(self.root, self.recursive, self.depth)
+                print color_format(
+                    "Watching {} directories in {}", colorama.Fore.CYAN,
+                    len(watcher), self.root
+                )
+
+                self.scan()
+                self.watch(watcher, args.delay)
+            except (IOError, OSError) as e:
+                if e.errno not in WATCH_ERRORS:
+                    raise
+
+                print color_format(
+                    "Cannot watch {} ({}), scanning every {} seconds instead",
+                    colorama.Style.BRIGHT + colorama.Fore.YELLOW,
+                    self.root, e, args.interval
+                )
+
+                if watcher is not None:
+                    watcher.close()
+                self.poll(args.interval)
+
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if watcher is not None:
+                watcher.close()
+
+            # Watching only ends when it's interrupted
+            self.close_pool(terminate=True)
+            self.copier.flush()
+            if self.snapshot is not None:
+                self.snapshot.close()
+
+        count, duplicates, errors = self.totals
+        return color_format(
+            "Backed up {} of {} images ({} errors) while watching {}",
+            colorama.Fore.MAGENTA, count - duplicates - errors, count, errors, self.root
+        )
+
+    def watch(self, watcher, delay):
+        """
+        Reads events from the watcher, backing up images in batches once
+        they have been quiet for the delay. If the event queue overflows,
+        then events have been lost so the tree is scanned to catch up.
+        """
+        debouncer = Debouncer(delay)
+
+        while True:
+            debouncer.extend(watcher.read(debouncer.timeout()))
+            debouncer.touch(watcher.modified)
+            watcher.modified.clear()
+
+            if watcher.overflowed:
+                watcher.overflowed = False
+                self.scan()
+
+            ready = debouncer.ready()
+            if ready:
+                self.backup_ready(ready, len(debouncer))
+
+    def poll(self, interval):
+        """
+        Scans the tree for new images every interval seconds, starting right
+        away since images may have been added (or left in the debouncer) if
+        the tree stopped being watched.
+        """
+        while True:
+            self.scan()
+            time.sleep(interval)
+
+    def scan(self):
+        """
+        Performs an incremental backup of the tree, which only lists the
+        directories that have changed since the last successful scan.
+        """
+        with Timer() as timer:
+            result = self.backup(self.root, self.recursive, self.depth, self.snapshot)
+            self.copier.flush()
+
+        if self.snapshot is not None:
+            if result[2]:
+                self.snapshot.rollback()
+            else:
+                self.snapshot.commit()
+
+        self.report(result, timer.interval)
+
+    def backup_ready(self, ready, queued):
+        """
+        Backs up the images among the (path, first seen) pairs that are
+        ready, reporting the number of paths still queued and the lag: how
+        long ago the oldest of the images was first seen.
+        """
+        images = [path for path, first in ready if self.isimage(path)]
+        if not images:
+            return
+
+        if self.scheduler is not None:
+            images = self.scheduler.sort(images)
+
+        session = create_session()
+        result  = [0, 0, 0]
+
+        with Timer() as timer:
+            for batch in chunked(images, settings.hashing.batch):
+                for idx, val in enumerate(self.backup_batch(batch, session)):
+                    result[idx] += val
+                session.commit()
+            self.copier.flush()
+
+        lag = time.time() - min(first for path, first in ready)
+        self.report(result, timer.interval, queued, lag)
+
+    def isimage(self, path):
+        """
+        Checks if the path is still an image, since it may have been removed
+        or renamed after its events were seen.
+        """
+        try:
+            return os.path.isfile(path) and Node(path).isimage()
+        except (IOError, OSError):
+            return False
+
+    def report(self, result, elapsed, queued=None, lag=None):
+        """
+        Logs the backup task and prints a line reporting the results along
+        with the queue depth and lag of watched images.
+        """
+        count, duplicates, errors = result
+        for idx, val in enumerate(result):
+            self.totals[idx] += val
+
+        if not count:
+            return
+
+        log = BackupTask(
+            backups=count - duplicates - errors, duplicates=duplicates,
+            errors=errors, elapsed=elapsed
+        )
+
+        session = create_session()
+        session.add(log)
+        session.commit()
+
+        output = color_format(str(log), colorama.Fore.MAGENTA)
+        if queued is not None:
+            output += color_format(
+                " (queue depth {}, lag {:0.1f} seconds)", colorama.Fore.CYAN,
+                queued, lag
+            )
+
+        print output
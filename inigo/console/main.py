@@ -38,7 +38,14 @@ COMMANDS    = [
     DebugCommand,
     IdentifyTypesCommand,
     BackupCommand,
+    WatchCommand,
     GeocodeCommand,
+    CacheCommand,
+    BenchmarkCommand,
+    ThumbnailsCommand,
+    DuplicatesCommand,
+    CoordinatesCommand,
+    NearCommand,
 ]
 
 ##########################################################################
@@ -17,8 +17,14 @@ Console utility functions and helpers
 ## Imports
 ##########################################################################
 
+import os
 import colorama
 
+from inigo.fs import Node
+from inigo.models import STYPE
+from inigo.exceptions import ConsoleError
+from inigo.snapshot import get_directory_snapshot
+
 ##########################################################################
 ## Console colors
 ##########################################################################
@@ -29,3 +35,49 @@ def color_format(string, color, *args, **kwargs):
     """
     string = string.format(*args, **kwargs)
     return color + string + colorama.Fore.RESET
+
+##########################################################################
+## Directory snapshots
+##########################################################################
+
+def get_walk_snapshot(scope, incremental=False, rescan=False):
+    """
+    Returns the directory snapshot for an incremental walk or None if the
+    walk is not incremental. On rescan the snapshot is cleared so that the
+    walk lists every directory (and records them all in the snapshot).
+    """
+    if not (incremental or rescan):
+        return None
+
+    snapshot = get_directory_snapshot(scope)
+    if snapshot is None:
+        raise ConsoleError("Directory snapshots are disabled in the configuration")
+
+    if rescan:
+        snapshot.clear()
+    return snapshot
+
+##########################################################################
+## Picture files
+##########################################################################
+
+def locate_picture(picture, backupto=None):
+    """
+    Returns a readable path of the picture, preferring its backup in the
+    backup location (if given) and otherwise any original stored on this
+    host, or None if no copy of the picture can be found on this host.
+    """
+    if backupto is not None:
+        path = os.path.join(backupto, picture.get_relative_backup_path())
+        if os.path.exists(path):
+            return path
+
+    hostname = unicode(Node(".").hostname)
+    for storage in picture.storages:
+        if storage.stype != STYPE.ORIGINAL or storage.hostname != hostname:
+            continue
+
+        if os.path.exists(storage.filepath):
+            return storage.filepath
+
+    return None
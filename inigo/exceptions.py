@@ -37,6 +37,12 @@ class PictureNotFound(InigoException):
     """
     pass
 
+class VerificationError(InigoException):
+    """
+    The data written to the destination does not match its signature
+    """
+    pass
+
 class ConsoleError(InigoException):
     """
     Captured on the command line for user feedback purposes
@@ -0,0 +1,325 @@
+# inigo.exif
+# Reads image dimensions and EXIF meta data directly from file headers
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sun Oct 18 23:27:40 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: exif.py [] benjamin@bengfort.com $
+
+"""
+Reads image dimensions and EXIF meta data directly from file headers.
+
+Opening an image with Pillow and calling _getexif decodes every tag in the
+file, but inigo only needs the dimensions, the date the picture was taken
+and its GPS coordinates. For a JPEG these are found in the APP1 (EXIF)
+segment and the start of frame (SOF) marker at the start of the file, and
+for TIFF based RAW formats (e.g. CR2, NEF, DNG) in the first IFD and the
+EXIF and GPS IFDs that it points to. The parser reads only these parts of
+the file; if it can't make sense of them then read_info returns None and
+the caller should fall back to Pillow.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import io
+import struct
+
+from collections import namedtuple
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# JPEG start of frame markers that contain the image dimensions
+SOF_MARKERS = frozenset((
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF,
+))
+
+# JPEG markers that have no length or payload
+STANDALONE_MARKERS = frozenset([0x01, 0xD8] + range(0xD0, 0xD8))
+
+# JPEG markers after which no more headers are found (SOS, EOI)
+END_MARKERS = frozenset((0xDA, 0xD9))
+
+# TIFF tags in the first IFD and in the EXIF and GPS IFDs
+TAG_IMAGE_WIDTH    = 0x0100
+TAG_IMAGE_LENGTH   = 0x0101
+TAG_EXIF_IFD       = 0x8769
+TAG_GPS_IFD        = 0x8825
+TAG_DATE_ORIGINAL  = 0x9003
+TAG_GPS_LAT_REF    = 0x0001
+TAG_GPS_LAT        = 0x0002
+TAG_GPS_LON_REF    = 0x0003
+TAG_GPS_LON        = 0x0004
+
+# TIFF field types mapped to their struct format
+TIFF_TYPES = {
+    1: "B",   # BYTE
+    2: "s",   # ASCII
+    3: "H",   # SHORT
+    4: "I",   # LONG
+    5: "II",  # RATIONAL
+    7: "s",   # UNDEFINED
+    9: "i",   # SLONG
+    10: "ii", # SRATIONAL
+}
+
+# IFDs with more entries than this are assumed to be corrupt
+MAX_IFD_ENTRIES = 1024
+
+##########################################################################
+## Image Info
+##########################################################################
+
+# The date taken is the raw EXIF DateTimeOriginal string
+ImageInfo = namedtuple("ImageInfo", "width height date_taken latitude longitude")
+
+##########################################################################
+## TIFF Parsing
+##########################################################################
+
+class TiffReader(object):
+    """
+    Reads entries from the IFDs of a TIFF structure in the file, where all
+    offsets are relative to the base (the TIFF header) in the file.
+    """
+
+    def __init__(self, f, base=0):
+        self.f    = f
+        self.base = base
+
+        f.seek(base)
+        order = f.read(2)
+        if order == b"II":
+            self.order = "<"
+        elif order == b"MM":
+            self.order = ">"
+        else:
+            raise ValueError("Not a TIFF byte order mark")
+
+        # Magic is 42 for TIFF, but some RAW formats use their own value
+        magic, self.ifd0 = self.unpack("HI", f.read(6))
+
+    def unpack(self, fmt, data):
+        return struct.unpack(self.order + fmt, data)
+
+    def ifd(self, offset):
+        """
+        Returns a dict of tag to (type, count, data) for the IFD at offset,
+        where data is the raw four byte value or offset of the entry.
+        """
+        self.f.seek(self.base + offset)
+        count, = self.unpack("H", self.f.read(2))
+        if count > MAX_IFD_ENTRIES:
+            raise ValueError("IFD has too many entries")
+
+        data = self.f.read(count * 12)
+        entries = {}
+        for idx in xrange(count):
+            entry = data[idx*12:(idx+1)*12]
+            tag, kind, num = self.unpack("HHI", entry[:8])
+            entries[tag] = (kind, num, entry[8:])
+        return entries
+
+    def value(self, entry):
+        """
+        Decodes the values of an IFD entry, returning a string for ASCII and
+        UNDEFINED entries and a tuple of numbers (or pairs) otherwise.
+        """
+        kind, count, data = entry
+        if kind not in TIFF_TYPES:
+            raise ValueError("Unknown TIFF field type {}".format(kind))
+
+        fmt  = TIFF_TYPES[kind]
+        size = struct.calcsize(self.order + fmt) * count
+        if size > 4:
+            offset, = self.unpack("I", data)
+            self.f.seek(self.base + offset)
+            data = self.f.read(size)
+        else:
+            data = data[:size]
+
+        if fmt == "s":
+            return data.rstrip(b"\x00 ")
+
+        values = self.unpack(fmt * count, data)
+        if len(fmt) == 2:
+            return tuple(zip(values[0::2], values[1::2]))
+        return values
+
+    def get(self, entries, tag):
+        """
+        Returns the decoded value of the tag or None if it's not present.
+        """
+        if tag not in entries:
+            return None
+        return self.value(entries[tag])
+
+
+def to_degrees(value, ref, positive):
+    """
+    Converts an EXIF (degrees, minutes, seconds) rational triple to decimal
+    degrees, which are negative unless the ref is the positive hemisphere.
+    """
+    deg, mns, sec = [float(num) / float(den) for num, den in value[:3]]
+    degrees = deg + (mns / 60.0) + (sec / 3600.0)
+    if ref != positive:
+        return 0 - degrees
+    return degrees
+
+
+def read_tiff(reader, fields):
+    """
+    Reads the dimensions, date taken and coordinates from the first IFD
+    of the TIFF and the EXIF and GPS IFDs it points to into fields.
+    """
+    ifd0 = reader.ifd(reader.ifd0)
+
+    for tag, key in ((TAG_IMAGE_WIDTH, 'width'), (TAG_IMAGE_LENGTH, 'height')):
+        value = reader.get(ifd0, tag)
+        if value:
+            fields.setdefault(key, value[0])
+
+    if TAG_EXIF_IFD in ifd0:
+        exif = reader.ifd(reader.get(ifd0, TAG_EXIF_IFD)[0])
+        date = reader.get(exif, TAG_DATE_ORIGINAL)
+        if date:
+            fields['date_taken'] = date
+
+    if TAG_GPS_IFD in ifd0:
+        gps = reader.ifd(reader.get(ifd0, TAG_GPS_IFD)[0])
+        lat = reader.get(gps, TAG_GPS_LAT)
+        lon = reader.get(gps, TAG_GPS_LON)
+        lat_ref = reader.get(gps, TAG_GPS_LAT_REF)
+        lon_ref = reader.get(gps, TAG_GPS_LON_REF)
+
+        if lat and lon and lat_ref and lon_ref:
+            # Keep the raw rationals for batch decoding (see inigo.gps)
+            fields['gps'] = (lat, lat_ref, lon, lon_ref)
+            try:
+                fields['latitude']  = to_degrees(lat, lat_ref, b"N")
+                fields['longitude'] = to_degrees(lon, lon_ref, b"E")
+            except ZeroDivisionError:
+                fields.pop('latitude', None)
+
+##########################################################################
+## File Parsing
+##########################################################################
+
+def parse_jpeg(f):
+    """
+    Reads the segments of a JPEG up to the start of frame, parsing the EXIF
+    data in the APP1 segment and the dimensions in the SOF segment.
+    """
+    if f.read(2) != b"\xff\xd8":
+        raise ValueError("Not a JPEG file")
+
+    fields = {}
+    while True:
+        prefix = f.read(1)
+        if prefix != b"\xff":
+            raise ValueError("Expected a JPEG marker")
+
+        # Markers may be preceded by any number of fill bytes
+        marker = ord(f.read(1) or b"\x00")
+        while marker == 0xFF:
+            marker = ord(f.read(1) or b"\x00")
+
+        if marker in STANDALONE_MARKERS:
+            continue
+
+        if marker in END_MARKERS:
+            raise ValueError("No start of frame marker before the scan")
+
+        length, = struct.unpack(">H", f.read(2))
+        if length < 2:
+            raise ValueError("Invalid JPEG segment length")
+
+        if marker in SOF_MARKERS:
+            fields['height'], fields['width'] = struct.unpack(">xHH", f.read(5))
+            return fields
+
+        if marker == 0xE1 and 'exif' not in fields:
+            payload = f.read(length - 2)
+            if payload.startswith(b"Exif\x00\x00"):
+                fields['exif'] = True
+                read_tiff(TiffReader(io.BytesIO(payload[6:])), fields)
+            continue
+
+        f.seek(length - 2, io.SEEK_CUR)
+
+
+def parse_tiff(f):
+    """
+    Reads the first IFD of a TIFF based image along with its EXIF and GPS
+    IFDs. Most RAW formats store their full size dimensions here.
+    """
+    fields = {}
+    read_tiff(TiffReader(f), fields)
+    return fields
+
+
+def parse_fields(f):
+    """
+    Returns a dict of the fields parsed from the headers of the JPEG or TIFF
+    based image in the seekable file object, or None if the file is another
+    format or its headers could not be parsed.
+    """
+    header = f.read(4)
+    f.seek(0)
+
+    if header[:3] == b"\xff\xd8\xff":
+        parse = parse_jpeg
+    elif header in (b"II*\x00", b"MM\x00*"):
+        parse = parse_tiff
+    else:
+        return None
+
+    try:
+        return parse(f)
+    except (ValueError, TypeError, IndexError, ZeroDivisionError, struct.error):
+        return None
+
+
+def parse_info(f):
+    """
+    Returns the ImageInfo of the JPEG or TIFF based image in the seekable
+    file object from its headers, or None if the file is another format,
+    the headers could not be parsed, or the dimensions weren't found (the
+    caller should then fall back to Pillow, which handles many more cases).
+    """
+    fields = parse_fields(f)
+    if not fields or not fields.get('width') or not fields.get('height'):
+        return None
+
+    return ImageInfo(
+        fields['width'], fields['height'], fields.get('date_taken'),
+        fields.get('latitude'), fields.get('longitude'),
+    )
+
+
+def read_info(path):
+    """
+    Opens the image at the path and returns its ImageInfo, or None if the
+    headers of the image could not be parsed (see parse_info).
+    """
+    with io.open(path, 'rb') as f:
+        return parse_info(f)
+
+
+def read_gps(path):
+    """
+    Returns the raw (latitude, latitude ref, longitude, longitude ref) GPS
+    tags of the image at the path, where the latitude and longitude are
+    tuples of (numerator, denominator) rationals, or None if the image has
+    no GPS tags or its headers could not be parsed.
+    """
+    with io.open(path, 'rb') as f:
+        fields = parse_fields(f)
+    return fields.get('gps') if fields else None
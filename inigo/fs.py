@@ -18,15 +18,24 @@ Implements local file system operations
 ##########################################################################
 
 import os
-import magic
-import base64
+import stat
+import errno
 import shutil
-import hashlib
 
 from urlparse import urljoin
 from inigo.exceptions import *
+from inigo.sniff import detector
+from inigo.transfer import get_copy_engine
+from inigo.hashing import DEFAULT_CHECKSUM
+from inigo.hashing import get_algorithm, compute_digests, compute_sample
 from inigo.utils.decorators import memoized
 from inigo.utils.uname import hostname
+from inigo.walk import ParallelWalker
+
+try:
+    from os import scandir
+except ImportError:
+    from scandir import scandir
 
 ##########################################################################
 ## Helper Methods
@@ -40,17 +49,33 @@ def normalize_path(path):
     path = os.path.expandvars(path)
     return os.path.abspath(path)
 
+
+def guess_mimetype(path, key=None):
+    """
+    Guesses the mimetype of the file at the given path from its header,
+    using libmagic only for unrecognized headers. If a key such as the
+    (device, inode, mtime, size) of the file is given, then the result is
+    memoized; the device is needed since inodes are only unique per device.
+    """
+    return detector(path, key)
+
 ##########################################################################
 ## Node
 ##########################################################################
 
 class Node(object):
     """
-    Wraps os calls around a path.
+    Wraps os calls around a path. Nodes that are created while scanning a
+    directory hold on to the DirEntry from scandir, which caches the type
+    and stat information of the path so that they don't require syscalls.
     """
 
-    def __init__(self, path):
-        self.path = normalize_path(path)
+    def __init__(self, path, entry=None):
+        if entry is not None:
+            self.path = entry.path
+        else:
+            self.path = normalize_path(path)
+        self.entry = entry
 
     @property
     def hostname(self):
@@ -75,33 +100,46 @@ class Node(object):
 
     def stat(self):
         """
-        Call os.stat on the path
+        Call os.stat on the path (or use the stat cached on the DirEntry)
         """
+        if self.entry is not None:
+            return self.entry.stat()
         return os.stat(self.path)
 
-    def copy(self, dst):
+    def copy(self, dst, engine=None):
         """
-        Copy this node from it's current location to the destination.
+        Copy this node from it's current location to the destination using
+        the copy engine (by default the engine configured in the settings).
         Returns a new Node for the destination object.
         """
         directory = os.path.dirname(dst)
         if not os.path.exists(directory):
             os.makedirs(directory)
 
-        shutil.copy(self.path, dst)
-        shutil.copystat(self.path, dst)
+        engine = engine or get_copy_engine()
+        engine.copy(self.path, dst)
         return self.__class__(dst)
 
-    def move(self, dst):
+    def move(self, dst, engine=None):
         """
-        Move this node from it's current location to the destination.
-        Returns a new Node for the destination object.
+        Move this node from it's current location to the destination. If the
+        destination is on another device the node is copied with the copy
+        engine then removed. Returns a new Node for the destination object.
         """
         directory = os.path.dirname(dst)
         if not os.path.exists(directory):
             os.makedirs(directory)
 
-        shutil.move(self.path, dst)
+        try:
+            os.rename(self.path, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+
+            engine = engine or get_copy_engine()
+            engine.copy(self.path, dst)
+            self.remove()
+
         return self.__class__(dst)
 
     def remove(self):
@@ -120,12 +158,16 @@ class Node(object):
         """
         Checks if this is a File
         """
+        if self.entry is not None:
+            return self.entry.is_file()
         return os.path.isfile(self.path)
 
     def isdir(self):
         """
         Checks if this is a Directory
         """
+        if self.entry is not None:
+            return self.entry.is_dir()
         return os.path.isdir(self.path)
 
     def isimage(self):
@@ -133,8 +175,9 @@ class Node(object):
         Checks if this is an Image
         """
         if self.isfile():
-            meta = FileMeta(self.path)
-            if meta.mimetype.startswith('image'):
+            st  = self.stat()
+            key = (st.st_dev, st.st_ino, st.st_mtime, st.st_size)
+            if guess_mimetype(self.path, key).startswith('image'):
                 return True
         return False
 
@@ -143,10 +186,10 @@ class Node(object):
         Converts the node into the appropriate subclass
         """
         if self.isdir():
-            return Directory(self.path)
+            return Directory(self.path, entry=self.entry)
 
         if self.isfile():
-            return FileMeta(self.path)
+            return FileMeta(self.path, entry=self.entry)
 
     def __str__(self):
         return self.path
@@ -173,23 +216,59 @@ class FileMeta(Node):
 
         return cls(path, **kwargs)
 
-    def __init__(self, path, signature='sha256'):
-        super(FileMeta, self).__init__(path)
+    def __init__(self, path, signature='sha256', digest=None, cache=None, entry=None,
+                 checksum=DEFAULT_CHECKSUM, chkdigest=None):
+        """
+        Instantiate a file with a path and the name of the hash algorithm
+        used to compute its signature. If the signature has already been
+        computed (e.g. by the hashing engine) pass it as the digest so that
+        the file is not read again when the signature is accessed. If a
+        signature cache is passed in, it is consulted before hashing. The
+        checksum is the name of a fast algorithm whose digest is computed
+        from the same read as the signature, e.g. for verifying copies; if
+        it has already been computed too, pass it as the chkdigest.
+        """
+        super(FileMeta, self).__init__(path, entry)
 
-        if not os.path.isfile(self.path):
+        if not self.isfile():
             raise NotAFile("The specified path, '%s' is not a file", self.path)
 
-        if signature not in hashlib.algorithms:
-            raise TypeError('"%s" is not a valid hash algorithm', signature)
+        self.sigalg = get_algorithm(signature)
+        self.signame = signature
+        self.sigcache = cache
+        self.chkalg = get_algorithm(checksum)
+        self.chkname = checksum
+
+        if digest is not None:
+            self._signature = unicode(digest)
+
+        if chkdigest is not None:
+            self._checksum = unicode(chkdigest)
+
+    def has_signature(self):
+        """
+        Checks if the signature is already known, i.e. if it was passed in,
+        loaded or computed, so that accessing it won't read the file.
+        """
+        return hasattr(self, '_signature')
 
-        self.sigalg = getattr(hashlib, signature)
+    def load_digests(self, digests):
+        """
+        Sets the memoized signature and checksum from a dict of the digest
+        of each algorithm computed elsewhere, e.g. by the hashing engine.
+        """
+        if self.signame in digests:
+            self._signature = unicode(digests[self.signame])
+        if self.chkname in digests:
+            self._checksum = unicode(digests[self.chkname])
 
     @memoized
     def mimetype(self):
         """
-        Uses libmagic to guess the mimetype of the file
+        Sniffs the header (or uses libmagic) to guess the mimetype of the file
         """
-        return magic.from_file(self.path, mime=True)
+        st = self.stat()
+        return guess_mimetype(self.path, (st.st_dev, st.st_ino, st.st_mtime, st.st_size))
 
     @memoized
     def filesize(self):
@@ -198,17 +277,73 @@ class FileMeta(Node):
         """
         return self.stat().st_size
 
+    @memoized
+    def digests(self):
+        """
+        Computes the b64 encoded signature and checksum of the file from a
+        single read, returning a dict of the digest of each algorithm. The
+        signature is written to the signature cache if one was supplied.
+        """
+        st = self.stat()
+        digests = compute_digests(self.path, (self.signame, self.chkname))
+        if self.sigcache is not None:
+            self.sigcache.set(
+                self.path, digests[self.signame], st, chkdigest=digests[self.chkname]
+            )
+        return digests
+
     @memoized
     def signature(self):
         """
-        Computes the b64 encoded sha256 hash of the file
+        Computes the b64 encoded sha256 hash of the file, using the signature
+        cache if one has been supplied to avoid reading unchanged files.
+        """
+        if self.sigcache is not None:
+            sig = self.sigcache.get(self.path, self.stat())
+            if sig is not None:
+                return sig
+        return self.digests[self.signame]
+
+    @memoized
+    def checksum(self):
+        """
+        Computes the b64 encoded fast (non-cryptographic) hash of the file
+        """
+        return self.digests[self.chkname]
+
+    @memoized
+    def sample(self):
+        """
+        Computes the b64 encoded hash of the size, head, and tail of the file
         """
-        with open(self.path, 'rb') as f:
-            sig = self.sigalg()
-            chk = sig.block_size * 256
-            for chunk in iter(lambda: f.read(chk), b''):
-                sig.update(chunk)
-        return unicode(base64.b64encode(sig.digest()))
+        return compute_sample(self.path, self.signame)
+
+    def copy_hashed(self, dst, engine=None):
+        """
+        Copy this file to the destination while computing its digests from
+        the data that is written, so the file is only read once. The digests
+        are memoized (and cached) then the new FileMeta for dst is returned.
+        """
+        directory = os.path.dirname(dst)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # Stat before the copy, in case the file changes while it's read
+        st = self.stat()
+
+        engine = engine or get_copy_engine()
+        self._digests = engine.copy_digests(self.path, dst, (self.signame, self.chkname))
+        self._signature = self._digests[self.signame]
+        self._checksum  = self._digests[self.chkname]
+
+        if self.sigcache is not None:
+            self.sigcache.set(self.path, self._signature, st, chkdigest=self._checksum)
+
+        copied = self.__class__(
+            dst, self.signame, digest=self._signature, checksum=self.chkname
+        )
+        copied._digests = dict(self._digests)
+        return copied
 
 ##########################################################################
 ## Directory
@@ -228,48 +363,134 @@ class Directory(Node):
             os.makedirs(path)
         return cls(path, **kwargs)
 
-    def __init__(self, path, recursive=False, maxdepth=None):
+    def __init__(self, path, recursive=False, maxdepth=None, entry=None, snapshot=None,
+                 workers=1, ordered=False):
         """
         Instantiate a directory with a path. Recursive means that listing
-        the directory will walk the tree from the directory root.
+        the directory will walk the tree from the directory root. If a
+        directory snapshot is passed in, the walk is incremental: only the
+        directories that have changed since the snapshot are listed. With
+        more than one worker, directories are listed concurrently; ordered
+        walks yield them in the same order as a serial walk.
         """
-        super(Directory, self).__init__(path)
+        super(Directory, self).__init__(path, entry)
 
-        if not os.path.isdir(self.path):
+        if not self.isdir():
             raise NotADirectory("The specified path, '%s' is not a directory", self.path)
 
         self.recursive = recursive
         self.maxdepth  = maxdepth
+        self.snapshot  = snapshot
+        self.workers   = workers
+        self.ordered   = ordered
 
 
     def list(self):
         """
         List the contents of the directory
         """
+        for entry in self.entries():
+            if entry.is_dir():
+                yield Directory(entry.path, entry=entry)
+            else:
+                yield FileMeta(entry.path, entry=entry)
+
+    def scan(self):
+        """
+        List the contents of the directory as lightweight node records that
+        can be promoted to full nodes only when their meta data is required.
+        """
+        for entry in self.entries():
+            yield NodeRecord.from_entry(entry)
 
-        if self.maxdepth is None and not self.recursive:
-            self.maxdepth = 0
+    def entries(self):
+        """
+        Yields the DirEntry of every path in the directory, walking the tree
+        according to the recursive and maxdepth settings of the directory.
+        """
+        maxdepth = self.maxdepth
+        if maxdepth is None and not self.recursive:
+            maxdepth = 0
 
-        for dirname, dirs, files, depth in self.walk():
+        for dirname, dirs, files, depth in self.walk(maxdepth):
 
             for dir in dirs:
-                yield Directory(os.path.join(dirname, dir))
+                yield dir
 
             for fle in files:
-                yield FileMeta(os.path.join(dirname, fle))
+                yield fle
 
-            if self.maxdepth is not None and depth == self.maxdepth:
-                dirs[:] = [] # Don't recurse any deeper
+    def walk(self, maxdepth=None):
+        """
+        Walks the tree down to the maxdepth (or the entire tree if None),
+        yielding (name, dirs, files, depth) for every directory. If the
+        directory has more than one worker, the walk is parallel.
+        """
+        if self.workers > 1:
+            return iter(ParallelWalker(
+                self.path, self.listdir, self.workers, maxdepth, self.ordered
+            ))
+        return self.walk_serial(maxdepth)
 
-    def walk(self):
+    def walk_serial(self, maxdepth=None):
         """
-        Overrides the os.walk and also provides a depth
+        Replaces os.walk with a top down walk built on scandir that also
+        provides a depth. Rather than names, the dirs and files lists contain
+        the DirEntry objects for the directory, which cache the type and
+        stat data of each path. As with os.walk, the dirs list can be
+        modified in place to prune the directories that will be visited.
+
+        In an incremental walk, directories that haven't changed since the
+        snapshot are not listed: they are yielded without any files and with
+        the subdirectories recorded in the snapshot, so that only the new
+        and changed directories in the tree have their files yielded.
         """
-        startdepth = self.path.count(os.sep)
-        for name, dirs, files in os.walk(self.path):
-            depth = name.count(os.sep) - startdepth
+        stack = [(self.path, 0)]
+        while stack:
+            name, depth = stack.pop()
+
+            try:
+                dirs, files = self.listdir(name)
+            except OSError:
+                continue
+
             yield name, dirs, files, depth
 
+            if maxdepth is not None and depth >= maxdepth:
+                continue # Don't recurse any deeper
+
+            # Push in reverse to visit subdirectories in listing order
+            for entry in reversed(dirs):
+                if not entry.is_symlink():
+                    stack.append((entry.path, depth + 1))
+
+    def listdir(self, name):
+        """
+        Returns the DirEntry objects of the directories and files in the
+        named directory. If the walk is incremental and the directory hasn't
+        changed, the directories come from the snapshot and files is empty;
+        otherwise the directory is listed and recorded in the snapshot.
+        """
+        if self.snapshot is not None:
+            st = os.stat(name)
+            subdirs = self.snapshot.get(name, st)
+            if subdirs is not None:
+                return [SnapshotEntry(os.path.join(name, sub)) for sub in subdirs], []
+
+        dirs  = []
+        files = []
+        for entry in scandir(name):
+            if entry.is_dir():
+                dirs.append(entry)
+            else:
+                files.append(entry)
+
+        if self.snapshot is not None:
+            subdirs = [entry.name for entry in dirs if not entry.is_symlink()]
+            self.snapshot.record(name, st, subdirs, len(dirs) + len(files))
+
+        return dirs, files
+
     def copy(self, dst):
         """
         Copy this node from it's current location to the destination.
@@ -278,6 +499,48 @@ class Directory(Node):
         shutil.copytree(self.path, dst)
         return self.__class__(dst)
 
+    def move(self, dst, engine=None):
+        """
+        Move this node from it's current location to the destination. If the
+        destination is on another device the files of the tree are copied
+        with the copy engine then the tree is removed. Returns a new Node for
+        the destination object.
+        """
+        directory = os.path.dirname(dst)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        try:
+            os.rename(self.path, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+
+            self.copy_tree(dst, engine or get_copy_engine())
+            self.remove(force=True)
+
+        return self.__class__(dst)
+
+    def copy_tree(self, dst, engine):
+        """
+        Copies the tree to the destination, which must not exist, copying
+        every file with the copy engine and recreating symbolic links.
+        """
+        for root, dirs, files in os.walk(self.path):
+            target = os.path.join(dst, os.path.relpath(root, self.path))
+            os.makedirs(target)
+
+            for name in dirs + files:
+                src = os.path.join(root, name)
+                if os.path.islink(src):
+                    os.symlink(os.readlink(src), os.path.join(target, name))
+                elif name in files:
+                    engine.copy(src, os.path.join(target, name))
+
+        # Directory times are set last since copying into them changes them
+        for root, dirs, files in os.walk(self.path, topdown=False):
+            shutil.copystat(root, os.path.join(dst, os.path.relpath(root, self.path)))
+
     def remove(self, force=False):
         """
         Deletes the path from disk. If force is true, then uses rmtree.
@@ -289,4 +552,112 @@ class Directory(Node):
         os.rmdir(self.path)
 
     def __len__(self):
-        return len(list(self.list()))
+        return sum(1 for entry in self.entries())
+
+##########################################################################
+## Node Record
+##########################################################################
+
+class NodeRecord(object):
+    """
+    A compact record of a path discovered while scanning a directory. Unlike
+    nodes, records have no instance dictionary or memoized attributes so
+    that very large scans can be held in memory. Use promote to convert the
+    record into a full node when its meta data is needed.
+    """
+
+    __slots__ = ('path', 'size', 'mtime', 'dev', 'inode', 'mode')
+
+    @classmethod
+    def from_entry(cls, entry):
+        """
+        Creates a record from a DirEntry, using its cached stat data.
+        """
+        try:
+            st = entry.stat()
+        except OSError:
+            # Broken symbolic links can only be stat'd directly
+            st = entry.stat(follow_symlinks=False)
+
+        return cls(entry.path, st.st_size, st.st_mtime, st.st_dev, st.st_ino, st.st_mode)
+
+    def __init__(self, path, size, mtime, dev, inode, mode):
+        self.path  = path
+        self.size  = size
+        self.mtime = mtime
+        self.dev   = dev
+        self.inode = inode
+        self.mode  = mode
+
+    def isfile(self):
+        return stat.S_ISREG(self.mode)
+
+    def isdir(self):
+        return stat.S_ISDIR(self.mode)
+
+    def isimage(self):
+        """
+        Checks if this is an Image without promoting the record
+        """
+        if not self.isfile():
+            return False
+        return guess_mimetype(self.path, self.key).startswith('image')
+
+    @property
+    def key(self):
+        """
+        The (device, inode, mtime, size) key of the mimetype memo
+        """
+        return (self.dev, self.inode, self.mtime, self.size)
+
+    def promote(self, klass=None, **kwargs):
+        """
+        Converts the record into a Directory or FileMeta, or into the node
+        class that is passed in (e.g. ImageMeta) with the given kwargs.
+        """
+        if klass is None:
+            klass = Directory if self.isdir() else FileMeta
+        return klass(self.path, **kwargs)
+
+    def __str__(self):
+        return self.path
+
+    def __repr__(self):
+        return "<%s: %s>" % (self.__class__.__name__, self.path)
+
+##########################################################################
+## Snapshot Entry
+##########################################################################
+
+class SnapshotEntry(object):
+    """
+    Stands in for the DirEntry of a subdirectory of an unchanged directory
+    during an incremental walk, since the parent directory isn't listed.
+    """
+
+    __slots__ = ('path', 'name', '_stat')
+
+    def __init__(self, path):
+        self.path  = path
+        self.name  = os.path.basename(path)
+        self._stat = None
+
+    def is_dir(self, follow_symlinks=True):
+        return True
+
+    def is_file(self, follow_symlinks=True):
+        return False
+
+    def is_symlink(self):
+        return False
+
+    def stat(self, follow_symlinks=True):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+    def __str__(self):
+        return self.path
+
+    def __repr__(self):
+        return "<%s: %s>" % (self.__class__.__name__, self.path)
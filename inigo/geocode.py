@@ -0,0 +1,800 @@
+# inigo.geocode
+# Pluggable reverse geocoding backends, including an offline gazetteer
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 11:04:37 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: geocode.py [] benjamin@bengfort.com $
+
+"""
+Pluggable reverse geocoding backends, including an offline gazetteer.
+
+The Google backend makes one rate limited API request per coordinate. The
+local backend instead loads a places dataset (e.g. the GeoNames cities1000
+dump, or any CSV with name, latitude and longitude columns) into a KD-tree
+and finds the nearest place to a whole batch of coordinates at once with
+NumPy, so the entire backlog can be geocoded without touching the network.
+
+The places are indexed as points on the unit sphere, where the straight
+line (chord) distance between two points increases with the great circle
+distance between them, so there are no special cases at the poles or the
+antimeridian.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import io
+import os
+import csv
+import time
+import random
+import sqlite3
+import threading
+import numpy as np
+
+from inigo.config import settings
+from inigo.utils import chunked
+from inigo.geohash import encode_many
+from multiprocessing.pool import ThreadPool
+from geopy.geocoders import GoogleV3
+from geopy.exc import GeocoderQuotaExceeded, GeocoderTimedOut, GeocoderUnavailable
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Mean radius of the Earth in kilometers
+EARTH_RADIUS = 6371.0088
+
+# Maximum number of places in a leaf of the KD-tree
+DEFAULT_LEAFSIZE = 16
+
+# Number of queries searched in the KD-tree at a time, bounding memory
+QUERY_CHUNKSIZE = 8192
+
+# Columns of the tab separated GeoNames dumps (e.g. cities1000.txt)
+GEONAMES_NAME      = 1
+GEONAMES_LATITUDE  = 4
+GEONAMES_LONGITUDE = 5
+GEONAMES_COUNTRY   = 8
+GEONAMES_ADMIN1    = 10
+
+# Errors of remote geocoders after which the lookup is retried with backoff
+RETRY_ERRORS = (GeocoderQuotaExceeded, GeocoderTimedOut, GeocoderUnavailable)
+
+# Maximum number of host parameters in a single SQLite statement
+MAX_VARIABLES = 500
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocodes (
+    backend     TEXT NOT NULL,
+    cell        TEXT NOT NULL,
+    address     TEXT NOT NULL,
+    created     INTEGER NOT NULL,
+    PRIMARY KEY (backend, cell)
+)
+"""
+
+# Header names accepted for each column of a CSV gazetteer
+CSV_COLUMNS = {
+    'name': ('name', 'asciiname', 'place', 'city'),
+    'latitude': ('latitude', 'lat'),
+    'longitude': ('longitude', 'lon', 'lng'),
+    'admin1': ('admin1', 'admin1_code', 'region', 'state', 'province'),
+    'country': ('country', 'country_code', 'cc'),
+}
+
+##########################################################################
+## Geometry
+##########################################################################
+
+def to_cartesian(latitude, longitude):
+    """
+    Returns an (n, 3) array of the points on the unit sphere at arrays of
+    latitudes and longitudes in decimal degrees.
+    """
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lon = np.radians(np.asarray(longitude, dtype=np.float64))
+    cos = np.cos(lat)
+    return np.column_stack((cos * np.cos(lon), cos * np.sin(lon), np.sin(lat)))
+
+
+def chord_to_km(chord):
+    """
+    Converts chord distances between points on the unit sphere to great
+    circle distances in kilometers on the surface of the Earth.
+    """
+    return 2 * EARTH_RADIUS * np.arcsin(np.minimum(np.asarray(chord) / 2.0, 1.0))
+
+##########################################################################
+## KD-Tree
+##########################################################################
+
+class KDTree(object):
+    """
+    A KD-tree over an (n, k) array of points that finds the nearest point to
+    each of an (m, k) array of queries. The tree is stored in flat arrays
+    rather than node objects so that queries can be searched together with
+    NumPy: every query first descends to its leaf for an upper bound on the
+    distance to its nearest point, then all (query, node) pairs are expanded
+    a level at a time, pruning the subtrees that cannot be any closer.
+    """
+
+    def __init__(self, points, leafsize=DEFAULT_LEAFSIZE):
+        self.points = np.asarray(points, dtype=np.float64)
+        if self.points.ndim != 2 or not len(self.points):
+            raise ValueError("KDTree requires a non-empty (n, k) array of points")
+
+        self.leafsize = leafsize
+        self.index    = np.arange(len(self.points))
+        nodes = []
+
+        def build(start, stop):
+            node = len(nodes)
+            nodes.append(None)
+
+            if stop - start <= leafsize:
+                nodes[node] = (-1, 0.0, -1, -1, start, stop)
+                return node
+
+            # Split the widest dimension at the median
+            idx = self.index[start:stop]
+            pts = self.points[idx]
+            dim = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+            mid = (stop - start) // 2
+
+            part = np.argpartition(pts[:, dim], mid)
+            self.index[start:stop] = idx[part]
+            split = pts[part[mid], dim]
+
+            left  = build(start, start + mid)
+            right = build(start + mid, stop)
+            nodes[node] = (dim, split, left, right, start, stop)
+            return node
+
+        build(0, len(self.points))
+
+        dims, splits, lefts, rights, starts, stops = zip(*nodes)
+        self.dim   = np.array(dims, dtype=np.intp)
+        self.split = np.array(splits, dtype=np.float64)
+        self.left  = np.array(lefts, dtype=np.intp)
+        self.right = np.array(rights, dtype=np.intp)
+
+        # Pad the points of every leaf to the leaf size, infinitely far away
+        leaves = np.flatnonzero(self.dim < 0)
+        self.leaf = np.full(len(nodes), -1, dtype=np.intp)
+        self.leaf[leaves] = np.arange(len(leaves))
+
+        self.leaf_index  = np.full((len(leaves), leafsize), -1, dtype=np.intp)
+        self.leaf_points = np.full(
+            (len(leaves), leafsize, self.points.shape[1]), np.inf, dtype=np.float64
+        )
+        for idx, node in enumerate(leaves.tolist()):
+            members = self.index[starts[node]:stops[node]]
+            self.leaf_index[idx, :len(members)] = members
+            self.leaf_points[idx, :len(members)] = self.points[members]
+
+    def query(self, queries, chunksize=QUERY_CHUNKSIZE):
+        """
+        Returns the distance to and the index of the nearest point to each of
+        the queries as two arrays.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float64))
+        distances = np.empty(len(queries), dtype=np.float64)
+        nearest   = np.empty(len(queries), dtype=np.intp)
+
+        for lo in xrange(0, len(queries), chunksize):
+            hi = lo + chunksize
+            distances[lo:hi], nearest[lo:hi] = self._query(queries[lo:hi])
+
+        return np.sqrt(distances), nearest
+
+    def _query(self, queries):
+        """
+        Returns the squared distance to and the index of the nearest point to
+        each of the queries, searching all the queries together.
+        """
+        count = len(queries)
+
+        # Descend to the leaf of each query for an upper bound
+        node = np.zeros(count, dtype=np.intp)
+        while True:
+            inner = np.flatnonzero(self.dim[node] >= 0)
+            if not len(inner):
+                break
+            parent = node[inner]
+            right  = queries[inner, self.dim[parent]] >= self.split[parent]
+            node[inner] = np.where(right, self.right[parent], self.left[parent])
+
+        best, nearest = self._search_leaves(queries, np.arange(count), node)
+
+        # Expand (query, node) pairs that may contain a nearer point
+        qs    = np.arange(count)
+        nodes = np.zeros(count, dtype=np.intp)
+        bound = np.zeros(count, dtype=np.float64)
+
+        while len(qs):
+            keep = bound < best[qs]
+            qs, nodes, bound = qs[keep], nodes[keep], bound[keep]
+
+            leaf = self.dim[nodes] < 0
+            if leaf.any():
+                lq = qs[leaf]
+                dist, idx = self._search_leaves(queries, lq, nodes[leaf])
+
+                better = dist < best[lq]
+                lq, dist, idx = lq[better], dist[better], idx[better]
+
+                # Keep only the nearest of the leaves of each query
+                order = np.lexsort((dist, lq))
+                lq, dist, idx = lq[order], dist[order], idx[order]
+                first = np.ones(len(lq), dtype=bool)
+                first[1:] = lq[1:] != lq[:-1]
+
+                best[lq[first]]    = dist[first]
+                nearest[lq[first]] = idx[first]
+
+                qs, nodes, bound = qs[~leaf], nodes[~leaf], bound[~leaf]
+
+            if not len(qs):
+                break
+
+            diff  = queries[qs, self.dim[nodes]] - self.split[nodes]
+            right = diff >= 0
+            near  = np.where(right, self.right[nodes], self.left[nodes])
+            far   = np.where(right, self.left[nodes], self.right[nodes])
+
+            # The far side is at least as far away as the splitting plane
+            qs    = np.concatenate((qs, qs))
+            bound = np.concatenate((bound, np.maximum(bound, diff * diff)))
+            nodes = np.concatenate((near, far))
+
+        return best, nearest
+
+    def _search_leaves(self, queries, qs, nodes):
+        """
+        Returns the squared distance to and the index of the nearest point in
+        each of the leaf nodes to each of the queries with the indices qs.
+        """
+        leaves = self.leaf[nodes]
+        dist   = self.leaf_points[leaves] - queries[qs][:, np.newaxis, :]
+        dist   = np.einsum('ijk,ijk->ij', dist, dist)
+
+        closest = dist.argmin(axis=1)
+        rows    = np.arange(len(leaves))
+        return dist[rows, closest], self.leaf_index[leaves, closest]
+
+    def __len__(self):
+        return len(self.points)
+
+##########################################################################
+## Gazetteer
+##########################################################################
+
+def read_gazetteer(path):
+    """
+    Reads a places dataset, either a tab separated GeoNames dump or a CSV
+    with a header row, returning a list of the address of each place along
+    with arrays of their latitudes and longitudes.
+    """
+    with io.open(path, 'rb') as f:
+        first = f.readline().split(b"\t")[0].strip()
+
+    # GeoNames dumps have no header and start with the numeric geonameid
+    if first.isdigit():
+        rows = read_geonames(path)
+    else:
+        rows = read_csv_gazetteer(path)
+
+    addresses, latitude, longitude = [], [], []
+    for name, lat, lon, admin1, country in rows:
+        addresses.append(u", ".join(part for part in (name, admin1, country) if part))
+        latitude.append(lat)
+        longitude.append(lon)
+
+    return (
+        addresses,
+        np.array(latitude, dtype=np.float64),
+        np.array(longitude, dtype=np.float64),
+    )
+
+
+def read_geonames(path):
+    """
+    Yields (name, latitude, longitude, admin1, country) rows from a tab
+    separated GeoNames dump, skipping malformed lines.
+    """
+    with io.open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            fields = line.rstrip(u"\n").split(u"\t")
+            try:
+                yield (
+                    fields[GEONAMES_NAME],
+                    float(fields[GEONAMES_LATITUDE]),
+                    float(fields[GEONAMES_LONGITUDE]),
+                    fields[GEONAMES_ADMIN1],
+                    fields[GEONAMES_COUNTRY],
+                )
+            except (IndexError, ValueError):
+                continue
+
+
+def read_csv_gazetteer(path):
+    """
+    Yields (name, latitude, longitude, admin1, country) rows from a comma
+    or tab separated file with a header row, skipping malformed rows.
+    """
+    with io.open(path, 'rb') as f:
+        dialect = csv.Sniffer().sniff(f.readline(), delimiters=",\t;")
+        f.seek(0)
+
+        reader  = csv.reader(f, dialect)
+        header  = [column.strip().lower() for column in next(reader)]
+        columns = {}
+        for key, names in CSV_COLUMNS.iteritems():
+            for name in names:
+                if name in header:
+                    columns[key] = header.index(name)
+                    break
+
+        for key in ('name', 'latitude', 'longitude'):
+            if key not in columns:
+                raise ValueError("Gazetteer has no {} column".format(key))
+
+        def get(row, key):
+            if key not in columns or columns[key] >= len(row):
+                return u""
+            return row[columns[key]].decode('utf-8').strip()
+
+        for row in reader:
+            try:
+                yield (
+                    get(row, 'name'),
+                    float(get(row, 'latitude')),
+                    float(get(row, 'longitude')),
+                    get(row, 'admin1'),
+                    get(row, 'country'),
+                )
+            except ValueError:
+                continue
+
+##########################################################################
+## Geocoders
+##########################################################################
+
+class Geocoder(object):
+    """
+    Base class of the reverse geocoding backends. Remote geocoders make rate
+    limited requests against a daily quota, local geocoders don't. The number
+    of coordinates looked up by the geocoder is counted in requests.
+    """
+
+    name   = None
+    remote = False
+    requests = 0
+
+    def reverse(self, latitude, longitude):
+        """
+        Returns the address at the coordinates or None if not found.
+        """
+        raise NotImplementedError("Geocoders must implement reverse")
+
+    def reverse_many(self, coordinates):
+        """
+        Returns a list of the address (or None) of each (lat, lon) pair.
+        """
+        return [self.reverse(lat, lon) for lat, lon in coordinates]
+
+
+class GoogleGeocoder(Geocoder):
+    """
+    Reverse geocodes with the Google Maps API, one request per coordinate.
+    """
+
+    name   = "google"
+    remote = True
+
+    def __init__(self, apikey=None, **kwargs):
+        # Keyword arguments (e.g. domain and scheme) are passed to GoogleV3
+        self.client = GoogleV3(api_key=apikey or settings.geocode.apikey, **kwargs)
+
+    def reverse(self, latitude, longitude):
+        self.requests += 1
+        query  = "{},{}".format(latitude, longitude)
+        result = self.client.reverse(query, exactly_one=True, sensor=False)
+        return unicode(result.address) if result else None
+
+
+class LocalGeocoder(Geocoder):
+    """
+    Reverse geocodes offline to the nearest place in a local gazetteer, as
+    long as it's within max_distance kilometers of the coordinates.
+    """
+
+    name   = "local"
+    remote = False
+
+    def __init__(self, gazetteer=None, max_distance=None):
+        self.gazetteer = os.path.expanduser(gazetteer or settings.geocode.gazetteer)
+        self.max_distance = (
+            max_distance if max_distance is not None else settings.geocode.max_distance
+        )
+
+        if not os.path.exists(self.gazetteer):
+            raise ValueError(
+                "Could not find the gazetteer at {!r}".format(self.gazetteer)
+            )
+
+        self.addresses, latitude, longitude = read_gazetteer(self.gazetteer)
+        if not self.addresses:
+            raise ValueError("No places found in {!r}".format(self.gazetteer))
+
+        self.tree = KDTree(to_cartesian(latitude, longitude))
+
+    def nearest(self, latitude, longitude):
+        """
+        Returns the great circle distances in kilometers to and the indices
+        of the nearest places to arrays of latitudes and longitudes.
+        """
+        chord, nearest = self.tree.query(to_cartesian(latitude, longitude))
+        return chord_to_km(chord), nearest
+
+    def reverse(self, latitude, longitude):
+        return self.reverse_many([(latitude, longitude)])[0]
+
+    def reverse_many(self, coordinates):
+        if not len(coordinates):
+            return []
+
+        self.requests += len(coordinates)
+        latitude, longitude = zip(*coordinates)
+        distance, nearest = self.nearest(latitude, longitude)
+
+        return [
+            self.addresses[idx] if not self.max_distance or km <= self.max_distance else None
+            for km, idx in zip(distance.tolist(), nearest.tolist())
+        ]
+
+    def __len__(self):
+        return len(self.addresses)
+
+
+class CachedGeocoder(Geocoder):
+    """
+    Wraps a geocoder so that coordinates in a cell of the geocode cache that
+    has already been geocoded are answered from the cache, and only one
+    coordinate per cell is passed on to the backend. The number of lookups
+    made by the backend is counted in requests and answers from the cache
+    in hits.
+    """
+
+    def __init__(self, geocoder, cache):
+        self.geocoder = geocoder
+        self.cache    = cache
+        self.requests = 0
+        self.hits     = 0
+
+    @property
+    def name(self):
+        return self.geocoder.name
+
+    @property
+    def remote(self):
+        return self.geocoder.remote
+
+    def reverse(self, latitude, longitude):
+        return self.reverse_many([(latitude, longitude)])[0]
+
+    def reverse_many(self, coordinates):
+        if not len(coordinates):
+            return []
+
+        cells  = self.cache.cells(coordinates)
+        cached = self.cache.get_cells(self.name, cells)
+        self.hits += sum(1 for cell in cells if cell in cached)
+
+        # Geocode the first coordinates of each cell that isn't cached
+        misses = {}
+        for coords, cell in zip(coordinates, cells):
+            if cell not in cached and cell not in misses:
+                misses[cell] = coords
+
+        if misses:
+            keys = list(misses)
+            self.requests += len(keys)
+            found = dict(zip(keys, self.geocoder.reverse_many([misses[key] for key in keys])))
+
+            # Local misses depend on max_distance and are cheap to repeat
+            if not self.remote:
+                found = {cell: address for cell, address in found.iteritems() if address}
+
+            self.cache.set_cells(self.name, found)
+            cached.update(found)
+
+        # Empty addresses are cached to avoid repeating failed lookups
+        return [cached.get(cell) or None for cell in cells]
+
+
+# Geocoder backends by name
+BACKENDS = {
+    GoogleGeocoder.name: GoogleGeocoder,
+    LocalGeocoder.name: LocalGeocoder,
+}
+
+# Geocoders are expensive to create (e.g. loading a gazetteer) so are shared
+_geocoders = {}
+
+
+def get_geocoder(backend=None, cached=True):
+    """
+    Returns the shared geocoder of the named backend, by default the backend
+    in the geocode settings. Unless cached is False the geocoder consults
+    the geocode cache first, if it hasn't been disabled in the settings.
+    """
+    backend = backend or settings.geocode.backend
+    if backend not in BACKENDS:
+        raise ValueError("Unknown geocoder backend {!r}".format(backend))
+
+    if backend not in _geocoders:
+        _geocoders[backend] = BACKENDS[backend]()
+
+    if not cached or not settings.geocode.cache:
+        return _geocoders[backend]
+
+    if (backend, cached) not in _geocoders:
+        _geocoders[(backend, cached)] = CachedGeocoder(
+            _geocoders[backend], get_geocode_cache()
+        )
+    return _geocoders[(backend, cached)]
+
+##########################################################################
+## Geocode Cache
+##########################################################################
+
+def get_geocode_cache():
+    """
+    Returns the geocode cache specified by the settings, or None if the
+    geocode cache has been disabled in the configuration.
+    """
+    if not settings.geocode.cache:
+        return None
+    return GeocodeCache(settings.geocode.cache, settings.geocode.cache_precision)
+
+
+class GeocodeCache(object):
+    """
+    Wraps a SQLite database that stores the address found by each backend
+    for the geohash cell of the coordinates that were geocoded, so that all
+    coordinates in the same cell (e.g. photos taken at home) share a single
+    lookup. Cells are geohashes of the given precision, 7 characters is a
+    cell about 150m across. Note that SQLite connections may only be used
+    by the thread that created them.
+    """
+
+    def __init__(self, path=":memory:", precision=7):
+        if path != ":memory:":
+            path = os.path.abspath(os.path.expanduser(path))
+            directory = os.path.dirname(path)
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+
+        self.path = path
+        self.precision = precision
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(CACHE_SCHEMA)
+        self.conn.commit()
+
+    def cells(self, coordinates):
+        """
+        Returns the list of the cell of each (lat, lon) pair.
+        """
+        if not len(coordinates):
+            return []
+        latitude, longitude = zip(*coordinates)
+        return encode_many(latitude, longitude, self.precision)
+
+    def get(self, backend, latitude, longitude):
+        """
+        Returns the cached address of the cell of the coordinates, which is
+        empty if the backend found no address, or None if not cached.
+        """
+        cell = self.cells([(latitude, longitude)])[0]
+        return self.get_cells(backend, [cell]).get(cell)
+
+    def get_cells(self, backend, cells):
+        """
+        Bulk lookup of cells, returning a dictionary of cell to address for
+        every one of the cells that is in the cache.
+        """
+        found = {}
+        for chunk in chunked(set(cells), MAX_VARIABLES):
+            query = (
+                "SELECT cell, address FROM geocodes "
+                "WHERE backend=? AND cell IN ({})"
+            ).format(",".join("?" * len(chunk)))
+
+            found.update(self.conn.execute(query, [backend] + chunk))
+
+        return found
+
+    def set(self, backend, latitude, longitude, address):
+        """
+        Stores the address (None if there isn't one) of the coordinates.
+        """
+        cell = self.cells([(latitude, longitude)])[0]
+        self.set_cells(backend, {cell: address})
+
+    def set_cells(self, backend, addresses):
+        """
+        Stores a dictionary of cell to address in a single transaction.
+        """
+        now = int(time.time())
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO geocodes VALUES (?,?,?,?)", [
+                (backend, cell, address or u"", now)
+                for cell, address in addresses.iteritems()
+            ]
+        )
+        self.conn.commit()
+
+    def coverage(self, backend, coordinates):
+        """
+        Returns the number of the (lat, lon) pairs that are in cached cells
+        along with the number of distinct cells of the remaining pairs, the
+        number of lookups required to geocode all of them.
+        """
+        cells  = self.cells(coordinates)
+        cached = self.get_cells(backend, cells)
+        hits   = sum(1 for cell in cells if cell in cached)
+        return hits, len(set(cells) - set(cached))
+
+    def invalidate(self, backend=None):
+        """
+        Removes the entries of the backend, or all entries if no backend is
+        given. Returns the number of entries that were removed.
+        """
+        if backend is None:
+            cursor = self.conn.execute("DELETE FROM geocodes")
+        else:
+            cursor = self.conn.execute("DELETE FROM geocodes WHERE backend=?", (backend,))
+
+        self.conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        """
+        Closes the connection to the cache database.
+        """
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM geocodes").fetchone()[0]
+
+    def __repr__(self):
+        return "<{}: {}>".format(self.__class__.__name__, self.path)
+
+##########################################################################
+## Concurrent Geocoding
+##########################################################################
+
+class TokenBucket(object):
+    """
+    Thread safe token bucket that limits calls to rate per second on average
+    while allowing bursts of up to capacity calls. Rather than polling, each
+    call to acquire reserves the next token (the bucket may go negative) and
+    sleeps until it is due, so waiting threads are served in order.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.time, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("Rate must be a positive number of calls per second")
+
+        self.rate     = float(rate)
+        self.capacity = float(capacity or rate)
+        self.clock    = clock
+        self.sleep    = sleep
+        self.tokens   = self.capacity
+        self.updated  = clock()
+        self.lock     = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes a token from the bucket, blocking until one is available.
+        Returns the number of seconds spent waiting.
+        """
+        with self.lock:
+            now = self.clock()
+            self.tokens  = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = max(0.0, -self.tokens / self.rate)
+
+        if wait:
+            self.sleep(wait)
+        return wait
+
+
+class GeocodeRunner(object):
+    """
+    Geocodes many coordinates with a remote geocoder, keeping up to workers
+    requests in flight while a token bucket holds them to rate requests per
+    second. Lookups that fail because of the quota, a timeout or an outage
+    are retried after an exponential backoff (with jitter); once the retries
+    of a quota error are exhausted the quota is assumed to be used up and
+    the remaining lookups fail immediately.
+    """
+
+    def __init__(self, geocoder, rate, workers=None, retries=None, backoff=None,
+                 max_backoff=60.0, bucket=None, sleep=time.sleep):
+        self.geocoder = geocoder
+        self.bucket   = bucket or TokenBucket(rate, sleep=sleep)
+        self.workers  = workers or settings.geocode.workers
+        self.retries  = retries if retries is not None else settings.geocode.retries
+        self.backoff  = backoff if backoff is not None else settings.geocode.backoff
+        self.max_backoff = max_backoff
+        self.sleep    = sleep
+
+        self.lock      = threading.Lock()
+        self.requests  = 0
+        self.exhausted = None
+
+    def lookup(self, latitude, longitude):
+        """
+        Returns the address of the coordinates, retrying with backoff.
+        """
+        for attempt in xrange(self.retries + 1):
+            if self.exhausted is not None:
+                raise self.exhausted
+
+            self.bucket.acquire()
+            with self.lock:
+                self.requests += 1
+
+            try:
+                return self.geocoder.reverse(latitude, longitude)
+            except RETRY_ERRORS as e:
+                if attempt == self.retries:
+                    if isinstance(e, GeocoderQuotaExceeded):
+                        self.exhausted = e
+                    raise
+
+                delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+                self.sleep(delay + random.uniform(0, self.backoff))
+
+    def _lookup_job(self, job):
+        """
+        Worker function that returns a (key, address, error) triple for a
+        (key, (latitude, longitude)) job, where error is None on success.
+        """
+        key, (latitude, longitude) = job
+        try:
+            return key, self.lookup(latitude, longitude), None
+        except Exception as e:
+            return key, None, e
+
+    def run(self, jobs):
+        """
+        Geocodes every (key, (latitude, longitude)) job, yielding (key,
+        address, error) triples in completion order.
+        """
+        # Don't bother spinning up a pool for serial geocoding
+        if self.workers == 1:
+            for job in jobs:
+                yield self._lookup_job(job)
+            return
+
+        pool = ThreadPool(self.workers)
+        try:
+            for triple in pool.imap_unordered(self._lookup_job, jobs):
+                yield triple
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
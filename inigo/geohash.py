@@ -0,0 +1,194 @@
+# inigo.geohash
+# Vectorized geohash encoding of coordinates and cell coverings
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 13:10:26 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: geohash.py [] benjamin@bengfort.com $
+
+"""
+Vectorized geohash encoding of coordinates and cell coverings.
+
+A geohash names a cell of a grid over the Earth: the bits of the cell
+alternately halve the longitude and latitude ranges (starting with the
+longitude) and every five bits are written as a base 32 character, so that
+nearby coordinates share a prefix and each extra character shrinks the cell
+by a factor of 32. At a precision of 7 characters cells are about 150m
+across, at 5 about 5km.
+
+Since a cell is a prefix of every geohash inside it, the geohashes stored
+with pictures can be searched by prefix with an ordinary btree index. A
+circle is covered by the cell it's centered in and that cell's neighbors,
+as long as the cells are at least as wide and tall as the radius.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import math
+import numpy as np
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+BASE32 = b"0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Precisions beyond 12 characters need more than 64 bits
+MAX_PRECISION = 12
+
+# Kilometers per degree of latitude on a sphere the size of the Earth
+KM_PER_DEGREE = 111.195
+
+##########################################################################
+## Encoding
+##########################################################################
+
+def encode_many(latitude, longitude, precision=7):
+    """
+    Returns a list of the geohashes of arrays of latitudes and longitudes in
+    decimal degrees, computed with NumPy for all the coordinates at once.
+    """
+    if not 0 < precision <= MAX_PRECISION:
+        raise ValueError("Precision must be between 1 and {}".format(MAX_PRECISION))
+
+    latitude  = np.asarray(latitude, dtype=np.float64).ravel()
+    longitude = np.asarray(longitude, dtype=np.float64).ravel()
+
+    bits     = 5 * precision
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+
+    # Quantize each coordinate to the cells along its axis
+    lon = np.floor((longitude + 180.0) / 360.0 * (1 << lon_bits))
+    lat = np.floor((latitude + 90.0) / 180.0 * (1 << lat_bits))
+    lon = np.clip(lon, 0, (1 << lon_bits) - 1).astype(np.uint64)
+    lat = np.clip(lat, 0, (1 << lat_bits) - 1).astype(np.uint64)
+
+    # Interleave the bits, most significant first, starting with longitude
+    value = np.zeros(len(lon), dtype=np.uint64)
+    one   = np.uint64(1)
+    for bit in xrange(bits):
+        if bit % 2 == 0:
+            source, shift = lon, lon_bits - 1 - bit // 2
+        else:
+            source, shift = lat, lat_bits - 1 - bit // 2
+        value = (value << one) | ((source >> np.uint64(shift)) & one)
+
+    # Write every five bits as a base 32 character
+    shifts = np.arange(precision - 1, -1, -1, dtype=np.uint64) * np.uint64(5)
+    groups = (value[:, np.newaxis] >> shifts) & np.uint64(31)
+    chars  = np.frombuffer(BASE32, dtype=np.uint8)[groups.astype(np.intp)]
+
+    return [
+        cell.decode('ascii') for cell in
+        np.ascontiguousarray(chars).view("S{}".format(precision)).ravel().tolist()
+    ]
+
+
+def encode(latitude, longitude, precision=7):
+    """
+    Returns the geohash of the coordinates in decimal degrees.
+    """
+    return encode_many([latitude], [longitude], precision)[0]
+
+
+def cell_size(precision):
+    """
+    Returns the (height, width) in degrees of the cells of the precision.
+    """
+    bits = 5 * precision
+    return 180.0 / (1 << (bits // 2)), 360.0 / (1 << ((bits + 1) // 2))
+
+
+def bounds(cell):
+    """
+    Returns the (south, west, north, east) bounds of the cell in degrees.
+    """
+    value = 0
+    for char in cell:
+        index = BASE32.find(char.encode('ascii'))
+        if index < 0:
+            raise ValueError("{!r} is not a geohash".format(cell))
+        value = (value << 5) | index
+
+    # Split the interleaved bits back into longitude and latitude
+    bits = 5 * len(cell)
+    lon = lat = 0
+    for bit in xrange(bits):
+        if (value >> (bits - 1 - bit)) & 1:
+            if bit % 2 == 0:
+                lon |= 1 << ((bits + 1) // 2 - 1 - bit // 2)
+            else:
+                lat |= 1 << (bits // 2 - 1 - bit // 2)
+
+    height, width = cell_size(len(cell))
+    south, west = lat * height - 90.0, lon * width - 180.0
+    return south, west, south + height, west + width
+
+
+def neighbors(cell):
+    """
+    Returns the set of the (up to 8) cells around the cell, wrapping around
+    the antimeridian; there are no cells beyond the poles.
+    """
+    south, west, north, east = bounds(cell)
+    height, width = north - south, east - west
+    latitude, longitude = south + height / 2, west + width / 2
+
+    found = set()
+    for dlat in (-height, 0, height):
+        lat = latitude + dlat
+        if not -90 < lat < 90:
+            continue
+        for dlon in (-width, 0, width):
+            lon = (longitude + dlon + 180.0) % 360.0 - 180.0
+            found.add(encode(lat, lon, len(cell)))
+
+    found.discard(cell)
+    return found
+
+
+def cover(latitude, longitude, radius):
+    """
+    Returns a sorted list of the cells that together cover the circle of
+    radius kilometers around the coordinates: the cell of the coordinates
+    and its neighbors at the finest precision whose cells are at least the
+    radius high and wide. Returns None if no precision is coarse enough,
+    e.g. for huge radii or circles around a pole.
+    """
+    reach = radius / KM_PER_DEGREE
+    polar = abs(latitude) + reach
+    if polar >= 90:
+        return None
+
+    # Cells are narrowest on the side of the circle nearest the pole
+    scale = math.cos(math.radians(polar)) * KM_PER_DEGREE
+
+    for precision in xrange(MAX_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        if height * KM_PER_DEGREE >= radius and width * scale >= radius:
+            cell = encode(latitude, longitude, precision)
+            return sorted(neighbors(cell) | {cell})
+
+    return None
+
+
+def prefix_range(prefix):
+    """
+    Returns the (lower, upper) bounds of the geohashes that start with the
+    prefix, where lower <= geohash < upper (upper is None after the last
+    cell), so that prefixes can be searched as ranges of a btree index.
+    """
+    chars = list(prefix)
+    while chars:
+        index = BASE32.find(chars[-1].encode('ascii'))
+        if index < len(BASE32) - 1:
+            chars[-1] = BASE32[index + 1:index + 2].decode('ascii')
+            return prefix, u"".join(chars)
+        chars.pop()
+    return prefix, None
@@ -0,0 +1,281 @@
+# inigo.gps
+# Vectorized decoding and validation of GPS coordinates in bulk
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 09:12:44 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: gps.py [] benjamin@bengfort.com $
+
+"""
+Vectorized decoding and validation of GPS coordinates in bulk.
+
+EXIF stores a latitude or longitude as three (numerator, denominator)
+rationals for degrees, minutes and seconds along with a ref that gives the
+hemisphere (N/S or E/W). Rather than converting each image's rationals in
+Python, the rationals of many images are stacked into (n, 3, 2) arrays and
+converted with NumPy in one shot. Since cameras write all sorts of garbage
+when they don't have a fix, every coordinate is validated and flagged, and
+only coordinates without flags should be stored.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import numpy as np
+import multiprocessing
+
+from collections import namedtuple
+from inigo.exif import read_gps
+from inigo.models import Picture
+from inigo.geohash import encode_many, MAX_PRECISION
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Flags of invalid coordinates, which may be combined
+GPS_VALID         = 0
+GPS_MISSING       = 1     # The image has no GPS tags
+GPS_ZERO_DIVISION = 2     # A rational has a zero denominator
+GPS_OUT_OF_RANGE  = 4     # Minutes or seconds >= 60 or degrees out of range
+GPS_BAD_REF       = 8     # The ref is not a hemisphere of the coordinate
+GPS_NULL_ISLAND   = 16    # Exactly (0, 0), written by devices without a fix
+
+GPS_FLAGS = (
+    (GPS_MISSING, "missing"),
+    (GPS_ZERO_DIVISION, "zero division"),
+    (GPS_OUT_OF_RANGE, "out of range"),
+    (GPS_BAD_REF, "bad ref"),
+    (GPS_NULL_ISLAND, "null island"),
+)
+
+# Number of images sent to each GPS reading worker at a time
+DEFAULT_CHUNKSIZE = 64
+
+# Decoded coordinates are NaN wherever the flags are not GPS_VALID
+Coordinates = namedtuple("Coordinates", "latitude longitude flags")
+
+##########################################################################
+## Decoding
+##########################################################################
+
+def stack_gps(values):
+    """
+    Stacks a sequence of raw GPS tuples as returned by read_gps (None for
+    images without GPS tags) into the arrays expected by decode_coordinates,
+    returning (lat, lat_ref, lon, lon_ref, missing). Rationals that don't
+    have exactly three pairs are padded with zeros or truncated.
+    """
+    count   = len(values)
+    lat     = np.zeros((count, 3, 2), dtype=np.float64)
+    lon     = np.zeros((count, 3, 2), dtype=np.float64)
+    lat_ref = np.zeros(count, dtype="S1")
+    lon_ref = np.zeros(count, dtype="S1")
+    missing = np.zeros(count, dtype=bool)
+
+    # Zero padding is only the degrees, not a zero division
+    lat[:, :, 1] = lon[:, :, 1] = 1
+
+    for idx, value in enumerate(values):
+        if value is None:
+            missing[idx] = True
+            continue
+
+        try:
+            rlat, rlat_ref, rlon, rlon_ref = value
+            lat[idx, :len(rlat[:3])] = rlat[:3]
+            lon[idx, :len(rlon[:3])] = rlon[:3]
+        except (ValueError, TypeError):
+            missing[idx] = True
+            continue
+
+        lat_ref[idx] = rlat_ref[:1]
+        lon_ref[idx] = rlon_ref[:1]
+
+    return lat, lat_ref, lon, lon_ref, missing
+
+
+def validate_coordinates(latitude, longitude):
+    """
+    Returns an array of the flags of arrays of decimal degree coordinates,
+    e.g. ones already stored in the database, flagging coordinates that are
+    missing (NaN), out of range, or exactly (0, 0).
+    """
+    latitude  = np.asarray(latitude, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+    flags     = np.zeros(latitude.shape, dtype=np.int64)
+
+    missing = np.isnan(latitude) | np.isnan(longitude)
+    flags[missing] |= GPS_MISSING
+
+    with np.errstate(invalid='ignore'):
+        outside = (np.abs(latitude) > 90) | (np.abs(longitude) > 180)
+        flags[outside | np.isinf(latitude) | np.isinf(longitude)] |= GPS_OUT_OF_RANGE
+        flags[(latitude == 0) & (longitude == 0)] |= GPS_NULL_ISLAND
+
+    return flags
+
+
+def decode_coordinates(lat, lat_ref, lon, lon_ref, missing=None):
+    """
+    Converts (n, 3, 2) arrays of degree, minute and second rationals and
+    arrays of their refs to decimal degrees, returning Coordinates whose
+    latitude and longitude are NaN where the flags are not GPS_VALID.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    lat_ref = np.asarray(lat_ref, dtype="S1")
+    lon_ref = np.asarray(lon_ref, dtype="S1")
+
+    flags = np.zeros(lat.shape[0], dtype=np.int64)
+
+    # Convert the rationals, tolerating zero denominators until flagged
+    scale = np.array([1.0, 60.0, 3600.0])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lat_dms = lat[..., 0] / lat[..., 1]
+        lon_dms = lon[..., 0] / lon[..., 1]
+
+    zero = (lat[..., 1] == 0).any(axis=1) | (lon[..., 1] == 0).any(axis=1)
+    flags[zero] |= GPS_ZERO_DIVISION
+
+    # No part may be negative, and minutes and seconds must be under 60
+    with np.errstate(invalid='ignore'):
+        garbage = np.zeros(flags.shape, dtype=bool)
+        for dms in (lat_dms, lon_dms):
+            garbage |= (dms < 0).any(axis=1)
+            garbage |= (dms[:, 1:] >= 60).any(axis=1)
+    flags[garbage & ~zero] |= GPS_OUT_OF_RANGE
+
+    with np.errstate(invalid='ignore'):
+        latitude  = (lat_dms / scale).sum(axis=1)
+        longitude = (lon_dms / scale).sum(axis=1)
+
+    bad_ref  = ~np.in1d(lat_ref, [b"N", b"S"]) | ~np.in1d(lon_ref, [b"E", b"W"])
+    flags[bad_ref] |= GPS_BAD_REF
+
+    latitude  = np.where(lat_ref == b"S", -latitude, latitude)
+    longitude = np.where(lon_ref == b"W", -longitude, longitude)
+
+    # Zero divisions are already flagged, so don't also flag their results
+    checked = validate_coordinates(latitude, longitude)
+    checked[zero] = GPS_VALID
+    flags  |= checked
+
+    # Missing coordinates are only zero padding, so have no other flags
+    if missing is not None:
+        flags[np.asarray(missing, dtype=bool)] = GPS_MISSING
+
+    invalid = flags != GPS_VALID
+    latitude[invalid]  = np.nan
+    longitude[invalid] = np.nan
+
+    return Coordinates(latitude, longitude, flags)
+
+
+def decode_gps(values):
+    """
+    Decodes a sequence of raw GPS tuples as returned by read_gps (None for
+    images without GPS tags) in one shot, returning Coordinates.
+    """
+    return decode_coordinates(*stack_gps(values))
+
+
+def describe_flags(flags):
+    """
+    Returns a dict of the name of each flag to the number of coordinates
+    in the array of flags that have it, along with the number of valid ones.
+    """
+    flags  = np.asarray(flags)
+    counts = {"valid": int((flags == GPS_VALID).sum())}
+    for flag, name in GPS_FLAGS:
+        counts[name] = int(((flags & flag) != 0).sum())
+    return counts
+
+##########################################################################
+## Reading
+##########################################################################
+
+def _gps_pair(job):
+    """
+    Worker function that returns a (key, gps) pair for a (key, path) job,
+    where gps is None if the image has no GPS tags or could not be read.
+    """
+    key, path = job
+    try:
+        return key, read_gps(path)
+    except (IOError, OSError):
+        return key, None
+
+
+def read_gps_batch(jobs, workers=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Reads the raw GPS tags of every (key, path) job in a pool of worker
+    processes, yielding (key, gps) pairs in completion order.
+    """
+    workers = workers or multiprocessing.cpu_count()
+
+    # Don't bother spinning up a pool for serial reading
+    if workers == 1:
+        for job in jobs:
+            yield _gps_pair(job)
+        return
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        for pair in pool.imap_unordered(_gps_pair, jobs, chunksize):
+            yield pair
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+##########################################################################
+## Database
+##########################################################################
+
+def coordinate_mappings(ids, coordinates):
+    """
+    Returns the bulk update mappings of the picture ids to their decoded
+    Coordinates and geohash, where flagged coordinates are set to NULL.
+    Pictures whose GPS tags are missing get no mapping, since their tags
+    may simply not have been read (e.g. formats the header parser doesn't
+    handle or unreadable files) and their stored coordinates must be kept.
+    """
+    valid     = coordinates.flags == GPS_VALID
+    latitude  = coordinates.latitude.tolist()
+    longitude = coordinates.longitude.tolist()
+    cells     = [None] * len(latitude)
+
+    if valid.any():
+        index = np.flatnonzero(valid)
+        for idx, cell in zip(index.tolist(), encode_many(
+                coordinates.latitude[index], coordinates.longitude[index], MAX_PRECISION)):
+            cells[idx] = cell
+
+    return [
+        {
+            'id': pk,
+            'latitude': lat if cell else None,
+            'longitude': lon if cell else None,
+            'geohash': cell,
+        }
+        for pk, lat, lon, cell, flags in zip(
+            ids, latitude, longitude, cells, coordinates.flags.tolist()
+        ) if not flags & GPS_MISSING
+    ]
+
+
+def update_coordinates(session, ids, coordinates):
+    """
+    Writes the decoded Coordinates of the pictures with the ids to the
+    database in a single bulk update, without loading the pictures.
+    """
+    mappings = coordinate_mappings(ids, coordinates)
+    session.bulk_update_mappings(Picture, mappings)
+    return len(mappings)
@@ -0,0 +1,368 @@
+# inigo.hashing
+# Computes file signatures, optionally in parallel across a worker pool
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sat Oct 17 10:12:44 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: hashing.py [] benjamin@bengfort.com $
+
+"""
+Computes file signatures, optionally in parallel across a worker pool.
+
+Several digests can be computed from a single read of a file, e.g. the
+sha256 signature used to catalog images along with a fast non-cryptographic
+checksum (xxhash) that is cheap to recompute when verifying copies.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import io
+import mmap
+import base64
+import hashlib
+import threading
+import multiprocessing
+
+from functools import partial
+from inigo.utils import chunked
+from inigo.utils.posix import fadvise
+from inigo.utils.posix import POSIX_FADV_SEQUENTIAL, POSIX_FADV_DONTNEED
+from multiprocessing.pool import ThreadPool
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+DEFAULT_ALGORITHM = "sha256"
+DEFAULT_CHECKSUM  = "xxh64"
+DEFAULT_CHUNKSIZE = 16
+CACHE_BATCH_SIZE  = 1000
+
+# Hashing modes and the file size above which files are memory mapped
+AUTO = "auto"
+READ = "read"
+MMAP = "mmap"
+MMAP_THRESHOLD    = 64 * 1024 * 1024
+READ_BUFFER_SIZE  = 1024 * 1024
+
+# Number of bytes read from the head and the tail of a file for its sample
+SAMPLE_SIZE       = 64 * 1024
+
+# Algorithms provided by hashlib and by the optional xxhash library
+HASHLIB_ALGORITHMS = hashlib.algorithms_available
+XXHASH_ALGORITHMS  = ("xxh32", "xxh64", "xxh128")
+
+# Per-thread read buffers so that chunks aren't allocated for every read
+_buffers = threading.local()
+
+##########################################################################
+## Helper Methods
+##########################################################################
+
+def get_algorithm(name):
+    """
+    Returns the hash constructor for the named algorithm from hashlib or
+    xxhash, raising a TypeError if the algorithm is not supported.
+    """
+    if name in XXHASH_ALGORITHMS:
+        if xxhash is None or not hasattr(xxhash, name):
+            raise TypeError('"{}" requires the xxhash library'.format(name))
+        return getattr(xxhash, name)
+
+    if name not in HASHLIB_ALGORITHMS:
+        raise TypeError('"{}" is not a valid hash algorithm'.format(name))
+
+    if hasattr(hashlib, name):
+        return getattr(hashlib, name)
+    return partial(hashlib.new, name)
+
+
+def b64digest(sig):
+    """
+    Returns the base64 encoded digest of the hash as a unicode signature.
+    """
+    return unicode(base64.b64encode(sig.digest()))
+
+
+def get_buffer(size=READ_BUFFER_SIZE):
+    """
+    Returns a reusable buffer of the given size that is local to the thread.
+    """
+    buf = getattr(_buffers, 'buf', None)
+    if buf is None or len(buf) != size:
+        buf = _buffers.buf = bytearray(size)
+    return buf
+
+
+def update_readinto(sig, f):
+    """
+    Feeds the file to the hash by reading into a preallocated buffer that
+    is reused for every chunk rather than allocating a new bytes object.
+    """
+    buf  = get_buffer()
+    view = memoryview(buf)
+    for nbytes in iter(lambda: f.readinto(buf), 0):
+        sig.update(view[:nbytes])
+
+
+def update_mmap(sig, f):
+    """
+    Feeds the file to the hash directly from a read-only memory map of the
+    file so that the data is never copied into userspace buffers.
+    """
+    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        sig.update(data)
+    finally:
+        data.close()
+
+
+def compute_signature(path, algorithm=DEFAULT_ALGORITHM, mode=AUTO, drop_cache=False):
+    """
+    Computes the b64 encoded digest of the file at the given path. This is
+    a module level function so that it can be pickled for a process pool.
+    See compute_digests for a description of the mode and drop_cache.
+    """
+    return compute_digests(path, (algorithm,), mode, drop_cache)[algorithm]
+
+
+def compute_digests(path, algorithms=(DEFAULT_ALGORITHM, DEFAULT_CHECKSUM),
+                    mode=AUTO, drop_cache=False):
+    """
+    Computes the b64 encoded digest of the file for each of the algorithms
+    from a single read of the file, returning a dict of algorithm to digest.
+
+    The mode is either "read" to hash from a reused buffer, "mmap" to hash
+    from a memory map, or "auto" to memory map files above MMAP_THRESHOLD.
+    The kernel is advised that the file is read sequentially; if drop_cache
+    is True it is also told to evict the file from the page cache after it
+    has been hashed, so that hashing doesn't push out other cached data.
+    """
+    sig = MultiHash(algorithms)
+
+    with io.open(path, 'rb', buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if mode == AUTO:
+            mode = MMAP if size >= MMAP_THRESHOLD else READ
+
+        fadvise(f.fileno(), 0, 0, POSIX_FADV_SEQUENTIAL)
+
+        # Empty files cannot be memory mapped
+        if mode == MMAP and size > 0:
+            update_mmap(sig, f)
+        else:
+            update_readinto(sig, f)
+
+        if drop_cache:
+            fadvise(f.fileno(), 0, 0, POSIX_FADV_DONTNEED)
+
+    return sig.digests()
+
+
+def compute_sample(path, algorithm=DEFAULT_ALGORITHM, size=SAMPLE_SIZE):
+    """
+    Computes the b64 encoded digest of the size of the file along with its
+    first and last size bytes. Files whose samples differ cannot have the
+    same signature, so the sample is a cheap prefilter for duplicates; the
+    full signature must still be compared when the samples are the same.
+    """
+    sig = get_algorithm(algorithm)()
+
+    with io.open(path, 'rb', buffering=0) as f:
+        total = os.fstat(f.fileno()).st_size
+        sig.update(str(total))
+        sig.update(f.read(size))
+
+        if total > size:
+            f.seek(max(size, total - size))
+            sig.update(f.read(size))
+
+    return b64digest(sig)
+
+
+def _digests_pair(path, algorithms=(DEFAULT_ALGORITHM,), drop_cache=False):
+    """
+    Worker function that returns a (path, digests) pair for the pool. If
+    the file cannot be read the digests are None, so that one bad file does
+    not abort the entire batch; callers can then handle the error per file.
+    """
+    try:
+        return path, compute_digests(path, algorithms, drop_cache=drop_cache)
+    except (IOError, OSError):
+        return path, None
+
+##########################################################################
+## Multiple Digests
+##########################################################################
+
+class MultiHash(object):
+    """
+    Feeds every update to several hashes at once so that multiple digests
+    can be computed from one pass over the data. Has the same update method
+    as hashlib objects so it can be used wherever a single hash is used.
+    """
+
+    def __init__(self, algorithms=(DEFAULT_ALGORITHM, DEFAULT_CHECKSUM)):
+        self.hashes = [
+            (name, get_algorithm(name)()) for name in algorithms
+        ]
+
+    @property
+    def algorithms(self):
+        return [name for name, sig in self.hashes]
+
+    def update(self, data):
+        for name, sig in self.hashes:
+            sig.update(data)
+
+    def digests(self):
+        """
+        Returns a dict of the b64 encoded digest of each of the algorithms.
+        """
+        return {name: b64digest(sig) for name, sig in self.hashes}
+
+    def __getitem__(self, name):
+        return b64digest(dict(self.hashes)[name])
+
+##########################################################################
+## Hashing Engine
+##########################################################################
+
+class HashingEngine(object):
+    """
+    Computes signatures for many files at once using a pool of workers.
+    Threads are the default since hashlib releases the GIL while digesting
+    large buffers; a process pool can be used when hashing is CPU bound.
+
+    If a signature cache is supplied, paths are looked up in bulk before
+    being dispatched to the pool and only the misses are actually hashed;
+    the new signatures are then written back to the cache. If the name of a
+    checksum algorithm is supplied, the checksum of each file is computed
+    from the same read as its signature (and cached along with it).
+    """
+
+    def __init__(self, workers=None, processes=False, algorithm=DEFAULT_ALGORITHM,
+                 chunksize=DEFAULT_CHUNKSIZE, cache=None, drop_cache=False,
+                 checksum=None):
+        # Validate the algorithms up front
+        get_algorithm(algorithm)
+        if checksum is not None:
+            get_algorithm(checksum)
+
+        self.workers    = workers or multiprocessing.cpu_count()
+        self.processes  = processes
+        self.algorithm  = algorithm
+        self.checksum   = checksum
+        self.chunksize  = chunksize
+        self.cache      = cache
+        self.drop_cache = drop_cache
+
+    @property
+    def algorithms(self):
+        """
+        Returns the algorithms of the digests computed for every file.
+        """
+        if self.checksum is None:
+            return (self.algorithm,)
+        return (self.algorithm, self.checksum)
+
+    def create_pool(self):
+        """
+        Returns a new thread or process pool with the configured workers.
+        """
+        if self.processes:
+            return multiprocessing.Pool(self.workers)
+        return ThreadPool(self.workers)
+
+    def signatures(self, paths):
+        """
+        Yields (path, signature) pairs for every path in the iterable. Pairs
+        are returned in completion order rather than the order of the paths
+        and the signature is None for any file that could not be read.
+        """
+        for path, digests in self.digests(paths):
+            yield path, digests[self.algorithm] if digests is not None else None
+
+    def digests(self, paths):
+        """
+        Yields (path, digests) pairs for every path in the iterable, where
+        the digests are a dict of the digest of each of the algorithms, or
+        None for any file that could not be read. Digests from the cache may
+        not include the checksum if it wasn't cached with the signature.
+        """
+        if self.cache is None:
+            return self.compute(paths)
+        return self.lookup(paths)
+
+    def lookup(self, paths):
+        """
+        Yields (path, digests) pairs, first from the signature cache and
+        then by hashing any paths that weren't found in the cache. The new
+        digests are cached with the stats taken before the files are hashed,
+        so that files that change while they're hashed are not cached.
+        """
+        for batch in chunked(paths, CACHE_BATCH_SIZE):
+            stats = self.cache.stat_many(batch)
+            found = self.cache.get_digests(batch, stats)
+            for pair in found.iteritems():
+                yield pair
+
+            misses = [path for path in batch if path not in found]
+            if not misses:
+                continue
+
+            hashed = []
+            for pair in self.compute(misses):
+                hashed.append(pair)
+                yield pair
+
+            self.cache.set_many(hashed, stats)
+
+    def compute(self, paths):
+        """
+        Yields (path, digests) pairs by hashing every path in the pool.
+        """
+        worker = partial(
+            _digests_pair, algorithms=self.algorithms, drop_cache=self.drop_cache
+        )
+
+        # Don't bother spinning up a pool for serial hashing
+        if self.workers == 1:
+            for path in paths:
+                yield worker(path)
+            return
+
+        pool = self.create_pool()
+        try:
+            for pair in pool.imap_unordered(worker, paths, self.chunksize):
+                yield pair
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+    def __call__(self, paths):
+        return self.signatures(paths)
+
+
+def hash_files(paths, workers=None, processes=False, algorithm=DEFAULT_ALGORITHM,
+               cache=None):
+    """
+    Shortcut for creating a hashing engine and computing the signatures of
+    the given paths, returning an iterator of (path, signature) pairs.
+    """
+    engine = HashingEngine(workers, processes, algorithm, cache=cache)
+    return engine.signatures(paths)
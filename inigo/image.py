@@ -10,20 +10,29 @@
 # ID: image.py [] benjamin@bengfort.com $
 
 """
-Handles data dealing with images, particularly EXIF for JPEG
+Handles data dealing with images, particularly EXIF for JPEG. The meta data
+that is saved is read directly from the file headers by inigo.exif where
+possible, falling back to Pillow for images it can't parse.
 """
 
 ##########################################################################
 ## Imports
 ##########################################################################
 
+import os
+import multiprocessing
+
 from inigo.fs import FileMeta
+from inigo.ingest import ingest_file
+from inigo.phash import dhash
+from inigo.exif import ImageInfo, read_info
+from inigo.geohash import encode, MAX_PRECISION
 from PIL import Image, ExifTags
 
 from datetime import datetime
 from dateutil.tz import tzutc
+from collections import namedtuple
 
-from inigo.config import settings
 from inigo.utils.timez import epochptime
 from inigo.utils.decorators import memoized
 from inigo.exceptions import PictureNotFound
@@ -31,9 +40,9 @@ from inigo.models import STYPE, create_session
 from inigo.models import Picture, Storage
 from inigo.utils.timez import tzaware_now
 
-from sqlalchemy.sql import exists
+from sqlalchemy import or_
 
-from geopy.geocoders import GoogleV3
+from inigo.geocode import get_geocoder
 
 ##########################################################################
 ## Module Constants
@@ -41,6 +50,21 @@ from geopy.geocoders import GoogleV3
 
 EXIF_DATE_FORMAT = "%Y:%m:%d %H:%M:%S"
 
+# Number of paths sent to each extraction worker at a time
+DEFAULT_CHUNKSIZE = 32
+
+##########################################################################
+## Image Record
+##########################################################################
+
+# Picklable meta data of an image that is saved to the database, which is
+# parsed from the headers. The perceptual hash is left out since it decodes
+# the whole image, so it is only computed when a new picture is saved.
+ImageRecord = namedtuple("ImageRecord", (
+    "path", "mimetype", "filesize", "width", "height",
+    "date_taken", "latitude", "longitude",
+))
+
 ##########################################################################
 ## Helper functions
 ##########################################################################
@@ -63,9 +87,45 @@ def convert_to_degrees(value):
 
 class ImageMeta(FileMeta):
     """
-    Wraps a path and provides image meta data.
+    Wraps a path and provides image meta data. If the ImageRecord of the
+    image has already been extracted (e.g. by extract_metadata) pass it as
+    the record so that the meta data is not read from the file again.
     """
 
+    def __init__(self, path, *args, **kwargs):
+        record = kwargs.pop('record', None)
+        super(ImageMeta, self).__init__(path, *args, **kwargs)
+
+        if record is not None:
+            self.load_record(record)
+
+    @property
+    def record(self):
+        """
+        Returns the ImageRecord of the meta data of the image.
+        """
+        lat, lon = self.coordinates or (None, None)
+        return ImageRecord(
+            self.path, self.mimetype, self.filesize, self.dimensions[0],
+            self.dimensions[1], self.date_taken, lat, lon,
+        )
+
+    def load_record(self, record):
+        """
+        Sets the memoized meta data of the image from the ImageRecord.
+        """
+        self._mimetype = record.mimetype
+        self._filesize = record.filesize
+        self._date_taken = record.date_taken
+        self._info = ImageInfo(
+            record.width, record.height, None, record.latitude, record.longitude
+        )
+
+        if record.latitude is None or record.longitude is None:
+            self._coordinates = None
+        else:
+            self._coordinates = (record.latitude, record.longitude)
+
     @property
     def exif(self):
         """
@@ -75,14 +135,62 @@ class ImageMeta(FileMeta):
             self.read_image_data()
         return self._exif
 
+    def ingest(self, dst=None, engine=None):
+        """
+        Reads the image once to compute its digests and sample, sniff its
+        mimetype and parse its headers, populating the memoized attributes
+        (and the signature cache) so the image isn't read again when it is
+        saved. If a dst is given, the image is also copied there from the
+        same read and the ImageMeta of the copy is returned.
+        """
+        st = self.stat()
+        if dst is not None:
+            directory = os.path.dirname(dst)
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+
+        ingest = ingest_file(self.path, dst, (self.signame, self.chkname), engine)
+
+        self._digests   = ingest.digests()
+        self._signature = self._digests[self.signame]
+        self._checksum  = self._digests[self.chkname]
+        self._sample    = ingest.sample(self.signame)
+        self._mimetype  = ingest.mimetype()
+        self._filesize  = ingest.size
+
+        # Headers that aren't in the leading bytes are read by Pillow
+        self._info = ingest.info() or self.read_pillow_info()
+
+        if self.sigcache is not None:
+            self.sigcache.set(self.path, self._signature, st, chkdigest=self._checksum)
+
+        if dst is None:
+            return None
+
+        copied = self.__class__(
+            dst, self.signame, digest=self._signature, checksum=self.chkname
+        )
+        copied._digests = dict(self._digests)
+
+        # The copy was just written so it is decoded from the page cache
+        self._phash = copied.phash
+        return copied
+
+    @memoized
+    def info(self):
+        """
+        Returns the ImageInfo record of the dimensions, date taken and
+        coordinates of the image, read from the file headers if possible or
+        otherwise by opening the image with Pillow.
+        """
+        return read_info(self.path) or self.read_pillow_info()
+
     @property
     def dimensions(self):
         """
         Returns a tuple of the width and height of the image.
         """
-        if not hasattr(self, '_dimensions'):
-            self.read_image_data()
-        return self._dimensions
+        return (self.info.width, self.info.height)
 
     @memoized
     def date_taken(self):
@@ -93,7 +201,7 @@ class ImageMeta(FileMeta):
             1. Attempt to parse DateTimeOriginal from EXIF
             2. Return st_ctime from os.stat
         """
-        dtorig = self.exif.get('DateTimeOriginal', None)
+        dtorig = self.info.date_taken
         if dtorig:
             return datetime.strptime(dtorig, EXIF_DATE_FORMAT).replace(tzinfo=tzutc())
 
@@ -104,34 +212,29 @@ class ImageMeta(FileMeta):
         """
         Returns the latitude and longitude as a tuple.
         """
-        lat = lon = None
+        if self.info.latitude is None or self.info.longitude is None:
+            return None
+        return (self.info.latitude, self.info.longitude)
 
-        # Decode the GPSInfo tags
-        if "GPSInfo" in self.exif:
-            self.exif["GPSInfo"] = {
-                ExifTags.GPSTAGS[k]: v
-                for k,v in self.exif["GPSInfo"].iteritems()
-                if k in ExifTags.GPSTAGS
-            }
-
-            # Gather GPS data points
-            gps_info = self.exif["GPSInfo"]
-            gps_lat  = gps_info.get("GPSLatitude", None)
-            gps_lon  = gps_info.get("GPSLongitude", None)
-            gps_lat_ref = gps_info.get("GPSLatitudeRef", None)
-            gps_lon_ref = gps_info.get("GPSLongitudeRef", None)
-
-            # Perform GPS conversions
-            if gps_lat and gps_lon and gps_lat_ref and gps_lon_ref:
-                lat = convert_to_degrees(gps_lat)
-                if gps_lat_ref != "N":
-                    lat = 0 - lat
-
-                lon = convert_to_degrees(gps_lon)
-                if gps_lon_ref != "E":
-                    lon = 0 - lon
+    @memoized
+    def geohash(self):
+        """
+        Returns the full precision geohash of the coordinates, if any.
+        """
+        if not self.coordinates:
+            return None
+        return encode(self.coordinates[0], self.coordinates[1], MAX_PRECISION)
 
-            return (lat, lon)
+    @memoized
+    def phash(self):
+        """
+        Returns the perceptual (difference) hash of the image as a hex string
+        or None if Pillow cannot decode the image, e.g. for most RAW formats.
+        """
+        try:
+            return unicode(dhash(self.path))
+        except IOError:
+            return None
 
     @memoized
     def address(self):
@@ -141,12 +244,7 @@ class ImageMeta(FileMeta):
         if not self.coordinates:
             return
 
-        geocoder = GoogleV3(api_key=settings.geocode.apikey)
-        query    = "{},{}".format(*self.coordinates)
-        result   = geocoder.reverse(query, exactly_one=True, sensor=False)
-
-        if result:
-            return result.address
+        return get_geocoder().reverse(*self.coordinates)
 
     def read_image_data(self):
         """
@@ -166,6 +264,45 @@ class ImageMeta(FileMeta):
                 if k in ExifTags.TAGS
             } if exifdata else {}
 
+    def read_pillow_info(self):
+        """
+        Builds the ImageInfo record from the image data read by Pillow, for
+        images whose headers can't be parsed directly.
+        """
+        if not hasattr(self, '_exif'):
+            self.read_image_data()
+
+        lat = lon = None
+
+        # Decode the GPSInfo tags
+        if "GPSInfo" in self.exif:
+            gps_info = {
+                ExifTags.GPSTAGS[k]: v
+                for k,v in self.exif["GPSInfo"].iteritems()
+                if k in ExifTags.GPSTAGS
+            }
+
+            # Gather GPS data points
+            gps_lat  = gps_info.get("GPSLatitude", None)
+            gps_lon  = gps_info.get("GPSLongitude", None)
+            gps_lat_ref = gps_info.get("GPSLatitudeRef", None)
+            gps_lon_ref = gps_info.get("GPSLongitudeRef", None)
+
+            # Perform GPS conversions
+            if gps_lat and gps_lon and gps_lat_ref and gps_lon_ref:
+                lat = convert_to_degrees(gps_lat)
+                if gps_lat_ref != "N":
+                    lat = 0 - lat
+
+                lon = convert_to_degrees(gps_lon)
+                if gps_lon_ref != "E":
+                    lon = 0 - lon
+
+        width, height = self._dimensions
+        return ImageInfo(
+            width, height, self.exif.get('DateTimeOriginal', None), lat, lon
+        )
+
     def save(self, session=None, commit=False):
         """
         Stores the image information in the database along with the current
@@ -175,16 +312,19 @@ class ImageMeta(FileMeta):
         This method returns the session object. Will commit if required.
         """
         session  = session or create_session()
+        picture  = self.find_duplicate(session)
 
-        if not session.query(exists().where(
-                Picture.signature == self.signature
-            )).scalar():
+        if picture is None:
 
             session.add(Picture(
                 signature     = self.signature,
+                sample        = self.sample,
+                checksum      = self.checksum,
+                phash         = self.phash,
                 date_taken    = self.date_taken,
                 latitude      = self.coordinates[0] if self.coordinates else None,
                 longitude     = self.coordinates[1] if self.coordinates else None,
+                geohash       = self.geohash,
                 width         = self.dimensions[0],
                 height        = self.dimensions[1],
                 mimetype      = unicode(self.mimetype),
@@ -194,8 +334,55 @@ class ImageMeta(FileMeta):
             if commit:
                 session.commit()
 
+        elif picture.sample is None:
+            # Backfill the sample of pictures saved before it existed
+            picture.sample = self.sample
+            session.add(picture)
+
+            if commit:
+                session.commit()
+
         return session
 
+    def candidates(self, session):
+        """
+        Returns a query for the pictures that could be duplicates of this
+        image: those with the same number of bytes and the same sample (or
+        no sample, since it was added after the pictures table). The sample
+        is only computed if there are pictures with the same file size.
+        """
+        query = session.query(Picture).filter(Picture.bytes == self.filesize)
+        if not session.query(query.exists()).scalar():
+            return query
+
+        return query.filter(or_(
+            Picture.sample == self.sample, Picture.sample.is_(None)
+        ))
+
+    def has_candidates(self, session):
+        """
+        Checks if there are any possible duplicates of this image in the
+        database without computing the full signature of the image. If not,
+        the image is certainly new; otherwise the signature must be compared.
+        """
+        return session.query(self.candidates(session).exists()).scalar()
+
+    def find_duplicate(self, session):
+        """
+        Returns the picture with the same signature as this image, or None.
+        If the signature is already known it is looked up directly by the
+        unique index, otherwise pictures are prefiltered by size and sample
+        so that the image is only hashed if a picture could possibly match.
+        """
+        if self.has_signature():
+            query = session.query(Picture)
+            return query.filter(Picture.signature == self.signature).first()
+
+        for picture in self.candidates(session):
+            if picture.signature == self.signature:
+                return picture
+        return None
+
     def save_storage(self, session=None, commit=False, **skwargs):
         """
         Saves the storage associated with this image and file meta.
@@ -241,6 +428,67 @@ class ImageMeta(FileMeta):
 
         return session
 
+##########################################################################
+## Metadata Extraction
+##########################################################################
+
+def _image_record(path):
+    """
+    Worker function that returns a (path, record) pair for the pool. If the
+    meta data cannot be read the record is None, so that one bad image does
+    not abort the entire batch; callers can then handle the error per image.
+    """
+    try:
+        return path, ImageMeta(path).record
+    except Exception:
+        return path, None
+
+
+def extraction_pool(workers=None):
+    """
+    Returns a pool of worker processes that extract_metadata can reuse for
+    many batches of paths, or None if the meta data is extracted serially.
+    Create the pool before opening any database connections, since they
+    would otherwise be inherited by the forked workers.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    if workers == 1:
+        return None
+    return multiprocessing.Pool(workers)
+
+
+def extract_metadata(paths, workers=None, chunksize=DEFAULT_CHUNKSIZE, pool=None):
+    """
+    Yields (path, record) pairs of the ImageRecord of every path in the
+    iterable, in the same order as the paths. Parsing image meta data is CPU
+    bound, so the paths are sent in chunks to a pool of worker processes.
+    If a pool from extraction_pool is passed in, it is used and left open;
+    otherwise a pool is created for the paths and closed afterwards.
+    """
+    if pool is not None:
+        for pair in pool.imap(_image_record, paths, chunksize):
+            yield pair
+        return
+
+    workers = workers or multiprocessing.cpu_count()
+
+    # Don't bother spinning up a pool for serial extraction
+    if workers == 1:
+        for path in paths:
+            yield _image_record(path)
+        return
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        for pair in pool.imap(_image_record, paths, chunksize):
+            yield pair
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
 
 if __name__ == '__main__':
     import os
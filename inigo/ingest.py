@@ -0,0 +1,137 @@
+# inigo.ingest
+# Gathers all the meta data of a file (and optionally copies it) in one read
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 00:21:37 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: ingest.py [] benjamin@bengfort.com $
+
+"""
+Gathers all the meta data of a file (and optionally copies it) in one read.
+
+Backing up a new image would otherwise open it once to sniff its mimetype,
+once to hash it, once to parse its headers, once to sample it and once more
+to copy it, which is expensive on USB and network volumes where every open
+and seek is a round trip. The file is instead streamed once through an
+Ingest, which feeds every buffer to the hashes and keeps just the leading
+bytes (for the mimetype, the image headers, and the head of the sample) and
+the trailing bytes (for the tail of the sample) of the file.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import io
+
+from functools import partial
+
+from inigo.sniff import detector
+from inigo.exif import parse_info
+from inigo.utils.posix import fadvise, POSIX_FADV_SEQUENTIAL
+from inigo.hashing import MultiHash, b64digest, get_algorithm, update_readinto
+from inigo.hashing import DEFAULT_ALGORITHM, DEFAULT_CHECKSUM, SAMPLE_SIZE
+from inigo.transfer import get_copy_engine
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Number of leading bytes kept to parse the image headers; the EXIF segment
+# of a JPEG is at most 64 KiB and is almost always at the start of the file
+HEADER_REGION = 256 * 1024
+
+##########################################################################
+## Ingest
+##########################################################################
+
+class Ingest(object):
+    """
+    Consumes the buffers of a single sequential read of a file, computing a
+    digest for each of the algorithms and keeping the head and tail of the
+    file so that its mimetype, image headers and sample can be computed
+    without reading the file again.
+    """
+
+    def __init__(self, algorithms=(DEFAULT_ALGORITHM, DEFAULT_CHECKSUM),
+                 header_size=HEADER_REGION, sample_size=SAMPLE_SIZE):
+        self.hash = MultiHash(algorithms)
+        self.header_size = max(header_size, sample_size)
+        self.sample_size = sample_size
+        self.header = bytearray()
+        self.tail   = bytearray()
+        self.size   = 0
+
+    def update(self, buf):
+        """
+        Feeds the next buffer of the file (e.g. a memoryview) to the ingest.
+        """
+        nbytes = len(buf)
+        self.hash.update(buf)
+        self.size += nbytes
+
+        if len(self.header) < self.header_size:
+            self.header += buf[:self.header_size - len(self.header)]
+
+        if nbytes >= self.sample_size:
+            self.tail = bytearray(buf[nbytes - self.sample_size:])
+        else:
+            self.tail += buf
+            del self.tail[:-self.sample_size]
+
+    def digests(self):
+        """
+        Returns a dict of the b64 encoded digest of each algorithm.
+        """
+        return self.hash.digests()
+
+    def mimetype(self):
+        """
+        Sniffs the mimetype from the leading bytes of the file.
+        """
+        return detector.from_buffer(bytes(self.header))
+
+    def info(self):
+        """
+        Parses the ImageInfo from the leading bytes of the file, returning
+        None if the headers are not in the leading bytes or can't be parsed.
+        """
+        return parse_info(io.BytesIO(bytes(self.header)))
+
+    def sample(self, algorithm=DEFAULT_ALGORITHM):
+        """
+        Computes the sample of the file, exactly as compute_sample does.
+        """
+        sig = get_algorithm(algorithm)()
+        sig.update(str(self.size))
+        sig.update(bytes(self.header[:self.sample_size]))
+
+        if self.size > self.sample_size:
+            # The tail never overlaps with the head of the file
+            overlap = max(0, 2 * self.sample_size - self.size)
+            sig.update(bytes(self.tail[overlap:]))
+
+        return b64digest(sig)
+
+
+def ingest_file(path, dst=None, algorithms=(DEFAULT_ALGORITHM, DEFAULT_CHECKSUM),
+                engine=None):
+    """
+    Reads the file at path once, returning the Ingest of its data. If a dst
+    is given, the file is copied there by the copy engine (with its mode and
+    times) through the buffered strategy, from the same buffers.
+    """
+    ingest = Ingest(algorithms)
+
+    if dst is None:
+        with io.open(path, 'rb', buffering=0) as f:
+            fadvise(f.fileno(), 0, 0, POSIX_FADV_SEQUENTIAL)
+            update_readinto(ingest, f)
+        return ingest
+
+    engine = engine or get_copy_engine()
+    engine.transfer(path, dst, partial(engine.copy_buffered, sig=ingest))
+    return ingest
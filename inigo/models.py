@@ -24,7 +24,7 @@ from collections import namedtuple
 
 from sqlalchemy import create_engine
 from sqlalchemy import Enum
-from sqlalchemy import Column, ForeignKey
+from sqlalchemy import Column, ForeignKey, Index
 from sqlalchemy import Unicode, UnicodeText
 from sqlalchemy import Integer, Float, DateTime
 from sqlalchemy.orm import relationship, sessionmaker
@@ -75,17 +75,24 @@ class Picture(Base):
     """
 
     __tablename__ = "pictures"
+    __table_args__ = (
+        Index('ix_pictures_latitude_longitude', 'latitude', 'longitude'),
+    )
 
     id            = Column(Integer, primary_key=True)
     signature     = Column(Unicode(44), nullable=False, unique=True)
+    sample        = Column(Unicode(44), index=True)
+    checksum      = Column(Unicode(88))
+    phash         = Column(Unicode(16), index=True)
     date_taken    = Column(DateTime(timezone=True))
     latitude      = Column(Float)
     longitude     = Column(Float)
+    geohash       = Column(Unicode(12), index=True)
     location      = Column(Unicode(255))
     width         = Column(Integer)
     height        = Column(Integer)
     mimetype      = Column(Unicode(64))
-    bytes         = Column(Integer)
+    bytes         = Column(Integer, index=True)
     description   = Column(UnicodeText)
     created       = Column(DateTime(timezone=True), default=tzaware_now)
     modified      = Column(DateTime(timezone=True), default=tzaware_now)
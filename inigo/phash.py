@@ -0,0 +1,331 @@
+# inigo.phash
+# Perceptual hashing and near duplicate search of images
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 02:31:50 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: phash.py [] benjamin@bengfort.com $
+
+"""
+Perceptual hashing and near duplicate search of images.
+
+The signature of a picture only matches byte identical copies, but the
+same photograph is often saved again, resized or exported with different
+settings. The difference hash (dHash) of an image is computed from a tiny
+grayscale version of it: each of the 64 bits records whether a pixel is
+brighter than its neighbour to the right, so the hash survives scaling,
+recompression and small color changes, and the number of differing bits
+(the Hamming distance) between two hashes measures how alike they look.
+
+Near duplicates are found with a multi-index hash table: the 64 bits are
+split into k+1 chunks, and by the pigeonhole principle two hashes within a
+distance of k must be exactly equal in at least one chunk, so only hashes
+that share a chunk ever have to be compared.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import numpy as np
+import multiprocessing
+
+from PIL import Image
+from itertools import combinations
+from collections import defaultdict
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+HASH_SIZE = 8        # The hash is HASH_SIZE x HASH_SIZE bits
+HASH_BITS = HASH_SIZE * HASH_SIZE
+
+# Default maximum Hamming distance between near duplicates
+DEFAULT_DISTANCE = 4
+
+# Number of images sent to each hashing worker at a time
+DEFAULT_CHUNKSIZE = 16
+
+# Chunks of at most this many bits are looked up in a table of every value
+TABLE_BITS = 24
+
+
+##########################################################################
+## Difference Hash
+##########################################################################
+
+def dhash(path, size=HASH_SIZE):
+    """
+    Returns the difference hash of the image at the path as a hex string.
+    JPEGs are decoded in draft mode at a fraction of their full resolution
+    since the hash only needs a few pixels.
+    """
+    img = Image.open(path)
+    try:
+        img.draft('L', (size * 8, size * 8))
+        pixels = list(
+            img.convert('L').resize((size + 1, size), Image.ANTIALIAS).getdata()
+        )
+    finally:
+        img.close()
+
+    value = 0
+    for row in xrange(size):
+        for col in xrange(size):
+            left = pixels[row * (size + 1) + col]
+            value = (value << 1) | (left > pixels[row * (size + 1) + col + 1])
+
+    return "{:0{}x}".format(value, size * size // 4)
+
+
+def _dhash_pair(job):
+    """
+    Worker function that returns a (key, phash) pair for a (key, path) job,
+    where the phash is None if the image could not be read or decoded.
+    """
+    key, path = job
+    try:
+        return key, dhash(path)
+    except (IOError, OSError):
+        return key, None
+
+
+def hash_images(jobs, workers=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Computes the difference hash of every (key, path) job in a pool of worker
+    processes, yielding (key, phash) pairs in completion order.
+    """
+    workers = workers or multiprocessing.cpu_count()
+
+    # Don't bother spinning up a pool for serial hashing
+    if workers == 1:
+        for job in jobs:
+            yield _dhash_pair(job)
+        return
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        for pair in pool.imap_unordered(_dhash_pair, jobs, chunksize):
+            yield pair
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def hamming(a, b):
+    """
+    Returns the number of bits that differ between two integer hashes.
+    """
+    return bin(a ^ b).count("1")
+
+##########################################################################
+## Multi-Index Hash Table
+##########################################################################
+
+class MultiIndexHash(object):
+    """
+    Indexes hex encoded perceptual hashes (and the keys, e.g. picture ids,
+    that have them) to find all the hashes within a Hamming distance of at
+    most k of a query without comparing the query to every hash.
+
+    The chunk tables used by search are built when they are first needed,
+    while clusters looks up the chunks of all the hashes at once in sorted
+    NumPy arrays, so that millions of pictures can be clustered quickly.
+    """
+
+    def __init__(self, k=DEFAULT_DISTANCE, bits=HASH_BITS):
+        if not 0 <= k < bits:
+            raise ValueError("Distance must be between 0 and {}".format(bits - 1))
+
+        self.k      = k
+        self.bits   = bits
+        self.hashes = defaultdict(list)   # hash value to keys
+        self._tables = None
+
+        # Split the bits into k+1 chunks of (nearly) equal width
+        chunks = k + 1
+        bounds = [bits * idx // chunks for idx in xrange(chunks + 1)]
+        self.chunks = [
+            (lo, (1 << (hi - lo)) - 1) for lo, hi in zip(bounds, bounds[1:])
+        ]
+
+    def add(self, key, phash):
+        """
+        Adds the key with the hex encoded perceptual hash to the index.
+        """
+        self.hashes[int(phash, 16)].append(key)
+        self._tables = None
+
+    @property
+    def tables(self):
+        """
+        A dict of chunk value to hash values for each of the chunks.
+        """
+        if self._tables is None:
+            self._tables = [defaultdict(list) for _ in self.chunks]
+            for value in self.hashes:
+                for table, (shift, mask) in zip(self._tables, self.chunks):
+                    table[(value >> shift) & mask].append(value)
+        return self._tables
+
+    def candidates(self, value):
+        """
+        Returns the set of indexed hash values that share a chunk with value.
+        """
+        found = set()
+        for table, (shift, mask) in zip(self.tables, self.chunks):
+            found.update(table.get((value >> shift) & mask, ()))
+        return found
+
+    def search(self, phash):
+        """
+        Returns a list of (distance, key) pairs for every indexed key whose
+        hash is within k of the hex encoded perceptual hash, nearest first.
+        """
+        value   = int(phash, 16)
+        results = []
+        for other in self.candidates(value):
+            distance = hamming(value, other)
+            if distance <= self.k:
+                results.extend((distance, key) for key in self.hashes[other])
+        return sorted(results)
+
+    def pairs(self):
+        """
+        Returns the sorted array of the unique hash values along with two
+        arrays of the indices of every pair of values within k of each other.
+
+        The values are split into as many chunks as there are bits in the
+        number of values (so most chunk values are unique), then by the
+        pigeonhole principle a near pair must be within r = k // chunks of
+        each other in at least one chunk. For each chunk and each flip of at
+        most r of its bits, the flipped chunk of every value is looked up in
+        the sorted chunks with NumPy, and the matches are verified.
+        """
+        values = np.array(sorted(self.hashes), dtype=np.uint64)
+        left, right = [], []
+
+        width  = max(1, int(np.ceil(np.log2(max(len(values), 2)))))
+        chunks = max(1, min(self.k + 1, self.bits // width))
+        radius = self.k // chunks
+        bounds = [self.bits * idx // chunks for idx in xrange(chunks + 1)]
+
+        for lo, hi in zip(bounds, bounds[1:]):
+            chunk = (values >> np.uint64(lo)) & np.uint64((1 << (hi - lo)) - 1)
+            order = np.argsort(chunk, kind='mergesort')
+            runs  = ChunkRuns(chunk[order], hi - lo)
+
+            for flip in flips(hi - lo, radius):
+                start, counts = runs.find(chunk ^ np.uint64(flip))
+                source = np.flatnonzero(counts)
+                start, counts = start[source], counts[source]
+
+                # Expand each value into a pair with every match in the run
+                first  = np.repeat(start, counts)
+                within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+                a = np.repeat(source, counts)
+                b = order[first + within]
+                keep = a < b
+                a, b = a[keep], b[keep]
+
+                near = popcount(values[a] ^ values[b]) <= self.k
+                left.append(a[near])
+                right.append(b[near])
+
+        if not left:
+            return values, np.array([], dtype=np.intp), np.array([], dtype=np.intp)
+        return values, np.concatenate(left), np.concatenate(right)
+
+    def clusters(self):
+        """
+        Returns a list of the clusters of keys whose hashes are connected by
+        a chain of near duplicates (within k of each other), largest first.
+        Keys that have no near duplicates are not included.
+        """
+        values, left, right = self.pairs()
+        parent = {}
+
+        def find(idx):
+            root = idx
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while idx != root:
+                idx, parent[idx] = parent[idx], root
+            return root
+
+        for a, b in zip(left.tolist(), right.tolist()):
+            parent.setdefault(a, a)
+            parent.setdefault(b, b)
+            parent[find(a)] = find(b)
+
+        groups = defaultdict(list)
+        for idx in parent:
+            groups[find(idx)].extend(self.hashes[int(values[idx])])
+
+        # Keys with exactly the same hash are also near duplicates
+        for idx, value in enumerate(values.tolist()):
+            if idx not in parent and len(self.hashes[value]) > 1:
+                groups[idx].extend(self.hashes[value])
+
+        return sorted(groups.itervalues(), key=len, reverse=True)
+
+    def __len__(self):
+        return sum(len(keys) for keys in self.hashes.itervalues())
+
+
+class ChunkRuns(object):
+    """
+    Finds the runs of equal values in a sorted array of chunks of the given
+    bit width. Narrow chunks are found in a table of the start and length of
+    the run of every possible chunk value, which is much faster than binary
+    searching for unsorted queries; wider chunks are binary searched.
+    """
+
+    def __init__(self, chunks, width):
+        self.chunks = chunks
+        self.table  = width <= TABLE_BITS
+
+        if self.table:
+            self.counts = np.bincount(chunks.astype(np.intp), minlength=1 << width)
+            self.starts = np.cumsum(self.counts) - self.counts
+
+    def find(self, query):
+        """
+        Returns the start and length of the run of each chunk in the query,
+        where the length is zero for chunks that aren't in the array.
+        """
+        if self.table:
+            query = query.astype(np.intp)
+            return self.starts[query], self.counts[query]
+
+        start = np.searchsorted(self.chunks, query, 'left')
+        end   = np.searchsorted(self.chunks, query, 'right')
+        return start, end - start
+
+
+def popcount(values):
+    """
+    Returns the number of set bits of each of an array of uint64 values.
+    """
+    values = values - ((values >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    values = (values & np.uint64(0x3333333333333333)) + \
+             ((values >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    values = (values + (values >> np.uint64(4))) & np.uint64(0x0f0f0f0f0f0f0f0f)
+    return (values * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+def flips(width, radius):
+    """
+    Yields every integer of width bits with at most radius bits set.
+    """
+    for count in xrange(radius + 1):
+        for bits in combinations(xrange(width), count):
+            yield sum(1 << bit for bit in bits)
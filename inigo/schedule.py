@@ -0,0 +1,135 @@
+# inigo.schedule
+# Orders files by their physical location on disk to reduce seeking
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sun Oct 18 22:46:19 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: schedule.py [] benjamin@bengfort.com $
+
+"""
+Orders files by their physical location on disk to reduce seeking.
+
+Walks produce files in directory listing order, which on a spinning disk
+has little to do with where the data of the files is actually stored, so
+reading them in that order makes the heads seek back and forth across the
+platter. The scheduler collects files into batches and sorts each batch
+either by the physical offset of the first extent of each file (using the
+FIEMAP ioctl) or by inode number, which on most file systems roughly
+follows the allocation order of the files, before they are read.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+
+from inigo.utils import chunked
+from inigo.utils.posix import physical_offset
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+INODE   = "inode"
+EXTENT  = "extent"
+METHODS = (INODE, EXTENT)
+
+# Default number of files sorted at a time
+DEFAULT_BATCH_SIZE = 1000
+
+##########################################################################
+## Sort Keys
+##########################################################################
+
+def item_path(item):
+    """
+    Returns the path of an item to schedule, either a path or a NodeRecord.
+    """
+    if isinstance(item, basestring):
+        return item
+    return item.path
+
+
+def inode_key(item):
+    """
+    Returns a key that sorts files by device then inode number. Paths are
+    stat'd, while NodeRecords from a scan already hold their stat data.
+    """
+    if not isinstance(item, basestring):
+        return (item.dev, 1, item.inode)
+
+    st = os.stat(item)
+    return (st.st_dev, 1, st.st_ino)
+
+
+def extent_key(item):
+    """
+    Returns a key that sorts files by device then the physical offset of
+    their first extent. Files that can't be mapped with FIEMAP are sorted
+    by inode number after the files that could be mapped on the device.
+    """
+    fd = os.open(item_path(item), os.O_RDONLY)
+    try:
+        st = os.fstat(fd)
+        offset = physical_offset(fd)
+    finally:
+        os.close(fd)
+
+    if offset is None:
+        return (st.st_dev, 1, st.st_ino)
+    return (st.st_dev, 0, offset)
+
+
+KEYS = {
+    INODE: inode_key,
+    EXTENT: extent_key,
+}
+
+##########################################################################
+## Scheduler
+##########################################################################
+
+class PhysicalScheduler(object):
+    """
+    Reorders a stream of paths a batch at a time so that each batch is read
+    in the order the files are laid out on disk. Paths that can't be stat'd
+    are placed at the end of their batch so the caller can handle errors.
+    NodeRecords from a scan may be scheduled instead of paths, so that they
+    don't have to be stat'd again to be sorted by inode.
+    """
+
+    def __init__(self, method=EXTENT, batch_size=DEFAULT_BATCH_SIZE):
+        if method not in KEYS:
+            raise ValueError("Unknown scheduling method {!r}".format(method))
+
+        self.method     = method
+        self.batch_size = batch_size
+        self.key        = KEYS[method]
+
+    def sort(self, paths):
+        """
+        Returns a new list of the paths (or records) in physical order.
+        """
+        keys = {}
+        for item in paths:
+            try:
+                keys[item_path(item)] = self.key(item)
+            except (IOError, OSError):
+                keys[item_path(item)] = (float('inf'),)
+
+        return sorted(paths, key=lambda item: keys[item_path(item)])
+
+    def schedule(self, paths):
+        """
+        Yields the paths from the iterable, sorting them a batch at a time.
+        """
+        for batch in chunked(paths, self.batch_size):
+            for path in self.sort(batch):
+                yield path
+
+    def __call__(self, paths):
+        return self.schedule(paths)
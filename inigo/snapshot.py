@@ -0,0 +1,172 @@
+# inigo.snapshot
+# Persistent snapshot of directory meta data for incremental walks
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sun Oct 18 19:52:16 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: snapshot.py [] benjamin@bengfort.com $
+
+"""
+Persistent snapshot of directory meta data for incremental walks.
+
+The mtime and ctime of a directory change whenever an entry is added to,
+removed from, or renamed in the directory. The snapshot records these times
+for every directory visited by a walk along with the names of its child
+directories, so that the next walk can skip listing any directory that
+hasn't changed; its subdirectories are taken from the snapshot and only
+stat'd, so unchanged subtrees cost one stat per directory.
+
+Note that modifying a file in place does not change the times of its
+directory, so incremental walks do not notice edited files; a full rescan
+is needed to pick these up. Snapshots are kept per scope (e.g. the command
+that walked the tree) and are only committed once a walk has succeeded.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import sqlite3
+import threading
+
+from inigo.config import settings
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    scope       TEXT NOT NULL,
+    path        TEXT NOT NULL,
+    mtime       INTEGER NOT NULL,
+    ctime       INTEGER NOT NULL,
+    children    INTEGER NOT NULL,
+    subdirs     TEXT NOT NULL, -- names joined by the path separator
+    PRIMARY KEY (scope, path)
+)
+"""
+
+##########################################################################
+## Helper Methods
+##########################################################################
+
+def dir_key(st):
+    """
+    Returns the (mtime_ns, ctime_ns) tuple for the stat of a directory.
+    Python 2 does not expose the ns times so they are derived from floats.
+    """
+    mtime = getattr(st, 'st_mtime_ns', None)
+    if mtime is None:
+        mtime = int(st.st_mtime * 1000000000)
+
+    ctime = getattr(st, 'st_ctime_ns', None)
+    if ctime is None:
+        ctime = int(st.st_ctime * 1000000000)
+
+    return (mtime, ctime)
+
+def get_directory_snapshot(scope):
+    """
+    Returns the directory snapshot for the scope as specified by the
+    settings, or None if snapshots have been disabled in the configuration.
+    """
+    if not settings.walk.snapshot:
+        return None
+    return DirectorySnapshot(settings.walk.snapshot, scope)
+
+##########################################################################
+## Directory Snapshot
+##########################################################################
+
+class DirectorySnapshot(object):
+    """
+    Wraps a SQLite database that stores the times, number of children, and
+    child directory names of every directory seen by a walk. Changes are
+    made in a transaction that must be committed once the walk succeeds,
+    otherwise directories that failed would be skipped by the next walk.
+    The snapshot can be shared by the threads of a parallel walk.
+    """
+
+    def __init__(self, path=":memory:", scope="default"):
+        if path != ":memory:":
+            path = os.path.abspath(os.path.expanduser(path))
+            directory = os.path.dirname(path)
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+
+        self.path  = path
+        self.scope = scope
+        self.lock  = threading.Lock()
+        self.conn  = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+    def get(self, path, st):
+        """
+        Returns the names of the child directories of the path if it hasn't
+        changed since it was recorded, or None if the directory has changed
+        or is not in the snapshot and therefore must be listed.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT mtime, ctime, subdirs FROM directories "
+                "WHERE scope=? AND path=?", (self.scope, path)
+            ).fetchone()
+
+        if row is None or tuple(row[:2]) != dir_key(st):
+            return None
+        return row[2].split(os.sep) if row[2] else []
+
+    def record(self, path, st, subdirs, children):
+        """
+        Records the stat data of a directory that has just been listed along
+        with the names of its subdirectories and its total number of entries.
+        Recorded directories are not saved until the snapshot is committed.
+        """
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO directories VALUES (?,?,?,?,?,?)",
+                (self.scope, path) + dir_key(st) + (children, os.sep.join(subdirs))
+            )
+
+    def commit(self):
+        """
+        Saves the directories recorded since the last commit or rollback.
+        """
+        self.conn.commit()
+
+    def rollback(self):
+        """
+        Discards the directories recorded since the last commit.
+        """
+        self.conn.rollback()
+
+    def clear(self):
+        """
+        Removes every directory in the scope so the next walk is a full scan
+        and returns the number of directories that were removed.
+        """
+        cursor = self.conn.execute(
+            "DELETE FROM directories WHERE scope=?", (self.scope,)
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        """
+        Closes the connection to the snapshot database.
+        """
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM directories WHERE scope=?", (self.scope,)
+        ).fetchone()[0]
+
+    def __repr__(self):
+        return "<{}: {} ({})>".format(self.__class__.__name__, self.path, self.scope)
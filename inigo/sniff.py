@@ -0,0 +1,155 @@
+# inigo.sniff
+# Fast mimetype detection from the leading bytes of common media files
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sat Oct 17 17:31:12 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: sniff.py [] benjamin@bengfort.com $
+
+"""
+Fast mimetype detection from the leading bytes of common media files.
+
+Nearly every file in a photo archive is one of a handful of formats that
+can be identified from a fixed magic number at the start of the file, so
+these are recognized directly from the header. Only files with unknown
+headers are passed to libmagic, through a single shared handle.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import magic
+import threading
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Number of bytes to read from the start of a file to identify it
+HEADER_SIZE = 32
+
+# Maximum number of results memoized before the memo is reset
+MEMO_SIZE = 100000
+
+# (offset, magic bytes, mimetype) for fixed position signatures
+SIGNATURES = (
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (0, b"II*\x00\x10\x00\x00\x00CR", "image/x-canon-cr2"),
+    (0, b"II*\x00", "image/tiff"),
+    (0, b"MM\x00*", "image/tiff"),
+)
+
+# ISO base media file format brands found in the ftyp box
+FTYP_BRANDS = {
+    b"heic": "image/heic",
+    b"heix": "image/heic",
+    b"heim": "image/heic",
+    b"heis": "image/heic",
+    b"mif1": "image/heif",
+    b"msf1": "image/heif",
+    b"qt  ": "video/quicktime",
+    b"isom": "video/mp4",
+    b"iso2": "video/mp4",
+    b"mp41": "video/mp4",
+    b"mp42": "video/mp4",
+    b"avc1": "video/mp4",
+    b"M4V ": "video/x-m4v",
+    b"3gp4": "video/3gpp",
+    b"3gp5": "video/3gpp",
+    b"3gp6": "video/3gpp",
+}
+
+##########################################################################
+## Header Sniffing
+##########################################################################
+
+def sniff(header):
+    """
+    Returns the mimetype identified from the leading bytes of a file, or
+    None if the header does not match any of the known signatures.
+    """
+    for offset, signature, mimetype in SIGNATURES:
+        if header[offset:offset+len(signature)] == signature:
+            return mimetype
+
+    if header[4:8] == b"ftyp":
+        return FTYP_BRANDS.get(header[8:12])
+
+    if header[0:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+
+    return None
+
+##########################################################################
+## Mimetype Detector
+##########################################################################
+
+class MimeDetector(object):
+    """
+    Detects the mimetype of files by sniffing their headers, falling back
+    to a single libmagic handle for unknown headers. Results are memoized
+    by a key that identifies the file contents, e.g. its device, inode,
+    mtime and size.
+    """
+
+    def __init__(self, memo_size=MEMO_SIZE):
+        self.memo_size = memo_size
+        self.memo      = {}
+        self.lock      = threading.Lock()
+        self._magic    = None
+
+    @property
+    def magic(self):
+        """
+        The shared libmagic handle, opened the first time it is needed.
+        """
+        if self._magic is None:
+            self._magic = magic.Magic(mime=True)
+        return self._magic
+
+    def from_file(self, path, key=None):
+        """
+        Returns the mimetype of the file at the path. If a key is given, the
+        result is memoized so the file is only read if the key changes.
+        """
+        if key is not None and key in self.memo:
+            return self.memo[key]
+
+        with open(path, 'rb') as f:
+            mimetype = sniff(f.read(HEADER_SIZE))
+
+        if mimetype is None:
+            # The libmagic handle is not safe to share between threads
+            with self.lock:
+                mimetype = self.magic.from_file(path)
+
+        if key is not None:
+            if len(self.memo) >= self.memo_size:
+                self.memo.clear()
+            self.memo[key] = mimetype
+
+        return mimetype
+
+    def from_buffer(self, header):
+        """
+        Returns the mimetype of the file whose leading bytes are given.
+        """
+        mimetype = sniff(header)
+        if mimetype is None:
+            with self.lock:
+                mimetype = self.magic.from_buffer(header)
+        return mimetype
+
+    def __call__(self, path, key=None):
+        return self.from_file(path, key)
+
+
+# Shared detector used by the file system nodes
+detector = MimeDetector()
@@ -0,0 +1,98 @@
+# inigo.spatial
+# Queries for pictures by the location they were taken.
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 15:02:44 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: spatial.py [] benjamin@bengfort.com $
+
+"""
+Queries for pictures by the location they were taken.
+
+Radius searches happen in two steps: the database prunes the pictures to
+the ones in the geohash cells that cover the circle, as ranges over the
+geohash index, then the great circle distances of the candidates are
+computed with NumPy to keep only the ones actually inside the circle.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import numpy as np
+
+from sqlalchemy import and_, or_
+
+from inigo.models import Picture
+from inigo.geocode import EARTH_RADIUS
+from inigo.geohash import cover, prefix_range, KM_PER_DEGREE
+
+##########################################################################
+## Distances
+##########################################################################
+
+def haversine(lat1, lon1, lat2, lon2):
+    """
+    Returns the great circle distances in kilometers between coordinates in
+    decimal degrees, any of which may be arrays that broadcast together.
+    """
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(value, dtype=np.float64))
+        for value in (lat1, lon1, lat2, lon2)
+    )
+
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2 +
+        np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+##########################################################################
+## Queries
+##########################################################################
+
+def cell_filter(cells):
+    """
+    Returns a filter matching the pictures whose geohash starts with any of
+    the cells. The prefixes are compared as ranges rather than with LIKE so
+    that the btree index is used whatever the collation of the database.
+    """
+    clauses = []
+    for cell in cells:
+        lower, upper = prefix_range(cell)
+        if upper is None:
+            clauses.append(Picture.geohash >= lower)
+        else:
+            clauses.append(and_(Picture.geohash >= lower, Picture.geohash < upper))
+    return or_(*clauses)
+
+
+def near(session, latitude, longitude, radius, limit=None):
+    """
+    Returns a list of (distance, picture id) of the pictures taken within
+    radius kilometers of the coordinates, nearest first.
+    """
+    query = session.query(Picture.id, Picture.latitude, Picture.longitude)
+    cells = cover(latitude, longitude, radius)
+
+    if cells is not None:
+        query = query.filter(cell_filter(cells))
+    else:
+        # Too big a circle for the geohash cells, prune by latitude instead
+        reach = radius / KM_PER_DEGREE
+        query = query.filter(Picture.latitude.isnot(None))
+        query = query.filter(Picture.latitude.between(latitude - reach, latitude + reach))
+
+    rows = query.all()
+    if not rows:
+        return []
+
+    ids, lats, lons = zip(*rows)
+    distance = haversine(latitude, longitude, lats, lons)
+
+    inside = np.flatnonzero(distance <= radius)
+    inside = inside[np.argsort(distance[inside], kind='mergesort')][:limit]
+    return [(float(distance[idx]), ids[idx]) for idx in inside]
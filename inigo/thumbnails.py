@@ -0,0 +1,327 @@
+# inigo.thumbnails
+# Content addressed cache of image thumbnails decoded at reduced resolution
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 01:12:44 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: thumbnails.py [] benjamin@bengfort.com $
+
+"""
+Content addressed cache of image thumbnails decoded at reduced resolution.
+
+Thumbnails are stored in a directory on the local machine keyed by the
+signature of the picture, so a picture has one set of thumbnails no matter
+how many copies of it exist, and a thumbnail never has to be invalidated
+(if the image changes, so does its signature). Decoding a full size JPEG
+is by far the most expensive part of making a thumbnail, so JPEGs are
+decoded in draft mode, where libjpeg scales the image down by a power of
+two as part of the DCT, and the largest thumbnail is made first so that
+each smaller size is made from the previous one rather than from scratch.
+
+The cache is bounded in size by evicting the least recently used
+thumbnails; the modification time of a thumbnail is updated when it is
+read, since access times are not reliably kept by most file systems.
+Thumbnails made by the cache are never evicted by it: a backfill makes no
+more thumbnails than fit in the cache, then evicts older ones to make room.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import tempfile
+import multiprocessing
+
+from PIL import Image
+from functools import partial
+
+from inigo.config import settings
+from inigo.utils import chunked
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+DEFAULT_SIZES   = (512, 256, 128)
+DEFAULT_QUALITY = 85
+EXTENSION       = ".jpg"
+
+# Number of images sent to each thumbnail worker at a time
+DEFAULT_CHUNKSIZE = 4
+
+# Number of chunks per worker that are read from the jobs and queued at a
+# time, so the jobs are read as they're needed and on the calling thread
+QUEUED_CHUNKS = 2
+
+##########################################################################
+## Thumbnail Generation
+##########################################################################
+
+def make_thumbnails(src, sizes=DEFAULT_SIZES):
+    """
+    Decodes the image at src once at the smallest resolution that is still
+    larger than the biggest size, then returns a dict of each size to an
+    RGB image whose longest side is at most size pixels.
+    """
+    sizes  = sorted(set(sizes), reverse=True)
+    thumbs = {}
+
+    original = Image.open(src)
+    try:
+        # Scales JPEGs during decoding, a no-op for other formats
+        original.draft('RGB', (sizes[0], sizes[0]))
+        img = original.convert('RGB')
+
+        for size in sizes:
+            # Reduce by whole factors cheaply (Pillow >= 7) before resampling
+            factor = min(img.size) // size if min(img.size) > size else 1
+            if factor > 1 and hasattr(img, 'reduce'):
+                img = img.reduce(factor)
+
+            img = img.copy()
+            img.thumbnail((size, size), Image.ANTIALIAS)
+            thumbs[size] = img
+    finally:
+        original.close()
+
+    return thumbs
+
+
+def _thumbnail_job(job, root=None, sizes=DEFAULT_SIZES, quality=DEFAULT_QUALITY):
+    """
+    Worker function that makes and stores the thumbnails of a (signature,
+    path) job for the pool, returning a (signature, error) pair where the
+    error is None if the thumbnails were made, so that one bad image does
+    not abort the entire batch.
+    """
+    signature, path = job
+    try:
+        cache = ThumbnailCache(root)
+        for size, img in make_thumbnails(path, sizes).iteritems():
+            cache.put(signature, size, img, quality)
+        return signature, None
+    except Exception as e:
+        return signature, "{}: {}".format(e.__class__.__name__, e)
+
+
+def generate_thumbnails(jobs, cache, sizes=DEFAULT_SIZES, workers=None,
+                        quality=DEFAULT_QUALITY, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Makes the thumbnails for the iterable of (signature, path) jobs in a
+    pool of worker processes, yielding (signature, error) pairs in
+    completion order, where the error is None if the thumbnails were made.
+    Stops once the thumbnails that were made fill the cache, since any
+    more would only push out the ones that were just made; the jobs are
+    read as they're needed, so the rest of them are never read.
+    """
+    results = _generate(jobs, cache.root, sizes, workers, quality, chunksize)
+    try:
+        for signature, error in results:
+            if error is None:
+                cache.created(signature, sizes)
+
+            yield signature, error
+            if cache.full():
+                break
+    finally:
+        results.close()
+
+
+def _generate(jobs, root, sizes, workers, quality, chunksize):
+    """
+    Yields the (signature, error) pairs of the jobs from the pool. The jobs
+    are fed to the pool a few chunks per worker at a time from this thread
+    rather than by the task feeder of the pool, so that only the jobs that
+    are needed are read before the caller stops.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    worker  = partial(_thumbnail_job, root=root, sizes=sizes, quality=quality)
+
+    # Don't bother spinning up a pool for serial generation
+    if workers == 1:
+        for job in jobs:
+            yield worker(job)
+        return
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        for batch in chunked(jobs, workers * chunksize * QUEUED_CHUNKS):
+            for pair in pool.imap_unordered(worker, batch, chunksize):
+                yield pair
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+##########################################################################
+## Thumbnail Cache
+##########################################################################
+
+class ThumbnailCache(object):
+    """
+    Stores thumbnails in a directory tree keyed by the signature of the
+    picture and the size of the thumbnail. Signatures are base64 encoded,
+    so they are made file system safe and the thumbnails are fanned out
+    into subdirectories by the first two characters of their key.
+
+    The paths of the thumbnails made through the cache are tracked so that
+    they are not evicted, and so that no more thumbnails are made than fit
+    in max_bytes.
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = os.path.expanduser(root or settings.thumbnails.cache)
+        self.max_bytes = max_bytes
+        self.made = set()
+        self.made_bytes = 0
+
+    def key(self, signature):
+        """
+        Returns the file system safe key of the signature.
+        """
+        return signature.replace("/", "_").replace("+", "-").rstrip("=")
+
+    def path(self, signature, size):
+        """
+        Returns the path of the thumbnail of the signature at the size.
+        """
+        key = self.key(signature)
+        return os.path.join(
+            self.root, key[:2], "{}-{}{}".format(key, size, EXTENSION)
+        )
+
+    def get(self, signature, size):
+        """
+        Returns the path of the thumbnail or None if it isn't cached, marking
+        the thumbnail as recently used so that it isn't evicted.
+        """
+        path = self.path(signature, size)
+        try:
+            os.utime(path, None)
+        except OSError:
+            return None
+        return path
+
+    def has(self, signature, sizes=DEFAULT_SIZES):
+        """
+        Returns True if thumbnails of every size are cached for the signature.
+        """
+        return all(os.path.exists(self.path(signature, size)) for size in sizes)
+
+    def put(self, signature, size, img, quality=DEFAULT_QUALITY):
+        """
+        Saves the Pillow image as the thumbnail of the signature at the size.
+        The thumbnail is written to a temporary file and then renamed, so a
+        partially written thumbnail is never read from the cache.
+        """
+        path = self.path(signature, size)
+        directory = os.path.dirname(path)
+        if not os.path.exists(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Another worker may have created the directory
+                if not os.path.isdir(directory):
+                    raise
+
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                img.save(f, "JPEG", quality=quality)
+            os.rename(tmp, path)
+        except:
+            os.remove(tmp)
+            raise
+
+        return path
+
+    def created(self, signature, sizes=DEFAULT_SIZES):
+        """
+        Records that the thumbnails of the signature were just made (e.g. by
+        a worker process), so that they are counted and won't be evicted.
+        """
+        for size in sizes:
+            path = self.path(signature, size)
+            if path in self.made:
+                continue
+
+            try:
+                self.made_bytes += os.path.getsize(path)
+            except OSError:
+                continue
+            self.made.add(path)
+
+    def full(self):
+        """
+        Returns True if the thumbnails made fill the cache up to max_bytes.
+        """
+        return self.max_bytes is not None and self.made_bytes >= self.max_bytes
+
+    def entries(self):
+        """
+        Yields (mtime, size, path) for every thumbnail in the cache.
+        """
+        if not os.path.isdir(self.root):
+            return
+
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                if not name.endswith(EXTENSION):
+                    continue
+
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield st.st_mtime, st.st_size, path
+
+    def evict(self, max_bytes=None):
+        """
+        Removes the least recently used thumbnails until the cache is no
+        larger than max_bytes (by default the bound of the cache), returning
+        the number of thumbnails that were removed. Thumbnails made through
+        the cache are kept, even though they may be the least recently used.
+        """
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        if max_bytes is None:
+            return 0
+
+        entries = sorted(self.entries())
+        total   = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+
+            if path in self.made:
+                continue
+
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+            total -= size
+            removed += 1
+
+        return removed
+
+    def size(self):
+        """
+        Returns the number of bytes used by the thumbnails in the cache.
+        """
+        return sum(size for _, size, _ in self.entries())
+
+    def __len__(self):
+        return sum(1 for _ in self.entries())
+
+    def __repr__(self):
+        return "<{} at {}>".format(self.__class__.__name__, self.root)
@@ -0,0 +1,301 @@
+# inigo.transfer
+# Copies files using the fastest mechanism supported by the file system
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sun Oct 18 09:14:26 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: transfer.py [] benjamin@bengfort.com $
+
+"""
+Copies files using the fastest mechanism supported by the file system.
+
+The copy engine tries each strategy in order, falling back to the next if
+the file system or kernel does not support it:
+
+    1. reflink: FICLONE ioctl shares the blocks on copy-on-write file systems
+    2. copy_file_range: copies inside the kernel (and server side for NFS)
+    3. sendfile: copies inside the kernel through the page cache
+    4. buffered: reads into a reusable buffer and writes it out
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import io
+import stat
+import errno
+import fcntl
+
+from functools import partial
+from collections import defaultdict
+
+from inigo.config import settings
+from inigo.utils import posix
+from inigo.exceptions import VerificationError
+from inigo.hashing import DEFAULT_ALGORITHM, DEFAULT_CHECKSUM
+from inigo.hashing import MultiHash, compute_signature
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+REFLINK         = "reflink"
+COPY_FILE_RANGE = "copy_file_range"
+SENDFILE        = "sendfile"
+BUFFERED        = "buffered"
+STRATEGIES      = (REFLINK, COPY_FILE_RANGE, SENDFILE, BUFFERED)
+
+# Linux ioctl request to clone a file: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+# Default number of bytes copied per system call
+DEFAULT_CHUNKSIZE = 8 * 1024 * 1024
+
+# Errors that mean a strategy isn't supported for these files
+UNSUPPORTED = frozenset(
+    getattr(errno, name) for name in (
+        'ENOSYS', 'EXDEV', 'EINVAL', 'ENOTTY', 'EOPNOTSUPP', 'ENOTSUP',
+        'EBADF', 'EPERM', 'ETXTBSY',
+    ) if hasattr(errno, name)
+)
+
+# Errors that mean a strategy will never be supported by this kernel
+UNAVAILABLE = frozenset((errno.ENOSYS,))
+
+##########################################################################
+## Copy Engine
+##########################################################################
+
+class CopyEngine(object):
+    """
+    Copies file data using the fallback chain of strategies, then copies
+    the permission bits and timestamps of the source (like shutil.copy2).
+
+    If fsync is True then the data of each copied file is flushed to disk.
+    If batch_fsync is also True, the flushes are deferred and performed a
+    directory at a time (files then the directory) when flush is called.
+    """
+
+    def __init__(self, strategies=STRATEGIES, chunksize=DEFAULT_CHUNKSIZE,
+                 fsync=False, batch_fsync=False):
+        for strategy in strategies:
+            if strategy not in STRATEGIES:
+                raise ValueError("Unknown copy strategy {!r}".format(strategy))
+
+        self.strategies  = list(strategies)
+        self.chunksize   = chunksize
+        self.fsync       = fsync
+        self.batch_fsync = batch_fsync
+        self.unavailable = set()
+        self.pending     = defaultdict(list)
+        self._buffer     = None
+
+    def copy(self, src, dst):
+        """
+        Copies the data, mode and times of src to dst, returning the name of
+        the strategy that was used to copy the data.
+        """
+        return self.transfer(src, dst, self.copy_data)
+
+    def copy_hashed(self, src, dst, algorithm=DEFAULT_ALGORITHM):
+        """
+        Copies src to dst through the buffered strategy, feeding every buffer
+        that is written to the hash as well, so that the file only has to be
+        read once to both copy it and compute its signature. Returns the b64
+        encoded signature of the data that was written.
+        """
+        return self.copy_digests(src, dst, (algorithm,))[algorithm]
+
+    def copy_digests(self, src, dst, algorithms=(DEFAULT_ALGORITHM, DEFAULT_CHECKSUM)):
+        """
+        Like copy_hashed but computes a digest for each of the algorithms
+        from the buffers that are written, returning a dict of the digests.
+        """
+        sig = MultiHash(algorithms)
+        self.transfer(src, dst, partial(self.copy_buffered, sig=sig))
+        return sig.digests()
+
+    def transfer(self, src, dst, func):
+        """
+        Opens the source and destination, then calls func with both file
+        descriptors and the size of the source to copy the data. Handles the
+        fsync of the destination and copies the mode and times of the source.
+        Returns the result of the copy function.
+        """
+        srcfd = os.open(src, os.O_RDONLY)
+        try:
+            st = os.fstat(srcfd)
+            posix.fadvise(srcfd, 0, 0, posix.POSIX_FADV_SEQUENTIAL)
+
+            dstfd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            try:
+                result = func(srcfd, dstfd, st.st_size)
+                if self.fsync and not self.batch_fsync:
+                    os.fsync(dstfd)
+            finally:
+                os.close(dstfd)
+        finally:
+            os.close(srcfd)
+
+        os.chmod(dst, stat.S_IMODE(st.st_mode))
+        os.utime(dst, (st.st_atime, st.st_mtime))
+
+        if self.fsync and self.batch_fsync:
+            self.pending[os.path.dirname(os.path.abspath(dst))].append(dst)
+
+        return result
+
+    def copy_data(self, srcfd, dstfd, size):
+        """
+        Copies size bytes from srcfd to dstfd with the first strategy that
+        succeeds, rewinding both files before falling back to the next one.
+        """
+        for strategy in self.strategies:
+            if strategy in self.unavailable:
+                continue
+
+            try:
+                getattr(self, "copy_" + strategy)(srcfd, dstfd, size)
+                return strategy
+            except (IOError, OSError) as e:
+                if e.errno not in UNSUPPORTED or strategy == BUFFERED:
+                    raise
+
+                if e.errno in UNAVAILABLE:
+                    self.unavailable.add(strategy)
+
+                os.lseek(srcfd, 0, os.SEEK_SET)
+                os.lseek(dstfd, 0, os.SEEK_SET)
+                os.ftruncate(dstfd, 0)
+
+        raise OSError(errno.ENOTSUP, "No copy strategy succeeded")
+
+    def copy_reflink(self, srcfd, dstfd, size):
+        """
+        Shares the extents of the source with the destination on CoW file
+        systems such as btrfs and XFS, so no data is actually copied.
+        """
+        fcntl.ioctl(dstfd, FICLONE, srcfd)
+
+    def copy_copy_file_range(self, srcfd, dstfd, size):
+        """
+        Copies the data inside the kernel with copy_file_range.
+        """
+        self._copy_kernel(posix.copy_file_range, srcfd, dstfd, size)
+
+    def copy_sendfile(self, srcfd, dstfd, size):
+        """
+        Copies the data inside the kernel with sendfile.
+        """
+        self._copy_kernel(self._sendfile, srcfd, dstfd, size)
+
+    def _sendfile(self, srcfd, dstfd, count):
+        return posix.sendfile(dstfd, srcfd, count)
+
+    def _copy_kernel(self, func, srcfd, dstfd, size):
+        """
+        Calls the in kernel copy function until the whole file is copied.
+        Some file systems (e.g. procfs or some FUSE and network mounts)
+        report the end of the file early, so a copy that comes up short
+        raises an unsupported error to fall back to the next strategy.
+        """
+        total = 0
+        while total < size:
+            copied = func(srcfd, dstfd, min(self.chunksize, size - total))
+            if copied == 0:
+                raise OSError(
+                    errno.EINVAL, "Copied {} of {} bytes".format(total, size)
+                )
+            total += copied
+
+    def copy_buffered(self, srcfd, dstfd, size, sig=None):
+        """
+        Copies the data through a reusable userspace buffer. If a hash is
+        passed in, then it is updated with every buffer that is written.
+        """
+        if self._buffer is None or len(self._buffer) != self.chunksize:
+            self._buffer = bytearray(self.chunksize)
+
+        view = memoryview(self._buffer)
+        with io.open(srcfd, 'rb', buffering=0, closefd=False) as f:
+            for nbytes in iter(lambda: f.readinto(self._buffer), 0):
+                if sig is not None:
+                    sig.update(view[:nbytes])
+
+                written = 0
+                while written < nbytes:
+                    written += os.write(dstfd, view[written:nbytes])
+
+    def flush(self):
+        """
+        Performs any deferred fsyncs, a directory at a time: each pending
+        file in the directory is flushed and then the directory itself.
+        """
+        for directory, paths in self.pending.iteritems():
+            for path in paths:
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+            fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+        self.pending.clear()
+
+    def __call__(self, src, dst):
+        return self.copy(src, dst)
+
+##########################################################################
+## Verification
+##########################################################################
+
+def verify_file(path, signature, algorithm=DEFAULT_ALGORITHM):
+    """
+    Reads back the file at path and checks that it matches the signature,
+    raising a VerificationError if it does not. The file is flushed and then
+    evicted from the page cache first, so that the data is read from the
+    disk rather than from the cached pages that were just written. Prefer
+    passing the fast checksum of the file, which is cheaper to recompute.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        posix.fadvise(fd, 0, 0, posix.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+    actual = compute_signature(path, algorithm, drop_cache=True)
+    if actual != signature:
+        raise VerificationError(
+            "Signature of {!r} is {} but expected {}".format(path, actual, signature)
+        )
+
+    return actual
+
+##########################################################################
+## Default Engine
+##########################################################################
+
+_engine = None
+
+def get_copy_engine():
+    """
+    Returns the shared copy engine created from the transfer settings.
+    """
+    global _engine
+    if _engine is None:
+        _engine = CopyEngine(
+            settings.transfer.strategies, settings.transfer.chunksize,
+            settings.transfer.fsync, settings.transfer.batch_fsync,
+        )
+    return _engine
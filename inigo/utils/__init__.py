@@ -16,3 +16,21 @@ Utilities and helper functions for Inigo
 ##########################################################################
 ## Imports
 ##########################################################################
+
+from itertools import islice
+
+##########################################################################
+## Iteration Helpers
+##########################################################################
+
+def chunked(iterable, size):
+    """
+    Yields lists of at most size items from the iterable, without ever
+    holding more than one chunk in memory.
+    """
+    iterable = iter(iterable)
+    while True:
+        chunk = list(islice(iterable, size))
+        if not chunk:
+            return
+        yield chunk
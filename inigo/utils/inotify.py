@@ -0,0 +1,150 @@
+# inigo.utils.inotify
+# A minimal ctypes binding to the Linux inotify API.
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sun Oct 18 20:31:09 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: inotify.py [] benjamin@bengfort.com $
+
+"""
+A minimal ctypes binding to the Linux inotify API.
+
+Only the three system calls needed to watch directories are wrapped; the
+events are read directly from the inotify file descriptor and unpacked.
+An OSError with ENOSYS is raised if inotify isn't available on the system,
+and an OSError with ENOSPC if the kernel limit on watches has been reached.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import sys
+import errno
+import ctypes
+import select
+import struct
+
+from collections import namedtuple
+from inigo.utils.posix import libc, _raise_errno
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Events that can be watched for (from sys/inotify.h)
+IN_ACCESS        = 0x00000001
+IN_MODIFY        = 0x00000002
+IN_ATTRIB        = 0x00000004
+IN_CLOSE_WRITE   = 0x00000008
+IN_CLOSE_NOWRITE = 0x00000010
+IN_OPEN          = 0x00000020
+IN_MOVED_FROM    = 0x00000040
+IN_MOVED_TO      = 0x00000080
+IN_CREATE        = 0x00000100
+IN_DELETE        = 0x00000200
+IN_DELETE_SELF   = 0x00000400
+IN_MOVE_SELF     = 0x00000800
+
+# Events that are sent regardless of the watch mask
+IN_UNMOUNT       = 0x00002000
+IN_Q_OVERFLOW    = 0x00004000
+IN_IGNORED       = 0x00008000
+
+# Flags for adding a watch and flags set on events
+IN_ONLYDIR       = 0x01000000
+IN_DONT_FOLLOW   = 0x02000000
+IN_EXCL_UNLINK   = 0x04000000
+IN_ISDIR         = 0x40000000
+
+# Flags for inotify_init1
+IN_CLOEXEC       = 0o2000000
+
+# Each event is a struct inotify_event followed by a null padded name
+EVENT_HEADER = struct.Struct("iIII")
+
+# Number of bytes read from the descriptor at a time
+READ_SIZE = 64 * 1024
+
+##########################################################################
+## Inotify
+##########################################################################
+
+Event = namedtuple("Event", "wd mask cookie name")
+
+
+class Inotify(object):
+    """
+    Wraps an inotify instance, which is closed along with this object.
+    """
+
+    def __init__(self):
+        if libc is None or not hasattr(libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, "inotify is not supported")
+
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            _raise_errno('inotify_init1')
+
+    def fileno(self):
+        return self.fd
+
+    def add_watch(self, path, mask):
+        """
+        Watches the path for the events in the mask, returning the watch
+        descriptor that identifies the events for this path.
+        """
+        if isinstance(path, unicode):
+            path = path.encode(sys.getfilesystemencoding())
+
+        func = libc.inotify_add_watch
+        func.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+        wd = func(self.fd, path, mask)
+        if wd < 0:
+            _raise_errno('inotify_add_watch')
+        return wd
+
+    def rm_watch(self, wd):
+        """
+        Stops watching the path identified by the watch descriptor.
+        """
+        if libc.inotify_rm_watch(self.fd, wd) < 0:
+            _raise_errno('inotify_rm_watch')
+
+    def read(self, timeout=None):
+        """
+        Waits up to timeout seconds (forever if None) for events and returns
+        a list of the events that were read, which is empty on a timeout.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+
+        data   = os.read(self.fd, READ_SIZE)
+        events = []
+        offset = 0
+
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset+length].rstrip(b"\0")
+            offset += length
+            events.append(Event(wd, mask, cookie, name))
+
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
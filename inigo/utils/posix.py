@@ -0,0 +1,165 @@
+# inigo.utils.posix
+# Wrappers for POSIX system calls that are missing from the os module.
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sat Oct 17 16:05:38 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: posix.py [] benjamin@bengfort.com $
+
+"""
+Wrappers for POSIX system calls that are missing from the os module.
+
+Python 2 does not expose calls like posix_fadvise, copy_file_range or
+sendfile, so these are accessed through ctypes when the os module doesn't
+provide them. Advice is a no-op on platforms where it isn't available,
+while the copy calls raise an OSError with ENOSYS so callers can fall back.
+The physical location of file data is found with the FIEMAP ioctl.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import array
+import errno
+import fcntl
+import struct
+import ctypes
+import ctypes.util
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Advice values for posix_fadvise (these are the Linux values)
+POSIX_FADV_NORMAL     = getattr(os, 'POSIX_FADV_NORMAL', 0)
+POSIX_FADV_SEQUENTIAL = getattr(os, 'POSIX_FADV_SEQUENTIAL', 2)
+POSIX_FADV_DONTNEED   = getattr(os, 'POSIX_FADV_DONTNEED', 4)
+
+# Linux ioctl request to map the extents of a file: _IOWR('f', 11, struct fiemap)
+FS_IOC_FIEMAP    = 0xC020660B
+FIEMAP_MAX_LEN   = 0xFFFFFFFFFFFFFFFF
+
+# struct fiemap is followed by an array of struct fiemap_extent
+FIEMAP_HEADER    = struct.Struct("=QQIIII")
+FIEMAP_EXTENT    = struct.Struct("=QQQ2QI3I")
+
+##########################################################################
+## Load the C Library
+##########################################################################
+
+def _load_libc():
+    """
+    Returns the C library loaded with ctypes or None if it can't be found.
+    """
+    name = ctypes.util.find_library('c')
+    if name is None:
+        return None
+
+    try:
+        return ctypes.CDLL(name, use_errno=True)
+    except OSError:
+        return None
+
+libc = _load_libc()
+
+##########################################################################
+## System Calls
+##########################################################################
+
+def fadvise(fd, offset, length, advice):
+    """
+    Announces the intention to access file data in a specific pattern so
+    that the kernel can perform appropriate optimizations. Returns True if
+    the advice was given, False if posix_fadvise isn't supported here.
+    """
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(fd, offset, length, advice)
+        return True
+
+    func = getattr(libc, 'posix_fadvise', None)
+    if func is None:
+        return False
+
+    func.argtypes = [ctypes.c_int, ctypes.c_int64, ctypes.c_int64, ctypes.c_int]
+    return func(fd, offset, length, advice) == 0
+
+
+def _raise_errno(func):
+    """
+    Raises an OSError from the errno set by a failed ctypes call.
+    """
+    err = ctypes.get_errno()
+    raise OSError(err, "{}: {}".format(func, os.strerror(err)))
+
+
+def copy_file_range(src, dst, count):
+    """
+    Copies up to count bytes from the src to the dst file descriptors from
+    their current offsets inside the kernel. Returns the number of bytes
+    copied or raises an OSError (ENOSYS if the call isn't available).
+    """
+    if hasattr(os, 'copy_file_range'):
+        return os.copy_file_range(src, dst, count)
+
+    func = getattr(libc, 'copy_file_range', None)
+    if func is None:
+        raise OSError(errno.ENOSYS, "copy_file_range is not supported")
+
+    func.argtypes = [
+        ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p,
+        ctypes.c_size_t, ctypes.c_uint,
+    ]
+    func.restype = ctypes.c_ssize_t
+
+    copied = func(src, None, dst, None, count, 0)
+    if copied < 0:
+        _raise_errno('copy_file_range')
+    return copied
+
+
+def sendfile(dst, src, count):
+    """
+    Copies up to count bytes from the src to the dst file descriptors from
+    their current offsets inside the kernel. Returns the number of bytes
+    copied or raises an OSError (ENOSYS if the call isn't available).
+    """
+    if hasattr(os, 'sendfile'):
+        return os.sendfile(dst, src, None, count)
+
+    func = getattr(libc, 'sendfile', None)
+    if func is None:
+        raise OSError(errno.ENOSYS, "sendfile is not supported")
+
+    func.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t]
+    func.restype = ctypes.c_ssize_t
+
+    copied = func(dst, src, None, count)
+    if copied < 0:
+        _raise_errno('sendfile')
+    return copied
+
+
+def physical_offset(fd):
+    """
+    Returns the physical byte offset on the device of the first extent of
+    the file using the FIEMAP ioctl, or None if the file has no extents
+    (e.g. it is empty) or the file system does not support FIEMAP.
+    """
+    # Request a single extent: fm_start, fm_length, fm_flags, mapped, count
+    buf = array.array('B', FIEMAP_HEADER.pack(0, FIEMAP_MAX_LEN, 0, 0, 1, 0))
+    buf.extend([0] * FIEMAP_EXTENT.size)
+
+    try:
+        fcntl.ioctl(fd, FS_IOC_FIEMAP, buf, True)
+    except (IOError, OSError):
+        return None
+
+    mapped = FIEMAP_HEADER.unpack_from(buf)[3]
+    if not mapped:
+        return None
+    return FIEMAP_EXTENT.unpack_from(buf, FIEMAP_HEADER.size)[1]
@@ -19,6 +19,8 @@ Time utilities for timestamps with timezones and more!
 
 import re
 
+from calendar import timegm
+
 from dateutil.tz import tzlocal, tzutc
 from datetime import date, datetime, timedelta
 from dateutil.relativedelta import relativedelta
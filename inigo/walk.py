@@ -0,0 +1,233 @@
+# inigo.walk
+# Lists the directories of a tree concurrently from a pool of threads
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sun Oct 18 22:05:41 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: walk.py [] benjamin@bengfort.com $
+
+"""
+Lists the directories of a tree concurrently from a pool of threads.
+
+On network and USB volumes most of the time spent walking a tree is the
+round trip latency of listing each directory, so listing many directories
+at once is much faster than a serial walk even though Python threads
+share the GIL. Each worker keeps its own deque of directories: it pushes
+the subdirectories it finds onto the end of its own deque and pops from
+the end (walking depth first), and when its deque is empty it steals from
+the front of another worker's deque, where the shallower (and usually
+larger) subtrees are found.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import sys
+import Queue
+import threading
+
+from collections import deque
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Placed on the output queue when the walk has finished
+DONE = object()
+
+# Seconds the consumer waits at a time, since Python 2 waits without a
+# timeout cannot be interrupted (e.g. with Ctrl-C)
+WAIT_TIMEOUT = 0.1
+
+##########################################################################
+## Parallel Walker
+##########################################################################
+
+class ParallelWalker(object):
+    """
+    Walks the tree from the root with the given number of worker threads,
+    calling listdir on each directory, which must return a (dirs, files)
+    tuple of DirEntry objects or raise an OSError to skip the directory.
+    Directories deeper than maxdepth are not listed and symbolic links to
+    directories are not followed.
+
+    Iterating over the walker yields (name, dirs, files, depth) tuples as
+    directories are listed. If ordered is True, then the tuples are yielded
+    in the same order as a serial top down walk, and modifying dirs in place
+    prunes the directories that are yielded (though they may be listed);
+    otherwise the tuples are yielded as soon as they are available.
+    """
+
+    def __init__(self, root, listdir, workers=4, maxdepth=None, ordered=False):
+        self.root     = root
+        self.listdir  = listdir
+        self.workers  = workers
+        self.maxdepth = maxdepth
+        self.ordered  = ordered
+
+    def __iter__(self):
+        self.deques   = [deque() for _ in xrange(self.workers)]
+        self.lock     = threading.Condition()
+        self.pending  = 0
+        self.stopped  = False
+        self.error    = None
+        self.output   = Queue.Queue()
+        self.listings = {}
+        self.listed   = threading.Condition()
+
+        self.push(0, self.root, 0)
+        threads = [
+            threading.Thread(target=self.work, args=(idx,))
+            for idx in xrange(self.workers)
+        ]
+
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        try:
+            if self.ordered:
+                for item in self.walk_ordered():
+                    yield item
+            else:
+                for item in self.walk_unordered():
+                    yield item
+        finally:
+            with self.lock:
+                self.stopped = True
+                self.lock.notify_all()
+
+            for thread in threads:
+                thread.join()
+
+        if self.error is not None:
+            raise self.error[0], self.error[1], self.error[2]
+
+    def walk_unordered(self):
+        """
+        Yields the listings from the output queue as they are produced.
+        """
+        while True:
+            try:
+                item = self.output.get(timeout=WAIT_TIMEOUT)
+            except Queue.Empty:
+                continue
+
+            if item is DONE:
+                return
+            yield item
+
+    def walk_ordered(self):
+        """
+        Yields the listings in the order of a serial depth first walk,
+        waiting for each directory to be listed by the workers in turn.
+        """
+        stack = [(self.root, 0)]
+        while stack:
+            name, depth = stack.pop()
+
+            with self.listed:
+                while name not in self.listings and self.error is None:
+                    self.listed.wait(WAIT_TIMEOUT)
+                if self.error is not None:
+                    return
+                listing = self.listings.pop(name)
+
+            if listing is None:
+                continue
+
+            dirs, files = listing
+            yield name, dirs, files, depth
+
+            if self.maxdepth is not None and depth >= self.maxdepth:
+                continue
+
+            for entry in reversed(dirs):
+                if not entry.is_symlink():
+                    stack.append((entry.path, depth + 1))
+
+    def work(self, idx):
+        """
+        Lists directories until there are none left in the tree.
+        """
+        try:
+            while True:
+                task = self.take(idx)
+                if task is None:
+                    return
+
+                name, depth = task
+                try:
+                    listing = self.listdir(name)
+                except OSError:
+                    listing = None
+
+                self.emit(name, listing, depth)
+
+                if listing is not None:
+                    if self.maxdepth is None or depth < self.maxdepth:
+                        for entry in reversed(listing[0]):
+                            if not entry.is_symlink():
+                                self.push(idx, entry.path, depth + 1)
+
+                self.done()
+        except:
+            self.error = sys.exc_info()
+            with self.lock:
+                self.stopped = True
+                self.lock.notify_all()
+            with self.listed:
+                self.listed.notify_all()
+            self.output.put(DONE)
+
+    def take(self, idx):
+        """
+        Returns the next (name, depth) from the end of the worker's own
+        deque, or steals one from the front of another worker's deque.
+        Blocks while there is no work but directories are still being
+        listed (and may produce more work); returns None once the walk is
+        complete or has been stopped.
+        """
+        with self.lock:
+            while not self.stopped:
+                if self.deques[idx]:
+                    return self.deques[idx].pop()
+
+                for offset in xrange(1, self.workers):
+                    victim = self.deques[(idx + offset) % self.workers]
+                    if victim:
+                        return victim.popleft()
+
+                if self.pending == 0:
+                    return None
+
+                self.lock.wait()
+        return None
+
+    def push(self, idx, name, depth):
+        with self.lock:
+            self.pending += 1
+            self.deques[idx].append((name, depth))
+            self.lock.notify()
+
+    def done(self):
+        with self.lock:
+            self.pending -= 1
+            if self.pending == 0:
+                self.lock.notify_all()
+                self.output.put(DONE)
+
+    def emit(self, name, listing, depth):
+        """
+        Hands the listing of the directory to the consumer of the walk.
+        """
+        if self.ordered:
+            with self.listed:
+                self.listings[name] = listing
+                self.listed.notify_all()
+        elif listing is not None:
+            self.output.put((name, listing[0], listing[1], depth))
@@ -0,0 +1,210 @@
+# inigo.watch
+# Watches a directory tree for new files with inotify
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sun Oct 18 20:48:33 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: watch.py [] benjamin@bengfort.com $
+
+"""
+Watches a directory tree for new files with inotify.
+
+The tree watcher places an inotify watch on every directory in the tree
+(adding watches to new directories as they appear) and reports the paths
+of files that finish being written or are moved into the tree; files that
+are still being written are never reported, however long the copy takes.
+Since files may be written in several steps, the paths are passed through
+a debouncer that holds on to each path until no events have been seen for
+it for a short delay (writes to a pending path reset its delay), so that
+files are only handled once.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import time
+
+from collections import OrderedDict
+from inigo.fs import Directory
+from inigo.utils.inotify import Inotify
+from inigo.utils.inotify import IN_CREATE, IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_TO
+from inigo.utils.inotify import IN_ONLYDIR, IN_ISDIR, IN_IGNORED, IN_Q_OVERFLOW
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Events that indicate that a file has been added to the tree
+FILE_EVENTS = IN_CLOSE_WRITE | IN_MOVED_TO
+
+# Events watched for on every directory in the tree; new directories are
+# reported by IN_CREATE and writes to files that are pending by IN_MODIFY
+WATCH_MASK  = FILE_EVENTS | IN_CREATE | IN_MODIFY | IN_ONLYDIR
+
+# Default number of seconds without events before a path is ready
+DEFAULT_DELAY = 2.0
+
+##########################################################################
+## Tree Watcher
+##########################################################################
+
+class TreeWatcher(object):
+    """
+    Watches a directory and (if recursive) its subdirectories up to the
+    maxdepth for new files. If the inotify event queue overflows, events
+    have been lost and overflowed is set so the tree can be rescanned. The
+    paths of files that are written to are collected in modified so that
+    paths that are waiting to be handled can be delayed.
+
+    Adding a watch raises an OSError with ENOSPC when the kernel limit on
+    the number of watches (fs.inotify.max_user_watches) has been reached.
+    """
+
+    def __init__(self, path, recursive=False, maxdepth=None):
+        self.root       = Directory(path).path
+        self.maxdepth   = 0 if maxdepth is None and not recursive else maxdepth
+        self.inotify    = Inotify()
+        self.watches    = {} # Maps watch descriptors to (path, depth)
+        self.overflowed = False
+        self.modified   = set()
+
+        try:
+            self.watch(self.root)
+        except:
+            self.close()
+            raise
+
+    def watch(self, path, depth=0):
+        """
+        Adds watches to the directory and to its subdirectories within the
+        maxdepth, returning the paths of any files already in them. Files
+        can be written to a new directory before it is watched, so these
+        are reported along with the events for the new directory.
+        """
+        maxdepth = None if self.maxdepth is None else self.maxdepth - depth
+
+        found = []
+        for name, dirs, files, subdepth in Directory(path).walk(maxdepth):
+            wd = self.inotify.add_watch(name, WATCH_MASK)
+            self.watches[wd] = (name, depth + subdepth)
+            found.extend(entry.path for entry in files)
+
+        return found
+
+    def read(self, timeout=None):
+        """
+        Waits up to timeout seconds for events, returning the paths of the
+        files that were added to the tree (which may be empty).
+        """
+        paths = []
+        for event in self.inotify.read(timeout):
+            if event.mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+
+            if event.mask & IN_IGNORED:
+                # The directory was removed or the watch was otherwise dropped
+                self.watches.pop(event.wd, None)
+                continue
+
+            if event.wd not in self.watches:
+                continue
+
+            parent, depth = self.watches[event.wd]
+            path = os.path.join(parent, event.name)
+
+            if event.mask & IN_ISDIR:
+                if self.maxdepth is None or depth < self.maxdepth:
+                    if event.mask & (IN_CREATE | IN_MOVED_TO) and os.path.isdir(path):
+                        paths.extend(self.watch(path, depth + 1))
+                continue
+
+            if event.mask & FILE_EVENTS:
+                paths.append(path)
+            elif event.mask & IN_MODIFY:
+                self.modified.add(path)
+
+        return paths
+
+    def close(self):
+        self.inotify.close()
+        self.watches.clear()
+
+    def __len__(self):
+        return len(self.watches)
+
+##########################################################################
+## Debouncer
+##########################################################################
+
+class Debouncer(object):
+    """
+    Collects paths until they have been quiet for the delay in seconds.
+    Tracks when each path was first seen so the lag can be reported.
+    """
+
+    def __init__(self, delay=DEFAULT_DELAY):
+        self.delay   = delay
+        self.pending = OrderedDict() # Maps paths to (first seen, last seen)
+
+    def add(self, path, now=None):
+        """
+        Adds the path or resets its delay if it is already pending.
+        """
+        now = now or time.time()
+        first, _ = self.pending.pop(path, (now, now))
+        self.pending[path] = (first, now)
+
+    def extend(self, paths, now=None):
+        now = now or time.time()
+        for path in paths:
+            self.add(path, now)
+
+    def touch(self, paths, now=None):
+        """
+        Resets the delay of any of the paths that are pending, e.g. because
+        they have been written to again since they were added.
+        """
+        now = now or time.time()
+        for path in paths:
+            if path in self.pending:
+                self.add(path, now)
+
+    def ready(self, now=None):
+        """
+        Removes and returns the (path, first seen) pairs for every path that
+        hasn't been seen for the delay, ordered by when they were last seen.
+        """
+        now   = now or time.time()
+        ready = []
+
+        for path, (first, last) in self.pending.iteritems():
+            # Paths are kept in the order they were last seen
+            if now - last < self.delay:
+                break
+            ready.append((path, first))
+
+        for path, first in ready:
+            del self.pending[path]
+
+        return ready
+
+    def timeout(self, now=None):
+        """
+        Returns the number of seconds until the next path will be ready, or
+        None if there are no paths pending.
+        """
+        if not self.pending:
+            return None
+
+        now  = now or time.time()
+        last = next(self.pending.itervalues())[1]
+        return max(0.0, last + self.delay - now)
+
+    def __len__(self):
+        return len(self.pending)
@@ -0,0 +1,206 @@
+# tests.cache_tests
+# Testing for the signature cache in inigo
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sat Oct 17 14:51:09 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: cache_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for the signature cache in inigo.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from inigo.fs import FileMeta
+from inigo.cache import SignatureCache
+from inigo.hashing import HashingEngine, compute_signature
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+class SignatureCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache  = SignatureCache(os.path.join(self.tmpdir, "cache", "sigs.db"))
+        self.paths  = []
+
+        for idx in xrange(5):
+            path = os.path.join(self.tmpdir, "file{}.dat".format(idx))
+            with open(path, 'wb') as f:
+                f.write(os.urandom(2048))
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_get_set(self):
+        """
+        Assert signatures can be stored and fetched by path
+        """
+        path = self.paths[0]
+        self.assertIsNone(self.cache.get(path))
+        self.cache.set(path, u"sig")
+        self.assertEqual(self.cache.get(path), u"sig")
+        self.assertIn(path, self.cache)
+
+    def test_stale_entry(self):
+        """
+        Assert a modified file does not return its cached signature
+        """
+        path = self.paths[0]
+        self.cache.set(path, u"sig")
+
+        with open(path, 'ab') as f:
+            f.write("more data")
+
+        self.assertIsNone(self.cache.get(path))
+
+    def test_get_many(self):
+        """
+        Assert bulk lookups return only the cached paths
+        """
+        self.cache.set_many([(path, u"sig") for path in self.paths[:3]])
+        found = self.cache.get_many(self.paths)
+        self.assertEqual(set(found), set(self.paths[:3]))
+
+    def test_checksums(self):
+        """
+        Assert checksums are cached along with the signatures
+        """
+        self.cache.set(self.paths[0], u"sig", chkdigest=u"chk")
+        self.cache.set_many([
+            (self.paths[1], {"sha256": u"sig1", "xxh64": u"chk1"}),
+            (self.paths[2], u"sig2"),
+        ])
+
+        self.assertEqual(self.cache.get_digests(self.paths), {
+            self.paths[0]: {"sha256": u"sig", "xxh64": u"chk"},
+            self.paths[1]: {"sha256": u"sig1", "xxh64": u"chk1"},
+            self.paths[2]: {"sha256": u"sig2"},
+        })
+
+        # Checksums of another algorithm aren't returned
+        other = SignatureCache(self.cache.path, checksum="md5")
+        self.assertEqual(other.get_digests(self.paths[:1]), {
+            self.paths[0]: {"sha256": u"sig"},
+        })
+        other.close()
+
+    def test_upgrade(self):
+        """
+        Assert caches created before checksums were stored are upgraded
+        """
+        path = os.path.join(self.tmpdir, "old.db")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE signatures (path TEXT PRIMARY KEY, device INTEGER NOT NULL, "
+            "inode INTEGER NOT NULL, size INTEGER NOT NULL, mtime INTEGER NOT NULL, "
+            "algorithm TEXT NOT NULL, signature TEXT NOT NULL)"
+        )
+        conn.commit()
+        conn.close()
+
+        cache = SignatureCache(path)
+        cache.set(self.paths[0], u"sig", chkdigest=u"chk")
+        self.assertEqual(cache.get_digests(self.paths)[self.paths[0]]["xxh64"], u"chk")
+        cache.close()
+
+    def test_engine_caches_checksums(self):
+        """
+        Assert the hashing engine caches the checksums it computes
+        """
+        engine = HashingEngine(workers=2, cache=self.cache, checksum="xxh64")
+        digests = dict(engine.digests(self.paths))
+        self.assertEqual(self.cache.get_digests(self.paths), digests)
+        self.assertEqual(dict(engine.digests(self.paths)), digests)
+
+    def test_stats_before_hashing(self):
+        """
+        Assert files changed after they were stat'd are not cached
+        """
+        stats = self.cache.stat_many(self.paths[:2])
+        with open(self.paths[0], 'ab') as f:
+            f.write("rewritten")
+
+        self.cache.set_many([(path, u"sig") for path in self.paths[:3]], stats)
+        self.assertEqual(set(self.cache.get_many(self.paths)), set(self.paths[1:2]))
+
+    def test_engine_rewritten_file(self):
+        """
+        Assert the engine doesn't cache files rewritten while being hashed
+        """
+        rewritten = self.paths[0]
+
+        class RewritingEngine(HashingEngine):
+            def compute(self, paths):
+                with open(rewritten, 'ab') as f:
+                    f.write("rewritten")
+                return super(RewritingEngine, self).compute(paths)
+
+        engine = RewritingEngine(workers=1, cache=self.cache)
+        result = dict(engine(self.paths))
+
+        self.assertEqual(result[rewritten], compute_signature(rewritten))
+        self.assertNotIn(rewritten, self.cache)
+        self.assertEqual(set(self.cache.get_many(self.paths)), set(self.paths[1:]))
+
+    def test_evict(self):
+        """
+        Assert entries for deleted files are evicted
+        """
+        self.cache.set_many([(path, u"sig") for path in self.paths])
+        os.remove(self.paths[0])
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertEqual(len(self.cache), 4)
+
+    def test_invalidate(self):
+        """
+        Assert entries can be invalidated by file, directory, or completely
+        """
+        self.cache.set_many([(path, u"sig") for path in self.paths])
+        self.assertEqual(self.cache.invalidate(self.paths[0]), 1)
+        self.assertEqual(self.cache.invalidate(self.tmpdir + "_other"), 0)
+        self.assertEqual(self.cache.invalidate(self.tmpdir), 4)
+
+        self.cache.set(self.paths[1], u"sig")
+        self.assertEqual(self.cache.invalidate(), 1)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_engine_uses_cache(self):
+        """
+        Assert the hashing engine returns cached signatures without hashing
+        """
+        self.cache.set(self.paths[0], u"cached")
+        engine = HashingEngine(workers=2, cache=self.cache)
+        result = dict(engine(self.paths))
+
+        self.assertEqual(result[self.paths[0]], u"cached")
+        self.assertEqual(result[self.paths[1]], compute_signature(self.paths[1]))
+        self.assertEqual(len(self.cache), 5)
+
+    def test_file_meta_uses_cache(self):
+        """
+        Assert file meta consults and populates the cache
+        """
+        meta = FileMeta(self.paths[0], cache=self.cache)
+        self.assertEqual(meta.signature, compute_signature(self.paths[0]))
+        self.assertEqual(self.cache.get(self.paths[0]), meta.signature)
+
+        self.cache.set(self.paths[1], u"cached")
+        meta = FileMeta(self.paths[1], cache=self.cache)
+        self.assertEqual(meta.signature, u"cached")
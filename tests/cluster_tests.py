@@ -0,0 +1,87 @@
+# tests.cluster_tests
+# Testing for the spatio-temporal clustering of pictures
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 17:52:40 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: cluster_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for the spatio-temporal clustering of pictures.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import unittest
+import numpy as np
+
+from datetime import datetime
+from dateutil.tz import tzutc
+
+from inigo.cluster import cluster_events, representatives, to_timestamps
+from inigo.spatial import haversine
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+class ClusterTests(unittest.TestCase):
+
+    def test_to_timestamps(self):
+        """
+        Assert dates are converted to epoch seconds, NaN when unknown
+        """
+        stamps = to_timestamps([datetime(1970, 1, 2, tzinfo=tzutc()), None])
+        self.assertEqual(stamps[0], 86400.0)
+        self.assertTrue(np.isnan(stamps[1]))
+
+    def test_cluster_events(self):
+        """
+        Assert pictures taken together in the same place form an event
+        """
+        latitude   = [38.8977, 38.8979, 38.8977, 39.2904, 38.8978, 38.8977, 38.8977]
+        longitude  = [-77.0365, -77.0367, -77.0365, -76.6122, -77.0366, -77.0365, -77.0365]
+        timestamps = [0, 600, 90000, 1200, 1800, np.nan, np.nan]
+
+        labels = cluster_events(latitude, longitude, timestamps, distance=0.5, gap=3600)
+        self.assertEqual(labels.tolist(), [0, 0, 1, 2, 0, 3, 3])
+
+        # Without timestamps events are only bucketed by location
+        labels = cluster_events(latitude, longitude, distance=0.5)
+        self.assertEqual(labels.tolist(), [0, 0, 0, 1, 0, 0, 0])
+
+        self.assertEqual(cluster_events([], []).tolist(), [])
+        with self.assertRaises(ValueError):
+            cluster_events(latitude, longitude, distance=0)
+
+    def test_event_extent(self):
+        """
+        Assert events are no wider than the diagonal of the grid cells
+        """
+        rand = np.random.RandomState(42)
+        latitude  = rand.uniform(59.9, 60.1, 5000)
+        longitude = rand.uniform(10.6, 10.9, 5000)
+        labels    = cluster_events(latitude, longitude, distance=1.0)
+
+        self.assertLess(labels.max(), 1000)
+        for label in xrange(labels.max() + 1):
+            idx = np.flatnonzero(labels == label)
+            spread = haversine(
+                latitude[idx, np.newaxis], longitude[idx, np.newaxis],
+                latitude[idx], longitude[idx],
+            )
+            self.assertLessEqual(spread.max(), 1.0 * np.sqrt(2) + 1e-3)
+
+    def test_representatives(self):
+        """
+        Assert the picture nearest the centroid represents each event
+        """
+        latitude  = [10.0, 10.001, 10.002, 20.0]
+        longitude = [20.0, 20.001, 20.002, 30.0]
+        self.assertEqual(representatives(latitude, longitude, [0, 0, 0, 1]).tolist(), [1, 3])
+        self.assertEqual(representatives([], [], []).tolist(), [])
@@ -0,0 +1,255 @@
+# tests.exif_tests
+# Testing for the image header parser
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sun Oct 18 23:52:08 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: exif_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for the image header parser.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import pickle
+import struct
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+from inigo.image import ImageMeta, ImageRecord, extract_metadata, extraction_pool
+from inigo.exif import ImageInfo, read_info
+from inigo.models import Base, Picture, get_engine, create_session
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+DATE_TAKEN = b"2015:06:14 22:32:17"
+LATITUDE   = ((38, 1), (53, 1), (2307, 100))   # 38.889742 N
+LONGITUDE  = ((77, 1), (2, 1), (1050, 100))    # 77.03625 W
+
+
+def make_exif(order="<"):
+    """
+    Builds the APP1 payload of a JPEG with the date taken in the EXIF IFD
+    and the coordinates in the GPS IFD, in the given byte order.
+    """
+    pack = lambda fmt, *args: struct.pack(order + fmt, *args)
+    entry = lambda tag, kind, count, value: pack("HHI", tag, kind, count) + value
+
+    # IFD0 (8), EXIF IFD (38), date (56), GPS IFD (76), lat (130), lon (154)
+    tiff  = (b"II" if order == "<" else b"MM") + pack("HI", 42, 8)
+    tiff += pack("H", 2)
+    tiff += entry(0x8769, 4, 1, pack("I", 38))
+    tiff += entry(0x8825, 4, 1, pack("I", 76))
+    tiff += pack("I", 0)
+
+    tiff += pack("H", 1)
+    tiff += entry(0x9003, 2, 20, pack("I", 56))
+    tiff += pack("I", 0)
+    tiff += DATE_TAKEN + b"\x00"
+
+    tiff += pack("H", 4)
+    tiff += entry(0x0001, 2, 2, b"N\x00\x00\x00")
+    tiff += entry(0x0002, 5, 3, pack("I", 130))
+    tiff += entry(0x0003, 2, 2, b"W\x00\x00\x00")
+    tiff += entry(0x0004, 5, 3, pack("I", 154))
+    tiff += pack("I", 0)
+
+    for value in (LATITUDE, LONGITUDE):
+        tiff += b"".join(pack("II", num, den) for num, den in value)
+
+    return b"Exif\x00\x00" + tiff
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+class ReadInfoTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def save(self, name, size=(64, 48), **kwargs):
+        path = os.path.join(self.tmpdir, name)
+        Image.new("RGB", size, (200, 40, 40)).save(path, **kwargs)
+        return path
+
+    def test_jpeg_exif(self):
+        """
+        Assert the dimensions, date and coordinates are read from a JPEG
+        """
+        for order in ("<", ">"):
+            info = read_info(self.save("exif.jpg", exif=make_exif(order)))
+
+            self.assertIsInstance(info, ImageInfo)
+            self.assertEqual((info.width, info.height), (64, 48))
+            self.assertEqual(info.date_taken, DATE_TAKEN)
+            self.assertAlmostEqual(info.latitude, 38.889742, places=5)
+            self.assertAlmostEqual(info.longitude, -77.03625, places=5)
+
+    def test_jpeg_without_exif(self):
+        """
+        Assert the dimensions are read from a JPEG without EXIF data
+        """
+        info = read_info(self.save("plain.jpg", size=(30, 20), progressive=True))
+        self.assertEqual(info, ImageInfo(30, 20, None, None, None))
+
+    def test_tiff(self):
+        """
+        Assert the dimensions are read from the first IFD of a TIFF
+        """
+        info = read_info(self.save("image.tif", size=(40, 10)))
+        self.assertEqual((info.width, info.height), (40, 10))
+
+    def test_unparseable(self):
+        """
+        Assert None is returned for other formats and corrupt headers
+        """
+        self.assertIsNone(read_info(self.save("image.png")))
+
+        path = self.save("broken.jpg", exif=make_exif())
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(path, 'wb') as f:
+            f.write(data[:60])
+
+        self.assertIsNone(read_info(path))
+
+    def test_matches_pillow(self):
+        """
+        Assert the header parser agrees with the Pillow fallback
+        """
+        for name, kwargs in (("exif.jpg", {'exif': make_exif(">")}), ("image.png", {})):
+            image  = ImageMeta(self.save(name, **kwargs))
+            pillow = image.read_pillow_info()
+
+            self.assertEqual(image.dimensions, (pillow.width, pillow.height))
+            self.assertEqual(image.info.date_taken, pillow.date_taken)
+            self.assertEqual(image.info.latitude, pillow.latitude)
+            self.assertEqual(image.info.longitude, pillow.longitude)
+
+
+class ExtractMetadataTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.paths  = []
+
+        for idx in xrange(6):
+            path = os.path.join(self.tmpdir, "img{}.jpg".format(idx))
+            Image.new("RGB", (20 + idx, 10)).save(path, exif=make_exif())
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_extract_metadata(self):
+        """
+        Assert records are extracted in order by a pool of processes
+        """
+        pairs = list(extract_metadata(self.paths, workers=2, chunksize=2))
+        self.assertEqual([path for path, _ in pairs], self.paths)
+
+        for idx, (path, record) in enumerate(pairs):
+            image = ImageMeta(path)
+            self.assertIsInstance(record, ImageRecord)
+            self.assertEqual(record, image.record)
+            self.assertEqual(record.width, 20 + idx)
+            self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+
+            # The image is not decoded for its perceptual hash
+            self.assertNotIn('_phash', image.__dict__)
+
+    def test_reused_pool(self):
+        """
+        Assert a pool passed in is left open to extract more batches
+        """
+        pool = extraction_pool(2)
+        try:
+            for batch in (self.paths[:3], self.paths[3:]):
+                pairs = list(extract_metadata(batch, chunksize=2, pool=pool))
+                self.assertEqual([path for path, _ in pairs], batch)
+                self.assertTrue(all(record is not None for _, record in pairs))
+            pool.close()
+        finally:
+            pool.join()
+
+        self.assertIsNone(extraction_pool(1))
+
+    def test_unreadable_images(self):
+        """
+        Assert the record is None for images that can't be read
+        """
+        path = os.path.join(self.tmpdir, "broken.jpg")
+        with open(path, 'wb') as f:
+            f.write(b"\xff\xd8\xff\xe0 not really a jpeg")
+
+        pairs = dict(extract_metadata([path] + self.paths[:1], workers=1))
+        self.assertIsNone(pairs[path])
+        self.assertIsNotNone(pairs[self.paths[0]])
+
+    def test_load_record(self):
+        """
+        Assert an image loaded from a record does not read the file again
+        """
+        record = ImageMeta(self.paths[0]).record
+        os.remove(self.paths[0])
+        Image.new("RGB", (99, 99)).save(self.paths[0])
+
+        image = ImageMeta(self.paths[0], record=record)
+        self.assertEqual(image.dimensions, (20, 10))
+        self.assertEqual(image.date_taken, record.date_taken)
+        self.assertEqual(image.coordinates, (record.latitude, record.longitude))
+
+
+class FindDuplicateTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir  = tempfile.mkdtemp()
+        self.session = create_session(get_engine("sqlite://"))
+        Base.metadata.create_all(self.session.get_bind())
+
+        self.original = os.path.join(self.tmpdir, "original.jpg")
+        Image.new("RGB", (32, 24), (10, 120, 200)).save(self.original)
+        ImageMeta(self.original).save(self.session, commit=True)
+
+    def tearDown(self):
+        self.session.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_known_signature(self):
+        """
+        Assert an image with a known signature is not sampled for duplicates
+        """
+        copy = os.path.join(self.tmpdir, "copy.jpg")
+        shutil.copy(self.original, copy)
+
+        image = ImageMeta(copy, digest=ImageMeta(self.original).signature)
+        self.assertIsNotNone(image.find_duplicate(self.session))
+        self.assertNotIn('_sample', image.__dict__)
+
+    def test_unknown_signature(self):
+        """
+        Assert an image of a new size is not hashed to find duplicates
+        """
+        path = os.path.join(self.tmpdir, "new.jpg")
+        Image.new("RGB", (64, 48), (10, 120, 200)).save(path)
+
+        image = ImageMeta(path)
+        self.assertFalse(image.has_candidates(self.session))
+        self.assertIsNone(image.find_duplicate(self.session))
+        self.assertFalse(image.has_signature())
+        self.assertEqual(self.session.query(Picture).count(), 1)
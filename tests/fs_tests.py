@@ -17,9 +17,219 @@ Testing for the fs package in inigo.
 ## Imports
 ##########################################################################
 
+import os
+import shutil
 import tempfile
 import unittest
 
+from inigo.snapshot import DirectorySnapshot
+from inigo.fs import Node, FileMeta, Directory
+from inigo.transfer import CopyEngine
+
 ##########################################################################
 ## Test Cases
 ##########################################################################
+
+class DirectoryTests(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Creates the following tree in a temporary directory:
+
+            root/a.txt
+            root/sub/b.txt
+            root/sub/deep/c.txt
+        """
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, "sub", "deep"))
+        for name in ("a.txt", "sub/b.txt", "sub/deep/c.txt"):
+            with open(os.path.join(self.root, name), 'w') as f:
+                f.write(name)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def listing(self, **kwargs):
+        folder = Directory(self.root, **kwargs)
+        return sorted(os.path.relpath(node.path, self.root) for node in folder.list())
+
+    def test_list_flat(self):
+        """
+        Assert that a non-recursive list only contains the top level
+        """
+        self.assertEqual(self.listing(), ["a.txt", "sub"])
+
+    def test_list_recursive(self):
+        """
+        Assert that a recursive list walks the entire tree
+        """
+        self.assertEqual(self.listing(recursive=True), [
+            "a.txt", "sub", "sub/b.txt", "sub/deep", "sub/deep/c.txt"
+        ])
+
+    def test_list_maxdepth(self):
+        """
+        Assert that the maxdepth limits the recursion
+        """
+        self.assertEqual(self.listing(recursive=True, maxdepth=1), [
+            "a.txt", "sub", "sub/b.txt", "sub/deep"
+        ])
+
+    def test_list_types(self):
+        """
+        Assert that listed nodes are files and directories with entries
+        """
+        for node in Directory(self.root, recursive=True).list():
+            self.assertIsNotNone(node.entry)
+            if isinstance(node, FileMeta):
+                self.assertTrue(node.isfile())
+                self.assertEqual(node.filesize, os.path.getsize(node.path))
+            else:
+                self.assertIsInstance(node, Directory)
+                self.assertTrue(node.isdir())
+
+    def test_walk_depth(self):
+        """
+        Assert that the walk yields entries and depths
+        """
+        depths = {
+            os.path.relpath(name, self.root): (depth, [f.name for f in files])
+            for name, dirs, files, depth in Directory(self.root).walk()
+        }
+
+        self.assertEqual(depths, {
+            ".": (0, ["a.txt"]),
+            "sub": (1, ["b.txt"]),
+            "sub/deep": (2, ["c.txt"]),
+        })
+
+    def test_node_without_entry(self):
+        """
+        Assert that a plain node still uses the os calls
+        """
+        node = Node(os.path.join(self.root, "a.txt"))
+        self.assertIsNone(node.entry)
+        self.assertTrue(node.isfile())
+        self.assertFalse(node.isdir())
+        self.assertEqual(node.stat().st_size, 5)
+
+    def test_scan_records(self):
+        """
+        Assert that a scan yields compact records that can be promoted
+        """
+        records = list(Directory(self.root, recursive=True).scan())
+        self.assertEqual(len(records), 5)
+
+        for record in records:
+            self.assertFalse(hasattr(record, '__dict__'))
+            node = record.promote()
+            if record.isdir():
+                self.assertIsInstance(node, Directory)
+            else:
+                self.assertTrue(record.isfile())
+                self.assertIsInstance(node, FileMeta)
+                self.assertEqual(record.size, node.filesize)
+                self.assertEqual(record.inode, node.stat().st_ino)
+                self.assertEqual(record.dev, node.stat().st_dev)
+                self.assertEqual(record.key[0], node.stat().st_dev)
+
+    def test_copy_tree(self):
+        """
+        Assert that the files of a tree are copied with the copy engine
+        """
+        copied = []
+
+        class RecordingEngine(CopyEngine):
+            def copy(self, src, dst):
+                copied.append(os.path.basename(src))
+                return super(RecordingEngine, self).copy(src, dst)
+
+        os.symlink("a.txt", os.path.join(self.root, "sub", "link.txt"))
+        dst = os.path.join(tempfile.mkdtemp(), "copy")
+        try:
+            Directory(self.root).copy_tree(dst, RecordingEngine())
+            self.assertEqual(sorted(copied), ["a.txt", "b.txt", "c.txt"])
+            self.assertEqual(os.readlink(os.path.join(dst, "sub", "link.txt")), "a.txt")
+            with open(os.path.join(dst, "sub", "deep", "c.txt")) as f:
+                self.assertEqual(f.read(), "sub/deep/c.txt")
+
+            moved = Directory(dst).move(os.path.join(self.root, "moved"))
+            self.assertFalse(os.path.exists(dst))
+            self.assertTrue(os.path.exists(os.path.join(moved.path, "a.txt")))
+        finally:
+            shutil.rmtree(os.path.dirname(dst))
+
+    def test_len(self):
+        """
+        Assert that the length of a directory respects the recursion
+        """
+        self.assertEqual(len(Directory(self.root)), 2)
+        self.assertEqual(len(Directory(self.root, recursive=True)), 5)
+        self.assertEqual(len(Directory(self.root, recursive=True, maxdepth=1)), 4)
+
+    def test_incremental_walk(self):
+        """
+        Assert that an incremental walk only lists changed directories
+        """
+        snapshot = DirectorySnapshot()
+
+        def changed():
+            folder = Directory(self.root, recursive=True, snapshot=snapshot)
+            return sorted(
+                os.path.relpath(record.path, self.root)
+                for record in folder.scan() if record.isfile()
+            )
+
+        self.assertEqual(changed(), ["a.txt", "sub/b.txt", "sub/deep/c.txt"])
+        snapshot.commit()
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(changed(), [])
+
+        # Adding a file only relists the directory that contains it
+        with open(os.path.join(self.root, "sub", "deep", "d.txt"), 'w') as f:
+            f.write("d.txt")
+        self.assertEqual(changed(), ["sub/deep/c.txt", "sub/deep/d.txt"])
+
+        # Uncommitted walks are discarded, new directories are listed
+        snapshot.rollback()
+        os.makedirs(os.path.join(self.root, "sub", "new"))
+        self.assertEqual(changed(), ["sub/b.txt", "sub/deep/c.txt", "sub/deep/d.txt"])
+        snapshot.commit()
+        self.assertEqual(changed(), [])
+
+        snapshot.clear()
+        self.assertEqual(len(changed()), 4)
+        snapshot.close()
+
+    def test_parallel_walk(self):
+        """
+        Assert that a parallel walk lists the same tree as a serial walk
+        """
+        for idx in xrange(20):
+            path = os.path.join(self.root, "sub{:02d}".format(idx), "nested")
+            os.makedirs(path)
+            with open(os.path.join(path, "e.txt"), 'w') as f:
+                f.write("e.txt")
+
+        def walk(**kwargs):
+            return [
+                (name, [d.name for d in dirs], [f.name for f in files], depth)
+                for name, dirs, files, depth in Directory(self.root, **kwargs).walk()
+            ]
+
+        serial = walk()
+        self.assertEqual(walk(workers=4, ordered=True), serial)
+        self.assertEqual(sorted(walk(workers=4)), sorted(serial))
+
+        for kwargs in ({}, {'recursive': True}, {'recursive': True, 'maxdepth': 1}):
+            listing = self.listing(**kwargs)
+            self.assertEqual(self.listing(workers=4, **kwargs), listing)
+            self.assertEqual(self.listing(workers=4, ordered=True, **kwargs), listing)
+
+    def test_parallel_walk_stops(self):
+        """
+        Assert that a parallel walk can be abandoned part of the way through
+        """
+        walk = Directory(self.root, workers=4).walk()
+        name, dirs, files, depth = next(walk)
+        walk.close()
@@ -0,0 +1,346 @@
+# tests.geocode_tests
+# Testing for the reverse geocoding backends
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 11:47:52 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: geocode_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for the reverse geocoding backends.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import io
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import threading
+import numpy as np
+
+from urlparse import urlparse, parse_qs
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from SocketServer import ThreadingMixIn
+
+from inigo.geocode import KDTree, LocalGeocoder, read_gazetteer
+from inigo.geocode import Geocoder, CachedGeocoder, GeocodeCache
+from inigo.geocode import GoogleGeocoder, GeocodeRunner, TokenBucket
+from inigo.geocode import to_cartesian, chord_to_km
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+PLACES = [
+    (u"Washington", 38.89511, -77.03637, u"DC", u"US"),
+    (u"Baltimore", 39.29038, -76.61219, u"MD", u"US"),
+    (u"Z\u00fcrich", 47.36667, 8.55, u"ZH", u"CH"),
+    (u"Suva", -18.14161, 178.44149, u"01", u"FJ"),
+    (u"Taveuni", -16.85, -179.96, u"03", u"FJ"),
+]
+
+
+class FixedGeocoder(Geocoder):
+    """
+    Remote geocoder that answers every lookup with the same address.
+    """
+
+    name   = "fixed"
+    remote = True
+
+    def __init__(self, address):
+        self.address = address
+
+    def reverse(self, latitude, longitude):
+        self.requests += 1
+        return self.address
+
+
+class StubGeocodeHandler(BaseHTTPRequestHandler):
+    """
+    Answers Google reverse geocode requests with the coordinates as the
+    address, over the query limit for the first few requests.
+    """
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.inflight += 1
+            server.peak = max(server.peak, server.inflight)
+            overlimit = server.requests <= server.overlimit
+
+        try:
+            latlng = parse_qs(urlparse(self.path).query)['latlng'][0]
+            if overlimit:
+                body = {"status": "OVER_QUERY_LIMIT", "results": []}
+            else:
+                body = {"status": "OK", "results": [{
+                    "formatted_address": u"Near {}".format(latlng),
+                    "geometry": {"location": dict(zip(("lat", "lng"), map(float, latlng.split(","))))},
+                }]}
+
+            # Simulate the latency of a remote request
+            threading.Event().wait(0.02)
+
+            payload = json.dumps(body)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with server.lock:
+                server.inflight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class StubGeocodeServer(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, overlimit=0):
+        HTTPServer.__init__(self, ("127.0.0.1", 0), StubGeocodeHandler)
+        self.lock      = threading.Lock()
+        self.overlimit = overlimit
+        self.requests  = self.inflight = self.peak = 0
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+class KDTreeTests(unittest.TestCase):
+
+    def test_nearest(self):
+        """
+        Assert the tree finds the same nearest points as brute force
+        """
+        rand   = np.random.RandomState(42)
+        points = rand.uniform(-1, 1, (3000, 3))
+        points[1000:1500] = points[:500].round(1)   # many ties and clumps
+        queries = rand.uniform(-1.2, 1.2, (500, 3))
+
+        distance, nearest = KDTree(points, leafsize=8).query(queries)
+        for query, dist, idx in zip(queries, distance, nearest):
+            brute = np.sqrt(((points - query) ** 2).sum(axis=1))
+            self.assertAlmostEqual(dist, brute.min())
+            self.assertAlmostEqual(brute[idx], brute.min())
+
+    def test_single_point(self):
+        """
+        Assert a tree with a single leaf can be queried
+        """
+        distance, nearest = KDTree([[0.0, 0.0, 1.0]]).query([0.0, 0.0, 0.0])
+        self.assertEqual(nearest.tolist(), [0])
+        self.assertAlmostEqual(distance[0], 1.0)
+
+    def test_great_circle(self):
+        """
+        Assert chord distances convert to great circle distances
+        """
+        points = to_cartesian([0.0, 0.0], [0.0, 90.0])
+        chord  = np.sqrt(((points[0] - points[1]) ** 2).sum())
+        self.assertAlmostEqual(chord_to_km(chord), 10007.5, places=0)
+
+
+class LocalGeocoderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_geonames(self):
+        path = os.path.join(self.tmpdir, "cities.txt")
+        with io.open(path, 'w', encoding='utf-8') as f:
+            for idx, (name, lat, lon, admin1, country) in enumerate(PLACES):
+                fields = [
+                    unicode(idx + 1), name, name, u"", unicode(lat), unicode(lon),
+                    u"P", u"PPL", country, u"", admin1, u"", u"", u"", u"1000",
+                ]
+                f.write(u"\t".join(fields) + u"\n")
+            f.write(u"bad line\n")
+        return path
+
+    def write_csv(self):
+        path = os.path.join(self.tmpdir, "places.csv")
+        with io.open(path, 'wb') as f:
+            f.write(b"name,lat,lng,state,country\n")
+            for name, lat, lon, admin1, country in PLACES:
+                f.write(u"{},{},{},{},{}\n".format(
+                    name, lat, lon, admin1, country
+                ).encode('utf-8'))
+        return path
+
+    def test_read_gazetteer(self):
+        """
+        Assert GeoNames dumps and CSVs are read into the same places
+        """
+        geonames = read_gazetteer(self.write_geonames())
+        csvnames = read_gazetteer(self.write_csv())
+
+        self.assertEqual(geonames[0], csvnames[0])
+        self.assertEqual(geonames[0][2], u"Z\u00fcrich, ZH, CH")
+        self.assertTrue(np.allclose(geonames[1], csvnames[1]))
+        self.assertTrue(np.allclose(geonames[2], csvnames[2]))
+
+    def test_reverse_many(self):
+        """
+        Assert coordinates are geocoded to the nearest place within range
+        """
+        geocoder = LocalGeocoder(self.write_geonames(), max_distance=50.0)
+        addresses = geocoder.reverse_many([
+            (38.889742, -77.03625),     # the National Mall
+            (39.2, -76.7),              # near Baltimore
+            (-16.9, 179.99),            # across the antimeridian from Taveuni
+            (0.0, -30.0),               # the middle of the Atlantic
+        ])
+
+        self.assertEqual(addresses, [
+            u"Washington, DC, US", u"Baltimore, MD, US", u"Taveuni, 03, FJ", None,
+        ])
+        self.assertEqual(geocoder.reverse(47.37, 8.54), u"Z\u00fcrich, ZH, CH")
+        self.assertEqual(geocoder.reverse_many([]), [])
+        self.assertEqual(len(geocoder), len(PLACES))
+
+    def test_missing_gazetteer(self):
+        """
+        Assert a missing gazetteer raises a ValueError
+        """
+        with self.assertRaises(ValueError):
+            LocalGeocoder(os.path.join(self.tmpdir, "missing.txt"))
+
+
+class GeocodeCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = GeocodeCache(precision=7)
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_get_set(self):
+        """
+        Assert addresses are cached per backend and geohash cell
+        """
+        self.assertIsNone(self.cache.get("fixed", 38.8977, -77.0365))
+        self.cache.set("fixed", 38.8977, -77.0365, u"The White House")
+        self.cache.set("fixed", 0.5, -30.0, None)
+
+        self.assertEqual(self.cache.get("fixed", 38.89771, -77.03651), u"The White House")
+        self.assertEqual(self.cache.get("fixed", 0.5, -30.0), u"")
+        self.assertIsNone(self.cache.get("local", 38.8977, -77.0365))
+        self.assertIsNone(self.cache.get("fixed", 38.9, -77.0))
+        self.assertEqual(len(self.cache), 2)
+
+        self.assertEqual(self.cache.invalidate("fixed"), 2)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_cached_geocoder(self):
+        """
+        Assert one lookup is made per cell and later answered from the cache
+        """
+        geocoder = CachedGeocoder(FixedGeocoder(u"Home"), self.cache)
+        coordinates = [(38.8977, -77.0365), (38.89771, -77.03651), (51.5, -0.12)]
+
+        self.assertEqual(self.cache.coverage("fixed", coordinates), (0, 2))
+        self.assertEqual(geocoder.reverse_many(coordinates), [u"Home"] * 3)
+        self.assertEqual(geocoder.requests, 2)
+
+        self.assertEqual(geocoder.reverse(38.89772, -77.03652), u"Home")
+        self.assertEqual(geocoder.requests, 2)
+        self.assertEqual(geocoder.hits, 1)
+        self.assertEqual(self.cache.coverage("fixed", coordinates), (3, 0))
+
+    def test_cached_misses(self):
+        """
+        Assert lookups that find no address are cached as remote misses
+        """
+        geocoder = CachedGeocoder(FixedGeocoder(None), self.cache)
+        self.assertIsNone(geocoder.reverse(0.5, -30.0))
+        self.assertIsNone(geocoder.reverse(0.5, -30.0))
+        self.assertEqual(geocoder.requests, 1)
+
+
+class TokenBucketTests(unittest.TestCase):
+
+    def test_rate(self):
+        """
+        Assert the bucket allows a burst, then spaces calls out by the rate
+        """
+        now = [0.0]
+        def sleep(seconds):
+            now[0] += seconds
+
+        bucket = TokenBucket(5, clock=lambda: now[0], sleep=sleep)
+        waits  = [bucket.acquire() for _ in xrange(10)]
+
+        self.assertEqual(waits[:5], [0.0] * 5)
+        self.assertAlmostEqual(now[0], 1.0)
+
+        # After idling the bucket refills, but only up to its capacity
+        now[0] += 60
+        self.assertEqual([bucket.acquire() for _ in xrange(5)], [0.0] * 5)
+        self.assertGreater(bucket.acquire(), 0)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
+
+
+class GeocodeRunnerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StubGeocodeServer(overlimit=2)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+        self.geocoder = GoogleGeocoder(
+            apikey="test", domain="127.0.0.1:{}".format(self.server.server_port),
+            scheme="http",
+        )
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_run(self):
+        """
+        Assert lookups run concurrently and are retried over the quota
+        """
+        runner = GeocodeRunner(self.geocoder, 200, workers=4, retries=3, backoff=0.01)
+        jobs   = [(idx, (38.0 + idx, -77.0)) for idx in xrange(20)]
+
+        results = {key: (address, error) for key, address, error in runner.run(jobs)}
+        self.assertEqual(len(results), 20)
+
+        for idx in xrange(20):
+            self.assertEqual(results[idx], (u"Near {},{}".format(38.0 + idx, -77.0), None))
+
+        self.assertEqual(runner.requests, 22)
+        self.assertEqual(self.server.requests, 22)
+        self.assertGreater(self.server.peak, 1)
+
+    def test_quota_exhausted(self):
+        """
+        Assert lookups fail fast once the retries of the quota are used up
+        """
+        self.server.overlimit = 100
+        runner = GeocodeRunner(self.geocoder, 200, workers=1, retries=1, backoff=0.01)
+        results = list(runner.run([(idx, (1.0, 2.0)) for idx in xrange(5)]))
+
+        self.assertTrue(all(address is None for _, address, _ in results))
+        self.assertTrue(all(error is not None for _, _, error in results))
+        self.assertEqual(runner.requests, 2)
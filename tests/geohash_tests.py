@@ -0,0 +1,107 @@
+# tests.geohash_tests
+# Testing for the geohash encoding of coordinates
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 13:36:02 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: geohash_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for the geohash encoding of coordinates.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import unittest
+
+from inigo.geohash import encode, encode_many, bounds, neighbors, cover
+from inigo.geohash import prefix_range
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+class EncodeTests(unittest.TestCase):
+
+    def test_known_geohashes(self):
+        """
+        Assert coordinates are encoded to their well known geohashes
+        """
+        self.assertEqual(encode(57.64911, 10.40744, 11), u"u4pruydqqvj")
+        self.assertEqual(encode(42.6, -5.6, 5), u"ezs42")
+        self.assertEqual(encode(38.8977, -77.0365, 9), u"dqcjqcpex")
+        self.assertEqual(encode(-90.0, 180.0, 4), u"pbpb")
+
+    def test_encode_many(self):
+        """
+        Assert many coordinates are encoded at once with a shared prefix
+        """
+        cells = encode_many([38.8977, 38.8978, -33.8688], [-77.0365, -77.0366, 151.2093], 7)
+        self.assertEqual(cells[0], encode(38.8977, -77.0365, 7))
+        self.assertEqual(cells[0][:6], cells[1][:6])
+        self.assertNotEqual(cells[0][0], cells[2][0])
+        self.assertEqual(encode_many([], [], 7), [])
+
+    def test_precision(self):
+        """
+        Assert precisions that don't fit in 64 bits are rejected
+        """
+        with self.assertRaises(ValueError):
+            encode(0.0, 0.0, 13)
+
+
+class CellTests(unittest.TestCase):
+
+    def test_bounds(self):
+        """
+        Assert cells decode to bounds that contain their coordinates
+        """
+        south, west, north, east = bounds(u"ezs42")
+        self.assertAlmostEqual(south, 42.583, places=3)
+        self.assertAlmostEqual(west, -5.625, places=3)
+        self.assertAlmostEqual(north, 42.627, places=3)
+        self.assertAlmostEqual(east, -5.581, places=3)
+
+        with self.assertRaises(ValueError):
+            bounds(u"ezsa")
+
+    def test_neighbors(self):
+        """
+        Assert cells have eight neighbors, wrapping around the antimeridian
+        """
+        self.assertEqual(neighbors(u"dqcjq"), {
+            u"dqcjj", u"dqcjm", u"dqcjn", u"dqcjp",
+            u"dqcjr", u"dqcjt", u"dqcjw", u"dqcjx",
+        })
+
+        wrapped = neighbors(encode(0.1, 179.99, 3))
+        self.assertEqual(len(wrapped), 8)
+        self.assertIn(encode(0.1, -179.99, 3), wrapped)
+
+        self.assertEqual(len(neighbors(encode(89.99, 0.0, 2))), 5)
+
+    def test_cover(self):
+        """
+        Assert circles are covered by cells at least as big as the radius
+        """
+        cells = cover(38.8977, -77.0365, 1.0)
+        self.assertEqual(len(cells), 9)
+        self.assertEqual(cells, sorted(cells))
+        self.assertIn(encode(38.8977, -77.0365, len(cells[0])), cells)
+        self.assertTrue(all(len(cell) == 5 for cell in cells))
+
+        self.assertIsNone(cover(89.9, 0.0, 50.0))
+        self.assertIsNone(cover(0.0, 0.0, 10000.0))
+
+    def test_prefix_range(self):
+        """
+        Assert prefixes are converted to half open ranges of geohashes
+        """
+        self.assertEqual(prefix_range(u"dqcj"), (u"dqcj", u"dqck"))
+        self.assertEqual(prefix_range(u"dqz"), (u"dqz", u"dr"))
+        self.assertEqual(prefix_range(u"zz"), (u"zz", None))
@@ -0,0 +1,143 @@
+# tests.gps_tests
+# Testing for the vectorized GPS decoder
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 10:21:09 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: gps_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for the vectorized GPS decoder.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from PIL import Image
+from inigo.exif import to_degrees
+from inigo.gps import decode_gps, describe_flags, read_gps_batch
+from inigo.gps import validate_coordinates, coordinate_mappings
+from inigo.gps import GPS_VALID, GPS_MISSING, GPS_ZERO_DIVISION
+from inigo.gps import GPS_OUT_OF_RANGE, GPS_BAD_REF, GPS_NULL_ISLAND
+from tests.exif_tests import make_exif, LATITUDE, LONGITUDE
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+class DecodeCoordinatesTests(unittest.TestCase):
+
+    def test_decode(self):
+        """
+        Assert the decoded coordinates match the scalar conversion
+        """
+        values = [
+            (LATITUDE, b"N", LONGITUDE, b"W"),
+            (((33, 1), (51, 1), (3540, 100)), b"S", ((151, 1), (12, 1), (4000, 100)), b"E"),
+            (((64, 1), (0, 1), (0, 1)), b"N", ((21, 1), (56, 1), (0, 1)), b"W"),
+        ]
+
+        coords = decode_gps(values)
+        self.assertEqual(coords.flags.tolist(), [GPS_VALID] * 3)
+
+        for idx, (lat, lat_ref, lon, lon_ref) in enumerate(values):
+            self.assertAlmostEqual(coords.latitude[idx], to_degrees(lat, lat_ref, b"N"))
+            self.assertAlmostEqual(coords.longitude[idx], to_degrees(lon, lon_ref, b"E"))
+
+    def test_flags(self):
+        """
+        Assert missing, zero division, garbage and (0, 0) values are flagged
+        """
+        zero = ((0, 1), (0, 1), (0, 1))
+        values = [
+            None,
+            (((38, 0), (53, 1), (0, 1)), b"N", LONGITUDE, b"W"),
+            (((38, 1), (75, 1), (0, 1)), b"N", LONGITUDE, b"W"),
+            (((95, 1), (0, 1), (0, 1)), b"N", LONGITUDE, b"W"),
+            (LATITUDE, b"X", LONGITUDE, b"W"),
+            (zero, b"N", zero, b"E"),
+            (LATITUDE[:2], b"N", LONGITUDE, b"W"),
+        ]
+
+        coords = decode_gps(values)
+        self.assertEqual(coords.flags.tolist(), [
+            GPS_MISSING, GPS_ZERO_DIVISION, GPS_OUT_OF_RANGE, GPS_OUT_OF_RANGE,
+            GPS_BAD_REF, GPS_NULL_ISLAND, GPS_VALID,
+        ])
+
+        self.assertTrue(np.isnan(coords.latitude[:-1]).all())
+        self.assertTrue(np.isnan(coords.longitude[:-1]).all())
+        self.assertAlmostEqual(coords.latitude[-1], 38 + 53 / 60.0)
+
+        counts = describe_flags(coords.flags)
+        self.assertEqual(counts["valid"], 1)
+        self.assertEqual(counts["out of range"], 2)
+
+    def test_validate_coordinates(self):
+        """
+        Assert stored coordinates out of range or at (0, 0) are flagged
+        """
+        flags = validate_coordinates(
+            [38.9, 0.0, 91.0, 12.0, np.nan], [-77.0, 0.0, 10.0, -181.0, 3.0]
+        )
+        self.assertEqual(flags.tolist(), [
+            GPS_VALID, GPS_NULL_ISLAND, GPS_OUT_OF_RANGE, GPS_OUT_OF_RANGE, GPS_MISSING,
+        ])
+
+    def test_coordinate_mappings(self):
+        """
+        Assert flagged coordinates are written as NULL and missing ones kept
+        """
+        coords = decode_gps([
+            (LATITUDE, b"N", LONGITUDE, b"W"),
+            None,
+            (((0, 1), (0, 1), (0, 1)), b"N", ((0, 1), (0, 1), (0, 1)), b"E"),
+        ])
+        mappings = coordinate_mappings([10, 11, 12], coords)
+
+        self.assertEqual(len(mappings), 2)
+        self.assertEqual(mappings[0]['id'], 10)
+        self.assertAlmostEqual(mappings[0]['longitude'], -77.03625)
+        self.assertEqual(mappings[0]['geohash'][:9], u"dqcjnzxvj")
+        self.assertEqual(mappings[1], {
+            'id': 12, 'latitude': None, 'longitude': None, 'geohash': None,
+        })
+
+
+class ReadGPSTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_read_gps_batch(self):
+        """
+        Assert the raw GPS tags are read in a pool and decoded
+        """
+        tagged = os.path.join(self.tmpdir, "tagged.jpg")
+        plain  = os.path.join(self.tmpdir, "plain.jpg")
+        Image.new("RGB", (32, 32)).save(tagged, exif=make_exif(">"))
+        Image.new("RGB", (32, 32)).save(plain)
+
+        jobs  = [(1, tagged), (2, plain), (3, os.path.join(self.tmpdir, "missing.jpg"))]
+        found = dict(read_gps_batch(jobs, workers=2))
+
+        self.assertEqual(found[1], (LATITUDE, b"N", LONGITUDE, b"W"))
+        self.assertIsNone(found[2])
+        self.assertIsNone(found[3])
+
+        coords = decode_gps([found[key] for key in (1, 2, 3)])
+        self.assertEqual(coords.flags.tolist(), [GPS_VALID, GPS_MISSING, GPS_MISSING])
+        self.assertAlmostEqual(coords.latitude[0], 38.889742, places=5)
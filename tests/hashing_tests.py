@@ -0,0 +1,201 @@
+# tests.hashing_tests
+# Testing for the hashing module in inigo
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sat Oct 17 11:02:18 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: hashing_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for the hashing module in inigo.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import base64
+import shutil
+import hashlib
+import tempfile
+import unittest
+
+from inigo.fs import FileMeta
+from inigo.hashing import HashingEngine, compute_signature, compute_sample
+from inigo.hashing import MultiHash, compute_digests, get_algorithm
+from inigo.hashing import READ, MMAP, READ_BUFFER_SIZE
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+class HashingEngineTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.paths  = []
+        self.data   = {}
+
+        for idx in xrange(12):
+            path = os.path.join(self.tmpdir, "file{:02d}.dat".format(idx))
+            data = os.urandom(1024 * (idx + 1))
+            with open(path, 'wb') as f:
+                f.write(data)
+
+            self.paths.append(path)
+            self.data[path] = unicode(base64.b64encode(hashlib.sha256(data).digest()))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_compute_signature(self):
+        """
+        Assert the signature is the b64 encoded sha256 of the file
+        """
+        for path in self.paths:
+            self.assertEqual(compute_signature(path), self.data[path])
+
+    def test_thread_pool(self):
+        """
+        Assert the thread pool computes a signature for every path
+        """
+        engine = HashingEngine(workers=4)
+        self.assertEqual(dict(engine(self.paths)), self.data)
+
+    def test_process_pool(self):
+        """
+        Assert the process pool computes a signature for every path
+        """
+        engine = HashingEngine(workers=2, processes=True)
+        self.assertEqual(dict(engine(self.paths)), self.data)
+
+    def test_serial(self):
+        """
+        Assert a single worker hashes without a pool
+        """
+        engine = HashingEngine(workers=1)
+        self.assertEqual(dict(engine(self.paths)), self.data)
+
+    def test_engine_checksums(self):
+        """
+        Assert the engine computes the checksum from the same read
+        """
+        engine = HashingEngine(workers=2, checksum="md5")
+        digests = dict(engine.digests(self.paths))
+
+        for path in self.paths:
+            with open(path, 'rb') as f:
+                checksum = unicode(base64.b64encode(hashlib.md5(f.read()).digest()))
+            self.assertEqual(digests[path], {"sha256": self.data[path], "md5": checksum})
+
+        self.assertEqual(dict(engine(self.paths)), self.data)
+
+        # The checksum is passed to file meta rather than read again
+        os.remove(self.paths[0])
+        meta = FileMeta(
+            self.paths[1], digest=u"sig", checksum="md5", chkdigest=u"chk"
+        )
+        self.assertEqual((meta.signature, meta.checksum), (u"sig", u"chk"))
+
+    def test_unreadable_file(self):
+        """
+        Assert a missing file yields a None signature
+        """
+        missing = os.path.join(self.tmpdir, "missing.dat")
+        engine  = HashingEngine(workers=2)
+        result  = dict(engine(self.paths + [missing]))
+        self.assertIsNone(result[missing])
+
+    def test_bad_algorithm(self):
+        """
+        Assert an unknown algorithm raises a type error
+        """
+        with self.assertRaises(TypeError):
+            HashingEngine(algorithm="notahash")
+
+    def test_precomputed_signature(self):
+        """
+        Assert that file meta doesn't read the file for a precomputed digest
+        """
+        path = self.paths[0]
+        meta = FileMeta(path, digest=u"precomputed")
+        self.assertEqual(meta.signature, u"precomputed")
+
+    def test_hashing_modes(self):
+        """
+        Assert the read and mmap modes compute identical signatures
+        """
+        empty = os.path.join(self.tmpdir, "empty.dat")
+        open(empty, 'wb').close()
+        self.data[empty] = unicode(base64.b64encode(hashlib.sha256().digest()))
+
+        for path, expected in self.data.iteritems():
+            self.assertEqual(compute_signature(path, mode=READ), expected)
+            self.assertEqual(compute_signature(path, mode=MMAP), expected)
+            self.assertEqual(compute_signature(path, drop_cache=True), expected)
+
+    def test_large_read_buffer(self):
+        """
+        Assert files larger than the read buffer are hashed completely
+        """
+        path = os.path.join(self.tmpdir, "large.dat")
+        data = os.urandom(READ_BUFFER_SIZE * 2 + 17)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+        expected = unicode(base64.b64encode(hashlib.sha256(data).digest()))
+        self.assertEqual(compute_signature(path, mode=READ), expected)
+        self.assertEqual(compute_signature(path, mode=MMAP), expected)
+
+    def test_sample(self):
+        """
+        Assert samples only depend on the size, head, and tail of the file
+        """
+        paths = []
+        for idx, middle in enumerate((b"a", b"b")):
+            path = os.path.join(self.tmpdir, "sample{}.dat".format(idx))
+            with open(path, 'wb') as f:
+                f.write(b"\x00" * 100000 + middle + b"\x00" * 100000)
+            paths.append(path)
+
+        self.assertEqual(compute_sample(paths[0]), compute_sample(paths[1]))
+        self.assertNotEqual(compute_signature(paths[0]), compute_signature(paths[1]))
+
+        # Files that differ in size or at the ends have different samples
+        for path in self.paths:
+            self.assertNotEqual(compute_sample(path), compute_sample(paths[0]))
+
+    def test_multiple_digests(self):
+        """
+        Assert several digests are computed from a single read of the file
+        """
+        xxh64 = get_algorithm("xxh64")
+
+        for path, expected in self.data.iteritems():
+            with open(path, 'rb') as f:
+                checksum = unicode(base64.b64encode(xxh64(f.read()).digest()))
+
+            for mode in (READ, MMAP):
+                digests = compute_digests(path, ("sha256", "xxh64"), mode=mode)
+                self.assertEqual(digests, {"sha256": expected, "xxh64": checksum})
+
+        with self.assertRaises(TypeError):
+            MultiHash(("sha256", "notahash"))
+
+    def test_file_meta_digests(self):
+        """
+        Assert file meta computes its signature and checksum together
+        """
+        path = self.paths[0]
+        meta = FileMeta(path, checksum="md5")
+
+        with open(path, 'rb') as f:
+            checksum = unicode(base64.b64encode(hashlib.md5(f.read()).digest()))
+
+        self.assertEqual(meta.digests, {"sha256": self.data[path], "md5": checksum})
+        self.assertEqual(meta.signature, self.data[path])
+        self.assertEqual(meta.checksum, checksum)
@@ -0,0 +1,96 @@
+# tests.ingest_tests
+# Testing for the single read ingest of images
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 00:48:02 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: ingest_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for the single read ingest of images.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+from inigo.image import ImageMeta
+from inigo.exif import read_info
+from inigo.ingest import Ingest, ingest_file
+from inigo.hashing import compute_digests, compute_sample, SAMPLE_SIZE
+
+from tests.exif_tests import make_exif
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+class IngestTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.image  = os.path.join(self.tmpdir, "image.jpg")
+        Image.new("RGB", (320, 240)).save(self.image, exif=make_exif())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, size):
+        path = os.path.join(self.tmpdir, "file{}.dat".format(size))
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size))
+        return path
+
+    def test_sample(self):
+        """
+        Assert the sample matches compute_sample for any size of file
+        """
+        sizes = (0, 10, SAMPLE_SIZE, SAMPLE_SIZE + 10, 2 * SAMPLE_SIZE - 1, 300000)
+        for size in sizes:
+            path = self.write(size)
+            self.assertEqual(ingest_file(path).sample(), compute_sample(path))
+
+            # Feed the file in buffers smaller than the sample
+            ingest = Ingest()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1000), b""):
+                    ingest.update(memoryview(chunk))
+            self.assertEqual(ingest.sample(), compute_sample(path))
+
+    def test_ingest_file(self):
+        """
+        Assert the digests, mimetype and info are gathered from one read
+        """
+        ingest = ingest_file(self.image)
+
+        self.assertEqual(ingest.digests(), compute_digests(self.image))
+        self.assertEqual(ingest.mimetype(), "image/jpeg")
+        self.assertEqual(ingest.info(), read_info(self.image))
+        self.assertEqual(ingest.size, os.path.getsize(self.image))
+
+    def test_ingest_image(self):
+        """
+        Assert ingesting an image populates its meta data and copies it
+        """
+        dst = os.path.join(self.tmpdir, "backup", "image.jpg")
+        src = ImageMeta(self.image)
+        copied = src.ingest(dst)
+
+        expected = ImageMeta(self.image)
+        for attr in ('signature', 'checksum', 'sample', 'mimetype', 'filesize', 'info'):
+            self.assertIn("_" + attr, src.__dict__)
+            self.assertEqual(getattr(src, attr), getattr(expected, attr))
+
+        self.assertEqual(src.dimensions, (320, 240))
+        self.assertEqual(copied.signature, ImageMeta(dst).digests['sha256'])
+        with open(self.image, 'rb') as f, open(dst, 'rb') as g:
+            self.assertEqual(f.read(), g.read())
@@ -0,0 +1,130 @@
+# tests.phash_tests
+# Testing for perceptual hashing and near duplicate search
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 03:41:27 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: phash_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for perceptual hashing and near duplicate search.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from PIL import Image, ImageDraw
+from inigo.phash import dhash, hamming, popcount, MultiIndexHash
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+class DifferenceHashTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def draw(self, name, size, seed, **kwargs):
+        """
+        Draws a reproducible picture of random shapes at the given size.
+        """
+        rand = random.Random(seed)
+        img  = Image.new("RGB", (800, 600), (255, 255, 255))
+        draw = ImageDraw.Draw(img)
+        for _ in xrange(12):
+            x, y = rand.randint(0, 700), rand.randint(0, 500)
+            fill = tuple(rand.randint(0, 255) for _ in xrange(3))
+            draw.ellipse((x, y, x + rand.randint(40, 300), y + rand.randint(40, 300)), fill=fill)
+
+        path = os.path.join(self.tmpdir, name)
+        img.resize(size, Image.ANTIALIAS).save(path, **kwargs)
+        return path
+
+    def test_near_duplicates(self):
+        """
+        Assert resized and recompressed copies have nearly the same hash
+        """
+        original = int(dhash(self.draw("a.png", (800, 600), 42)), 16)
+        resized  = int(dhash(self.draw("b.jpg", (400, 300), 42, quality=60)), 16)
+        other    = int(dhash(self.draw("c.jpg", (800, 600), 7)), 16)
+
+        self.assertLessEqual(hamming(original, resized), 4)
+        self.assertGreater(hamming(original, other), 10)
+        self.assertEqual(len(dhash(self.draw("d.png", (800, 600), 1))), 16)
+
+
+class MultiIndexHashTests(unittest.TestCase):
+
+    def setUp(self):
+        rand = random.Random(1)
+        self.values = [rand.getrandbits(64) for _ in xrange(600)]
+
+        # Plant near duplicates of the first few values
+        for idx in xrange(20):
+            value = self.values[idx]
+            for bit in rand.sample(xrange(64), idx % 5):
+                value ^= 1 << bit
+            self.values.append(value)
+
+    def build(self, k):
+        index = MultiIndexHash(k)
+        for key, value in enumerate(self.values):
+            index.add(key, "{:016x}".format(value))
+        return index
+
+    def test_popcount(self):
+        """
+        Assert the vectorized popcount counts the bits of uint64 values
+        """
+        values = np.array(self.values[:100], dtype=np.uint64)
+        self.assertEqual(
+            popcount(values).tolist(), [bin(v).count("1") for v in self.values[:100]]
+        )
+
+    def test_search(self):
+        """
+        Assert search finds exactly the hashes within k of the query
+        """
+        index = self.build(3)
+        for query in self.values[:25]:
+            expected = sorted(
+                (hamming(query, value), key) for key, value in enumerate(self.values)
+                if hamming(query, value) <= 3
+            )
+            self.assertEqual(index.search("{:016x}".format(query)), expected)
+
+    def test_clusters(self):
+        """
+        Assert clusters match the near pairs found by brute force
+        """
+        for k in (0, 2, 4, 6):
+            index = self.build(k)
+            pairs = set(
+                (a, b) for a in xrange(len(self.values))
+                for b in xrange(a + 1, len(self.values))
+                if hamming(self.values[a], self.values[b]) <= k
+            )
+
+            clusters = index.clusters()
+            members  = {key: idx for idx, keys in enumerate(clusters) for key in keys}
+            for a, b in pairs:
+                self.assertEqual(members[a], members[b])
+
+            clustered = set(key for pair in pairs for key in pair)
+            self.assertEqual(set(members), clustered)
+            self.assertEqual(len(index), len(self.values))
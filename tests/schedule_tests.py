@@ -0,0 +1,102 @@
+# tests.schedule_tests
+# Testing for the physical order scheduler
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sun Oct 18 23:08:55 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: schedule_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for the physical order scheduler.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from inigo.fs import Directory
+from inigo.schedule import PhysicalScheduler, INODE, EXTENT, extent_key
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+class PhysicalSchedulerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.paths  = []
+
+        for idx in xrange(10):
+            path = os.path.join(self.tmpdir, "file{:02d}.dat".format(9 - idx))
+            with open(path, 'wb') as f:
+                f.write(os.urandom(8192))
+                f.flush()
+                os.fsync(f.fileno())
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_inode_order(self):
+        """
+        Assert that files are sorted by inode number
+        """
+        scheduler = PhysicalScheduler(INODE)
+        ordered   = scheduler.sort(sorted(self.paths))
+        inodes    = [os.stat(path).st_ino for path in ordered]
+
+        self.assertEqual(inodes, sorted(inodes))
+        self.assertEqual(set(ordered), set(self.paths))
+
+    def test_records(self):
+        """
+        Assert that scanned records are sorted without being stat'd again
+        """
+        records = list(Directory(self.tmpdir).scan())
+        for record in records:
+            os.remove(record.path)
+
+        ordered = PhysicalScheduler(INODE).sort(records)
+        self.assertEqual([r.inode for r in ordered], sorted(r.inode for r in records))
+
+    def test_extent_order(self):
+        """
+        Assert that files are sorted by extent (or inode without FIEMAP)
+        """
+        scheduler = PhysicalScheduler(EXTENT)
+        ordered   = scheduler.sort(sorted(self.paths))
+        keys      = [extent_key(path) for path in ordered]
+
+        self.assertEqual(keys, sorted(keys))
+
+    def test_batches(self):
+        """
+        Assert that paths are only reordered within their batch
+        """
+        scheduler = PhysicalScheduler(INODE, batch_size=4)
+        paths     = sorted(self.paths)
+        ordered   = list(scheduler(paths))
+
+        self.assertEqual(len(ordered), len(paths))
+        for idx in xrange(0, len(paths), 4):
+            self.assertEqual(set(ordered[idx:idx+4]), set(paths[idx:idx+4]))
+
+    def test_missing_files(self):
+        """
+        Assert that files that can't be stat'd are scheduled last
+        """
+        missing = os.path.join(self.tmpdir, "missing.dat")
+        ordered = PhysicalScheduler(EXTENT).sort([missing] + self.paths)
+        self.assertEqual(ordered[-1], missing)
+
+        with self.assertRaises(ValueError):
+            PhysicalScheduler("alphabetical")
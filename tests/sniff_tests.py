@@ -0,0 +1,102 @@
+# tests.sniff_tests
+# Testing for the header sniffing mimetype detector
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sat Oct 17 18:04:47 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: sniff_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for the header sniffing mimetype detector.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from inigo.sniff import sniff, MimeDetector
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+HEADERS = {
+    b"\xff\xd8\xff\xe1\x00\x18Exif\x00\x00": "image/jpeg",
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR": "image/png",
+    b"GIF89a\x01\x00\x01\x00": "image/gif",
+    b"II*\x00\x08\x00\x00\x00": "image/tiff",
+    b"MM\x00*\x00\x00\x00\x08": "image/tiff",
+    b"II*\x00\x10\x00\x00\x00CR\x02\x00": "image/x-canon-cr2",
+    b"\x00\x00\x00\x18ftypheic\x00\x00\x00\x00": "image/heic",
+    b"\x00\x00\x00\x14ftypqt  \x00\x00\x00\x00": "video/quicktime",
+    b"\x00\x00\x00\x20ftypisom\x00\x00\x02\x00": "video/mp4",
+    b"RIFF\x24\x00\x00\x00WEBPVP8 ": "image/webp",
+}
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+class SniffTests(unittest.TestCase):
+
+    def test_known_headers(self):
+        """
+        Assert the known media headers are identified
+        """
+        for header, mimetype in HEADERS.items():
+            self.assertEqual(sniff(header), mimetype)
+
+    def test_unknown_header(self):
+        """
+        Assert unknown headers are not identified
+        """
+        self.assertIsNone(sniff(b"Hello, world!"))
+        self.assertIsNone(sniff(b""))
+
+
+class MimeDetectorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.detector = MimeDetector()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, data):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_sniffed_file(self):
+        """
+        Assert a file with a known header is identified
+        """
+        path = self.write("photo.jpg", b"\xff\xd8\xff\xe0" + b"\x00" * 64)
+        self.assertEqual(self.detector(path), "image/jpeg")
+
+    def test_libmagic_fallback(self):
+        """
+        Assert an unknown header falls back to libmagic
+        """
+        path = self.write("notes.txt", b"These are some plain text notes.\n")
+        self.assertEqual(self.detector(path), "text/plain")
+
+    def test_memoized(self):
+        """
+        Assert results are memoized by key
+        """
+        path = self.write("photo.png", b"\x89PNG\r\n\x1a\n" + b"\x00" * 64)
+        self.assertEqual(self.detector(path, key=(1, 2)), "image/png")
+
+        os.remove(path)
+        self.assertEqual(self.detector(path, key=(1, 2)), "image/png")
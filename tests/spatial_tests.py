@@ -0,0 +1,95 @@
+# tests.spatial_tests
+# Testing for the queries of pictures by location
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 15:58:30 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: spatial_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for the queries of pictures by location.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import unittest
+import numpy as np
+
+from inigo.geohash import encode, MAX_PRECISION
+from inigo.models import Base, Picture, get_engine, create_session
+from inigo.spatial import haversine, near
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+LOCATIONS = [
+    (38.8977, -77.0365),    # the White House
+    (38.8899, -77.0091),    # the Capitol, 2.4km away
+    (38.8893, -77.0502),    # the Lincoln Memorial, 1.6km away
+    (39.2904, -76.6122),    # Baltimore, 56km away
+    (-33.8568, 151.2153),   # Sydney
+]
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+class HaversineTests(unittest.TestCase):
+
+    def test_distances(self):
+        """
+        Assert great circle distances are computed for arrays of coordinates
+        """
+        lats, lons = zip(*LOCATIONS)
+        distance = haversine(38.8977, -77.0365, lats, lons)
+
+        self.assertEqual(distance.shape, (5,))
+        self.assertEqual(distance[0], 0.0)
+        self.assertAlmostEqual(distance[1], 2.52, places=2)
+        self.assertAlmostEqual(distance[3], 56.99, places=2)
+        self.assertAlmostEqual(haversine(0.0, 0.0, 0.0, 180.0), np.pi * 6371.0088)
+        self.assertAlmostEqual(haversine(0.0, 179.9, 0.0, -179.9), haversine(0.0, 0.0, 0.0, 0.2))
+
+
+class NearTests(unittest.TestCase):
+
+    def setUp(self):
+        engine = get_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.session = create_session(engine)
+
+        for idx, (latitude, longitude) in enumerate(LOCATIONS):
+            self.session.add(Picture(
+                id=idx + 1, signature=unicode(idx), latitude=latitude,
+                longitude=longitude, geohash=encode(latitude, longitude, MAX_PRECISION),
+            ))
+        self.session.add(Picture(id=10, signature=u"nowhere"))
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_near(self):
+        """
+        Assert pictures within the radius are found nearest first
+        """
+        found = near(self.session, 38.8977, -77.0365, 3.0)
+        self.assertEqual([picture_id for _, picture_id in found], [1, 3, 2])
+        self.assertEqual(found[0][0], 0.0)
+
+        found = near(self.session, 38.8977, -77.0365, 2.0, limit=1)
+        self.assertEqual([picture_id for _, picture_id in found], [1])
+        self.assertEqual(near(self.session, 0.0, -30.0, 5.0), [])
+
+    def test_near_large_radius(self):
+        """
+        Assert radii too large for geohash cells are pruned by latitude
+        """
+        found = near(self.session, 38.8977, -77.0365, 5000.0)
+        self.assertEqual([picture_id for _, picture_id in found], [1, 3, 2, 4])
@@ -0,0 +1,153 @@
+# tests.thumbnails_tests
+# Testing for the thumbnail cache
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Mon Oct 19 02:03:29 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: thumbnails_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for the thumbnail cache.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+import threading
+
+from PIL import Image
+from inigo.thumbnails import ThumbnailCache, make_thumbnails, generate_thumbnails
+from inigo.thumbnails import QUEUED_CHUNKS
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+SIGNATURE = u"n4bQgYhMfWWaL+qgxVrQFaO/TxsrC4Is0V1sFbDwCgg="
+
+
+class ThumbnailCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache  = ThumbnailCache(os.path.join(self.tmpdir, "thumbs"))
+        self.image  = os.path.join(self.tmpdir, "image.jpg")
+        Image.new("RGB", (1600, 1200), (10, 120, 200)).save(self.image)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_make_thumbnails(self):
+        """
+        Assert a thumbnail is made for each size, keeping the aspect ratio
+        """
+        thumbs = make_thumbnails(self.image, (400, 100))
+        self.assertEqual(thumbs[400].size, (400, 300))
+        self.assertEqual(thumbs[100].size, (100, 75))
+
+    def test_cache_paths(self):
+        """
+        Assert cache paths are file system safe and fanned out by key
+        """
+        path = self.cache.path(SIGNATURE, 128)
+        name = os.path.basename(path)
+
+        self.assertEqual(os.path.dirname(path), os.path.join(self.cache.root, "n4"))
+        self.assertNotIn("/", name[:-4])
+        self.assertTrue(name.endswith("-128.jpg"))
+        self.assertIsNone(self.cache.get(SIGNATURE, 128))
+
+    def test_generate_thumbnails(self):
+        """
+        Assert thumbnails are generated into the cache by the pool
+        """
+        missing = os.path.join(self.tmpdir, "missing.jpg")
+        jobs    = [(SIGNATURE, self.image), (u"bad", missing)]
+        results = dict(generate_thumbnails(jobs, self.cache, (256, 64), workers=2))
+
+        self.assertIsNone(results[SIGNATURE])
+        self.assertIsNotNone(results[u"bad"])
+        self.assertTrue(self.cache.has(SIGNATURE, (256, 64)))
+        self.assertFalse(self.cache.has(u"bad", (256, 64)))
+        self.assertEqual(len(self.cache), 2)
+
+        with Image.open(self.cache.get(SIGNATURE, 64)) as img:
+            self.assertEqual(img.size, (64, 48))
+
+    def test_evict(self):
+        """
+        Assert the least recently used thumbnails are evicted first
+        """
+        thumb = Image.new("RGB", (64, 64))
+        paths = [self.cache.put(u"sig{}".format(idx), 64, thumb) for idx in xrange(4)]
+        for idx, path in enumerate(paths):
+            os.utime(path, (1000 + idx, 1000 + idx))
+
+        # Reading a thumbnail marks it as recently used
+        self.assertEqual(self.cache.get(u"sig0", 64), paths[0])
+
+        size = os.path.getsize(paths[0])
+        self.assertEqual(self.cache.evict(2 * size), 2)
+        self.assertEqual(
+            sorted(os.path.exists(path) for path in paths),
+            [False, False, True, True]
+        )
+        self.assertTrue(os.path.exists(paths[0]))
+        self.assertFalse(os.path.exists(paths[1]))
+
+    def test_bounded_backfill(self):
+        """
+        Assert a backfill larger than the cache stops and keeps its thumbnails
+        """
+        old = self.cache.put(u"old", 64, Image.new("RGB", (64, 64)))
+        os.utime(old, (1000, 1000))
+
+        jobs = []
+        for idx in xrange(6):
+            path = os.path.join(self.tmpdir, "image{}.jpg".format(idx))
+            Image.new("RGB", (320, 240), (idx * 40, 10, 10)).save(path)
+            jobs.append((u"sig{}".format(idx), path))
+
+        # Only about two pictures' thumbnails fit in the cache
+        probe = ThumbnailCache(os.path.join(self.tmpdir, "probe"))
+        list(generate_thumbnails(jobs[:1], probe, (128, 64), workers=1))
+        self.cache.max_bytes = 2 * probe.made_bytes
+
+        results = list(generate_thumbnails(jobs, self.cache, (128, 64), workers=1))
+        self.assertEqual(len(results), 2)
+        self.assertTrue(self.cache.full())
+
+        # New thumbnails are kept even if they are the least recently used
+        for path in self.cache.made:
+            os.utime(path, (500, 500))
+
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(all(os.path.exists(path) for path in self.cache.made))
+        self.assertEqual(len(self.cache.made), 4)
+
+    def test_bounded_jobs(self):
+        """
+        Assert the jobs are read on the calling thread only as they're needed
+        """
+        threads = []
+
+        def jobs():
+            for idx in xrange(100):
+                threads.append(threading.current_thread())
+                yield u"sig{}".format(idx), self.image
+
+        results = generate_thumbnails(jobs(), self.cache, (64,), workers=2, chunksize=1)
+        next(results)
+        results.close()
+
+        self.assertLessEqual(len(threads), 2 * QUEUED_CHUNKS)
+        self.assertTrue(all(thread is threading.current_thread() for thread in threads))
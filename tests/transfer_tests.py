@@ -0,0 +1,176 @@
+# tests.transfer_tests
+# Testing for the copy engine in inigo
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sun Oct 18 10:41:52 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: transfer_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for the copy engine in inigo.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from inigo.fs import FileMeta
+from inigo.hashing import compute_signature, compute_digests
+from inigo.exceptions import VerificationError
+from inigo.transfer import CopyEngine, STRATEGIES, BUFFERED, SENDFILE, verify_file
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+class CopyEngineTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.src  = os.path.join(self.tmpdir, "source.dat")
+        self.data = os.urandom(3 * 1024 * 1024 + 101)
+
+        with open(self.src, 'wb') as f:
+            f.write(self.data)
+
+        os.chmod(self.src, 0o640)
+        os.utime(self.src, (1234567890, 1234567890))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def assertCopied(self, dst):
+        with open(dst, 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+
+        st = os.stat(dst)
+        self.assertEqual(st.st_mode & 0o777, 0o640)
+        self.assertEqual(int(st.st_mtime), 1234567890)
+
+    def test_fallback_chain(self):
+        """
+        Assert the default chain copies the data, mode, and times
+        """
+        dst = os.path.join(self.tmpdir, "target.dat")
+        strategy = CopyEngine(chunksize=1024 * 1024).copy(self.src, dst)
+
+        self.assertIn(strategy, STRATEGIES)
+        self.assertCopied(dst)
+
+    def test_buffered(self):
+        """
+        Assert the buffered strategy copies files larger than the chunksize
+        """
+        dst = os.path.join(self.tmpdir, "target.dat")
+        engine = CopyEngine([BUFFERED], chunksize=1024 * 1024)
+
+        self.assertEqual(engine.copy(self.src, dst), BUFFERED)
+        self.assertCopied(dst)
+
+    def test_each_strategy(self):
+        """
+        Assert every supported strategy produces an identical copy
+        """
+        for strategy in STRATEGIES:
+            dst = os.path.join(self.tmpdir, strategy + ".dat")
+            try:
+                CopyEngine([strategy]).copy(self.src, dst)
+            except (IOError, OSError):
+                # Not every strategy is supported by every file system
+                continue
+            self.assertCopied(dst)
+
+    def test_short_kernel_copy(self):
+        """
+        Assert kernel copies that stop before the end fall back to buffered
+        """
+        class ShortCopyEngine(CopyEngine):
+            def _sendfile(self, srcfd, dstfd, count):
+                if os.lseek(srcfd, 0, os.SEEK_CUR) >= 1024 * 1024:
+                    return 0
+                return super(ShortCopyEngine, self)._sendfile(srcfd, dstfd, count)
+
+        dst = os.path.join(self.tmpdir, "target.dat")
+        engine = ShortCopyEngine([SENDFILE, BUFFERED], chunksize=1024 * 1024)
+
+        self.assertEqual(engine.copy(self.src, dst), BUFFERED)
+        self.assertCopied(dst)
+
+        with self.assertRaises(OSError):
+            ShortCopyEngine([SENDFILE], chunksize=1024 * 1024).copy(self.src, dst)
+
+    def test_batch_fsync(self):
+        """
+        Assert deferred flushes are performed by directory
+        """
+        dst = os.path.join(self.tmpdir, "target.dat")
+        engine = CopyEngine(fsync=True, batch_fsync=True)
+        engine.copy(self.src, dst)
+
+        self.assertEqual(dict(engine.pending), {self.tmpdir: [dst]})
+        engine.flush()
+        self.assertEqual(len(engine.pending), 0)
+
+    def test_node_copy(self):
+        """
+        Assert that file meta copies with the engine into new directories
+        """
+        dst  = os.path.join(self.tmpdir, "a", "b", "target.dat")
+        node = FileMeta(self.src).copy(dst, CopyEngine())
+
+        self.assertIsInstance(node, FileMeta)
+        self.assertCopied(dst)
+
+    def test_copy_hashed(self):
+        """
+        Assert the hashed copy returns the signature of the source
+        """
+        dst = os.path.join(self.tmpdir, "target.dat")
+        engine = CopyEngine(chunksize=1024 * 1024)
+
+        self.assertEqual(engine.copy_hashed(self.src, dst), compute_signature(self.src))
+        self.assertCopied(dst)
+
+    def test_copy_digests(self):
+        """
+        Assert the file meta digests are memoized from the hashed copy
+        """
+        dst  = os.path.join(self.tmpdir, "a", "target.dat")
+        meta = FileMeta(self.src)
+        copy = meta.copy_hashed(dst, CopyEngine())
+
+        expected = compute_digests(self.src, ("sha256", "xxh64"))
+        self.assertEqual(meta.digests, expected)
+        self.assertEqual(copy.checksum, expected["xxh64"])
+        self.assertEqual(verify_file(dst, copy.checksum, "xxh64"), expected["xxh64"])
+        self.assertCopied(dst)
+
+    def test_verify_file(self):
+        """
+        Assert that verification detects a corrupted copy
+        """
+        dst = os.path.join(self.tmpdir, "target.dat")
+        signature = CopyEngine().copy_hashed(self.src, dst)
+        self.assertEqual(verify_file(dst, signature), signature)
+
+        with open(dst, 'r+b') as f:
+            f.seek(1024)
+            f.write(b"corrupt")
+
+        with self.assertRaises(VerificationError):
+            verify_file(dst, signature)
+
+    def test_unknown_strategy(self):
+        """
+        Assert that unknown strategies are rejected
+        """
+        with self.assertRaises(ValueError):
+            CopyEngine(["teleport"])
@@ -0,0 +1,151 @@
+# tests.watch_tests
+# Testing for the inotify tree watcher and debouncer
+#
+# Author:   Benjamin Bengfort <benjamin@bengfort.com>
+# Created:  Sun Oct 18 21:40:26 2026 -0400
+#
+# Copyright (C) 2026 Bengfort.com
+# For license information, see LICENSE.txt
+#
+# ID: watch_tests.py [] benjamin@bengfort.com $
+
+"""
+Testing for the inotify tree watcher and debouncer.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from inigo.watch import TreeWatcher, Debouncer
+
+##########################################################################
+## Test Cases
+##########################################################################
+
+class TreeWatcherTests(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, "sub", "deep"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, *names):
+        path = os.path.join(self.root, *names)
+        with open(path, 'wb') as f:
+            f.write(b"data")
+        return path
+
+    def read(self, watcher):
+        paths = set()
+        while True:
+            found = watcher.read(timeout=0.1)
+            if not found:
+                return paths
+            paths.update(found)
+
+    def test_watch_tree(self):
+        """
+        Assert that files written anywhere in the tree are reported
+        """
+        watcher = TreeWatcher(self.root, recursive=True)
+        self.assertEqual(len(watcher), 3)
+
+        paths = [self.write("a.jpg"), self.write("sub", "deep", "b.jpg")]
+        self.assertEqual(self.read(watcher), set(paths))
+        watcher.close()
+
+    def test_new_directory(self):
+        """
+        Assert that new directories are watched along with their files
+        """
+        watcher = TreeWatcher(self.root, recursive=True)
+
+        os.makedirs(os.path.join(self.root, "new"))
+        path = self.write("new", "c.jpg")
+        self.assertIn(path, self.read(watcher))
+        self.assertEqual(len(watcher), 4)
+
+        path = self.write("new", "d.jpg")
+        self.assertEqual(self.read(watcher), set([path]))
+        watcher.close()
+
+    def test_maxdepth(self):
+        """
+        Assert that directories beyond the maxdepth are not watched
+        """
+        watcher = TreeWatcher(self.root, recursive=True, maxdepth=1)
+        self.assertEqual(len(watcher), 2)
+
+        path = self.write("sub", "a.jpg")
+        self.write("sub", "deep", "b.jpg")
+        self.assertEqual(self.read(watcher), set([path]))
+        watcher.close()
+
+    def test_slow_writer(self):
+        """
+        Assert that files are only reported once they finish being written
+        """
+        watcher = TreeWatcher(self.root)
+        path = os.path.join(self.root, "slow.jpg")
+
+        with open(path, 'wb') as f:
+            for _ in xrange(3):
+                f.write(b"data")
+                f.flush()
+                self.assertEqual(self.read(watcher), set())
+
+        self.assertEqual(self.read(watcher), set([path]))
+        self.assertIn(path, watcher.modified)
+
+        # Files moved into the tree are complete when they arrive
+        outside = tempfile.mkdtemp()
+        try:
+            moved = os.path.join(outside, "moved.jpg")
+            with open(moved, 'wb') as f:
+                f.write(b"data")
+            os.rename(moved, os.path.join(self.root, "moved.jpg"))
+        finally:
+            shutil.rmtree(outside)
+
+        self.assertEqual(self.read(watcher), set([os.path.join(self.root, "moved.jpg")]))
+        watcher.close()
+
+
+class DebouncerTests(unittest.TestCase):
+
+    def test_debounce(self):
+        """
+        Assert that paths are only ready once they have been quiet
+        """
+        debouncer = Debouncer(delay=2.0)
+        debouncer.extend(["a.jpg", "b.jpg"], now=10.0)
+        debouncer.add("a.jpg", now=11.0)
+
+        self.assertEqual(len(debouncer), 2)
+        self.assertEqual(debouncer.timeout(now=11.0), 1.0)
+        self.assertEqual(debouncer.ready(now=11.5), [])
+        self.assertEqual(debouncer.ready(now=12.0), [("b.jpg", 10.0)])
+        self.assertEqual(debouncer.ready(now=13.0), [("a.jpg", 10.0)])
+
+        self.assertEqual(len(debouncer), 0)
+        self.assertIsNone(debouncer.timeout())
+
+    def test_touch(self):
+        """
+        Assert that writes to pending paths reset their delay
+        """
+        debouncer = Debouncer(delay=2.0)
+        debouncer.add("a.jpg", now=10.0)
+        debouncer.touch(["a.jpg", "b.jpg"], now=11.5)
+
+        self.assertEqual(len(debouncer), 1)
+        self.assertEqual(debouncer.ready(now=12.5), [])
+        self.assertEqual(debouncer.ready(now=13.5), [("a.jpg", 10.0)])